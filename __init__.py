@@ -1,14 +1,34 @@
 from aqt import mw, gui_hooks
+from aqt.qt import QAction
 from aqt.utils import showInfo
 from aqt.editor import Editor
 from anki.hooks import wrap, addHook
 import json
 import os
+import time
+import weakref
 
 from . import pitch_svg
 from . import pitch_db
 from . import note_types
 from . import sentence_pitch_processor
+from . import backfill
+from . import fingerprint
+from . import prefetch
+from . import sharded_store
+from . import accent_model
+
+processor = None
+fingerprints = None
+prefetcher = None
+backfill_action = None
+train_model_action = None
+last_editor_activity = 0.0
+# Fingerprints of notes that are not in the collection yet (Add dialog)
+unsaved_fingerprints = weakref.WeakKeyDictionary()
+# Last processed result per open note, as (cache generation, result), so an
+# edit only looks up the words it changed
+edited_results = weakref.WeakKeyDictionary()
 
 def load_config():
     """Load addon configuration"""
@@ -18,6 +38,8 @@ def load_config():
 
 def on_focus_lost(flag, note, field_idx):
     """Process field content when focus is lost"""
+    note_editor_activity()
+    
     # Only process if we're in our note type
     if not note or note.model()['name'] != note_types.DEFAULT_MODEL_NAME:
         return flag
@@ -35,32 +57,141 @@ def on_focus_lost(flag, note, field_idx):
         if not text or not text.strip():
             return flag
             
+        # Skip notes already processed with the same text, cache and renderer
+        processor = get_processor()
+        note_fingerprint = fingerprint.compute_fingerprint(
+            text, processor.db.generation, processor.renderer_id())
+        if note.id:
+            if fingerprints.matches(note.id, note_fingerprint):
+                return flag
+        elif unsaved_fingerprints.get(note) == note_fingerprint:
+            return flag
+            
         print(f"Processing text: {text}")
         
-        # Use sentence processor for better handling
-        processor = sentence_pitch_processor.SentencePitchProcessor()
-        result = processor.process_sentence(text)
+        # Use sentence processor for better handling; after an edit, words
+        # outside the changed span keep their earlier lookups
+        generation, previous = edited_results.get(note, (None, None))
+        if generation != processor.db.generation:
+            previous = None
+        result = processor.process_sentence_incremental(text, previous)
+        edited_results[note] = (processor.db.generation, result)
+        fields = backfill.fields_from_result(processor, result)
+        changed = backfill.apply_fields(note, fields)
+        if changed:
+            print(f"Updated fields: {list(fields)}")
         
-        if result and result['reading']:
-            # Update Reading field
-            note['Reading'] = result['reading']
-            print(f"Updated reading: {result['reading']}")
-            
-            # Update Pitch field with visualization
-            if result['pattern']:
-                html = processor.generate_sentence_html(text)
-                note['Pitch'] = html
-                print(f"Updated pitch visualization")
+        if note.id:
+            fingerprints.set(note.id, note_fingerprint)
+            fingerprints.save()
+        else:
+            unsaved_fingerprints[note] = note_fingerprint
         
-        return True
+        return True if changed else flag
         
     except Exception as e:
         print(f"Error processing field: {e}")
         return flag
 
+def note_editor_activity(*args):
+    """Remember when the user last interacted with an editor"""
+    global last_editor_activity
+    last_editor_activity = time.time()
+
+def is_user_busy():
+    """True while the user is reviewing or has recently used an editor"""
+    idle_seconds = config.get('prefetch', {}).get('idle_seconds', 30)
+    return mw.state == "review" or time.time() - last_editor_activity < idle_seconds
+
+def start_prefetch():
+    """Warm the pitch cache from collection vocabulary in the background"""
+    global prefetcher
+    if not config.get('prefetch', {}).get('enabled', False):
+        return
+    model = mw.col.models.by_name(note_types.DEFAULT_MODEL_NAME)
+    if not model:
+        return
+    # Read the collection here: the background thread must not use it
+    texts = [text for _, text in backfill.collection_expressions(mw.col, model) if text]
+    prefetcher = prefetch.CachePrefetcher(db, lambda: texts, is_busy=is_user_busy)
+    prefetcher.start()
+    print("Cache prefetch started")
+
+def stop_prefetch():
+    """Stop background prefetching before the collection closes"""
+    global prefetcher
+    if prefetcher:
+        if not prefetcher.stop():
+            print("Cache prefetch did not stop in time")
+        prefetcher = None
+
+def get_processor():
+    """Return the shared sentence processor, creating it on first use"""
+    global processor
+    if processor is None:
+        cache_config = config.get('cache', {})
+        style_config = config.get('style', {})
+        processor = sentence_pitch_processor.SentencePitchProcessor(
+            db=db, contour_cache_size=cache_config.get('phrase_contour_cache_size', 4096),
+            svg_mode=style_config.get('svg_mode', 'full'),
+            pitch_storage=style_config.get('pitch_storage', 'html'))
+    return processor
+
+def run_backfill_from_menu():
+    """Backfill Reading/Pitch for every note of our note type in the background"""
+    processor = get_processor()
+    job = backfill.BackfillJob(mw.col, processor, note_types.DEFAULT_MODEL_NAME,
+                               fingerprints=fingerprints,
+                               renderer=processor.renderer_id())
+    
+    def on_progress(progress):
+        label = f"Backfilling pitch accent: {backfill.format_progress(progress)}"
+        mw.taskman.run_on_main(lambda: mw.progress.update(label=label))
+    
+    def on_done(future):
+        mw.progress.finish()
+        try:
+            progress = future.result()
+        except Exception as e:
+            print(f"Backfill failed: {e}")
+            showInfo(f"Pitch accent backfill failed: {e}\nRun it again to resume.")
+            return
+        showInfo(f"Pitch accent backfill finished: {backfill.format_progress(progress)}")
+        mw.reset()
+    
+    mw.progress.start(label="Backfilling pitch accent...", immediate=True)
+    mw.taskman.run_in_background(lambda: job.run(on_progress=on_progress), on_done)
+
+def train_model_from_menu():
+    """Retrain the offline accent model from the cache in the background"""
+    def on_done(future):
+        mw.progress.finish()
+        try:
+            model = future.result()
+        except Exception as e:
+            print(f"Accent model training failed: {e}")
+            showInfo(f"Pitch accent model training failed: {e}")
+            return
+        showInfo(f"Pitch accent model trained ({len(model)} contexts)")
+    
+    mw.progress.start(label="Training pitch accent model...", immediate=True)
+    mw.taskman.run_in_background(db.train_accent_model, on_done)
+
+def setup_menu():
+    """Add our actions to the Tools menu (once per session)"""
+    global backfill_action, train_model_action
+    if backfill_action is not None:
+        return
+    backfill_action = QAction("Backfill Pitch Accent...", mw)
+    backfill_action.triggered.connect(run_backfill_from_menu)
+    mw.form.menuTools.addAction(backfill_action)
+    train_model_action = QAction("Train Pitch Accent Model", mw)
+    train_model_action.triggered.connect(train_model_from_menu)
+    mw.form.menuTools.addAction(train_model_action)
+
 def init_pitch_accent():
     """Initialize the pitch accent addon"""
-    global config, db
+    global config, db, processor, fingerprints
     
     print("Initializing pitch accent addon...")
     
@@ -70,11 +201,36 @@ def init_pitch_accent():
         print("Config loaded successfully")
         
         # Initialize the pitch accent database
-        db = pitch_db.PitchDB()
+        ojad_config = config.get('ojad', {})
+        # An explicit cache path lets several profiles (or batch scripts) share one cache
+        cache_config = config.get('cache', {})
+        sharded = cache_config.get('format') == 'sharded'
+        if sharded:
+            # First start with a sharded cache: carry over the single-file cache
+            cache_path = sharded_store.prepare_sharded_cache(
+                os.path.expanduser(cache_config.get('path') or ''),
+                os.path.expanduser(cache_config.get('migrate_from') or ''),
+                pitch_db.PITCH_DB_PATH)
+        else:
+            cache_path = cache_config.get('path') or pitch_db.PITCH_DB_PATH
+        offline_path = cache_config.get('offline_dictionary')
+        model_config = config.get('accent_model', {})
+        db = pitch_db.PitchDB(os.path.expanduser(cache_path),
+                              rate_limit=ojad_config.get('rate_limit', 5),
+                              timeout=ojad_config.get('timeout', 10),
+                              offline_path=os.path.expanduser(offline_path) if offline_path else None,
+                              working_set_size=cache_config.get('working_set_size', 20000),
+                              sharded=sharded,
+                              bloom_error_rate=cache_config.get('bloom_error_rate', 0.01),
+                              accent_model_path=os.path.expanduser(model_config.get('path') or
+                                                                   accent_model.ACCENT_MODEL_PATH),
+                              model_confidence=model_config.get('min_confidence', 0.9))
+        processor = None
+        fingerprints = fingerprint.FingerprintIndex()
         print("Database initialized successfully")
         
         # Set up note types
-        model = note_types.setup_note_types()
+        model = note_types.setup_note_types(config.get('style', {}).get('pitch_storage', 'html'))
         if model:
             print(f"Note type setup complete: {model['name']}")
             print(f"Fields: {[f['name'] for f in model['flds']]}")
@@ -85,6 +241,9 @@ def init_pitch_accent():
         addHook('editFocusLost', on_focus_lost)
         print("Hooks registered successfully")
         
+        setup_menu()
+        start_prefetch()
+        
         # For testing, show that we loaded
         showInfo("Pitch Accent addon loaded successfully!")
         
@@ -93,4 +252,7 @@ def init_pitch_accent():
         showInfo(f"Error loading Pitch Accent addon: {e}")
 
 # Wait for profile to load before initializing
-gui_hooks.profile_did_open.append(init_pitch_accent) 
\ No newline at end of file
+gui_hooks.profile_did_open.append(init_pitch_accent)
+gui_hooks.profile_will_close.append(stop_prefetch)
+gui_hooks.editor_did_fire_typing_timer.append(note_editor_activity)
+gui_hooks.editor_did_load_note.append(note_editor_activity) 
\ No newline at end of file
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Offline statistical accent predictor.
+A backoff model over word features: the last one to three morae of the
+reading, the part of speech, the script the word is written in and its mora
+count. Training counts accent classes per feature context; prediction uses
+the most specific context seen often enough and reports how consistent it was
+as a confidence. Accent classes are relative to the end of the word
+(heiban, atamadaka, or the nucleus k morae before the end), so one context
+covers words of different lengths.
+
+Train from a cache (and optionally an offline dictionary) with:
+
+    python accent_model.py train pitch_db.json accent_model.json [offline_dict.sqlite]
+"""
+
+import json
+import os
+import sys
+
+from utils import katakana_to_hiragana, split_mora
+from pitch_db import drop_pos_to_type, PITCH_TYPE_LABELS
+
+ACCENT_MODEL_PATH = os.path.join(os.path.dirname(__file__), "accent_model.json")
+MODEL_SOURCE = "model"
+MODEL_VERSION = 1
+
+# Contexts seen fewer times than this are skipped in favour of a broader one
+DEFAULT_MIN_SUPPORT = 3
+
+# Feature contexts, most specific first
+LEVELS = (
+    ('pos', 'shape', 'mora', 'suffix3'),
+    ('pos', 'shape', 'mora', 'suffix2'),
+    ('pos', 'shape', 'suffix2'),
+    ('pos', 'shape', 'suffix1'),
+    ('pos', 'shape', 'mora'),
+    ('pos', 'shape'),
+    ('pos',),
+)
+
+# Longer words share one mora count feature
+MAX_MORA_FEATURE = 7
+
+
+def word_shape(word: str) -> str:
+    """
+    Script of word: kanji, hiragana, katakana or mixed.
+    """
+    shapes = set()
+    for char in word:
+        if 'ぁ' <= char <= 'ゟ':
+            shapes.add('hiragana')
+        elif 'ァ' <= char <= 'ヿ':
+            shapes.add('katakana')
+        elif '一' <= char <= '鿿' or char == '々':
+            shapes.add('kanji')
+        else:
+            shapes.add('other')
+    return shapes.pop() if len(shapes) == 1 else 'mixed'
+
+
+def accent_class(drop_pos: int, num_mora: int) -> str:
+    """
+    Accent relative to the word end: "0" heiban, "1" atamadaka, "-k" nucleus
+    k morae before the end ("-0" is odaka).
+    """
+    if drop_pos in (0, 1):
+        return str(drop_pos)
+    return f"-{num_mora - drop_pos}"
+
+
+def class_drop_pos(label: str, num_mora: int):
+    """
+    Drop position of an accent class in a word of num_mora, or None if the
+    class does not fit the word.
+    """
+    if label in ("0", "1"):
+        return int(label)
+    drop_pos = num_mora - int(label[1:])
+    return drop_pos if 1 < drop_pos <= num_mora else None
+
+
+def _features(word: str, morae: list, pos: str) -> dict:
+    return {
+        'pos': pos,
+        'shape': word_shape(word),
+        'mora': str(min(len(morae), MAX_MORA_FEATURE)),
+        'suffix1': "".join(morae[-1:]),
+        'suffix2': "".join(morae[-2:]),
+        'suffix3': "".join(morae[-3:]),
+    }
+
+
+def _context_keys(features: dict):
+    for level, names in enumerate(LEVELS):
+        yield f"{level}|" + "|".join(features[name] for name in names)
+
+
+class AccentModel:
+    """
+    Trained contexts: key -> [best class, its count, total count].
+    """
+
+    def __init__(self, contexts: dict = None, min_support: int = DEFAULT_MIN_SUPPORT):
+        self.contexts = contexts or {}
+        self.min_support = min_support
+
+    @classmethod
+    def train(cls, samples, min_support: int = DEFAULT_MIN_SUPPORT) -> "AccentModel":
+        """
+        Build a model from (word, reading, drop_pos, pos) samples; pos is the
+        main Sudachi part of speech.
+        """
+        counts = {}
+        for word, reading, drop_pos, pos in samples:
+            morae = split_mora(katakana_to_hiragana(reading))
+            if not morae or not 0 <= drop_pos <= len(morae):
+                continue
+            label = accent_class(drop_pos, len(morae))
+            for key in _context_keys(_features(word, morae, pos)):
+                labels = counts.setdefault(key, {})
+                labels[label] = labels.get(label, 0) + 1
+
+        contexts = {}
+        for key, labels in counts.items():
+            total = sum(labels.values())
+            if total < min_support:
+                continue
+            # Ties go to the smaller class string, so training is deterministic
+            label = min(labels, key=lambda name: (-labels[name], name))
+            contexts[key] = [label, labels[label], total]
+        return cls(contexts, min_support)
+
+    def predict(self, word: str, reading: str, pos: str):
+        """
+        Pitch info for word with 'confidence', 'rule' and 'source' keys, or
+        None if no trained context applies.
+        """
+        reading = katakana_to_hiragana(reading)
+        morae = split_mora(reading)
+        if not morae:
+            return None
+        for key in _context_keys(_features(word, morae, pos)):
+            context = self.contexts.get(key)
+            if context is None:
+                continue
+            label, count, total = context
+            drop_pos = class_drop_pos(label, len(morae))
+            if drop_pos is None:
+                continue
+            pitch_type = drop_pos_to_type(drop_pos, len(morae))
+            return {
+                "reading": reading,
+                "drop_pos": drop_pos,
+                "num_mora": len(morae),
+                "pitch_type": pitch_type,
+                "pitch_type_label": PITCH_TYPE_LABELS[pitch_type],
+                # One pseudo-count against the winner keeps small contexts modest
+                "confidence": count / (total + 1),
+                "rule": "model-" + key.split("|", 1)[0],
+                "source": MODEL_SOURCE
+            }
+        return None
+
+    def __len__(self) -> int:
+        return len(self.contexts)
+
+    def save(self, path: str):
+        data = {"version": MODEL_VERSION, "min_support": self.min_support, "contexts": self.contexts}
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str):
+        """
+        Read a saved model, or None if it is missing or unreadable.
+        """
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != MODEL_VERSION:
+                raise ValueError(f"unsupported model version {data.get('version')}")
+            return cls(data["contexts"], data.get("min_support", DEFAULT_MIN_SUPPORT))
+        except (OSError, ValueError, KeyError) as e:
+            if os.path.exists(path):
+                print(f"Ignoring unreadable accent model {path}: {e}")
+            return None
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (4, 5) or sys.argv[1] != "train":
+        print("Usage: python accent_model.py train <cache path> <model.json> [offline_dict.sqlite]")
+        sys.exit(1)
+    from pitch_db import PitchDB
+    cache_path = sys.argv[2]
+    db = PitchDB(cache_path, sharded=os.path.isdir(cache_path),
+                 offline_path=sys.argv[4] if len(sys.argv) == 5 else None)
+    model = db.train_accent_model(sys.argv[3])
+    print(f"Trained {len(model)} contexts into {sys.argv[3]}")
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Built-in accent tables for words that never need a cache or OJAD lookup:
+- particles and auxiliaries (a closed class, keyed by surface and POS)
+- numbers with counters (三時 → さ\んじ, 二十分 → にじゅ\っぷん)
+- katakana loanwords, by the antepenultimate rule (コンピュ\ーター)
+
+Each lookup is a dict probe plus a few mora operations. Results carry
+'rule', 'uncertain' and source "table"; uncertain results should be left
+to the cache and OJAD.
+"""
+
+from utils import katakana_to_hiragana, split_mora, SPECIAL_MORA
+from pitch_db import drop_pos_to_type, PITCH_TYPE_LABELS
+from pos_table import token_flags, NUMERAL
+
+TABLE_SOURCE = "table"
+
+# Nucleus per surface form (0 = no nucleus of their own: they continue the
+# pitch of the preceding word)
+CLOSED_CLASS_ACCENTS = {
+    '助詞': {
+        'は': 0, 'が': 0, 'を': 0, 'に': 0, 'へ': 0, 'と': 0, 'で': 0, 'も': 0,
+        'の': 0, 'や': 0, 'か': 0, 'ね': 0, 'よ': 0, 'な': 0, 'わ': 0, 'ぞ': 0,
+        'さ': 0, 'て': 0, 'ば': 0, 'し': 0, 'から': 0, 'まで': 0, 'だけ': 0,
+        'くらい': 0, 'ぐらい': 0, 'ほど': 0, 'けど': 0, 'けれど': 0, 'のに': 0,
+        'ので': 0, 'とか': 0, 'って': 0, 'ても': 0, 'でも': 0, 'ながら': 0,
+        'より': 1, 'など': 1, 'しか': 1, 'ばかり': 1,
+    },
+    '助動詞': {
+        'だ': 0, 'た': 0, 'じゃ': 0,
+        'です': 1, 'でし': 1, 'だっ': 1, 'でしょう': 2, 'だろう': 2, 'らしい': 2,
+    },
+}
+
+# Counters with regular accent. 'numeral-final': nucleus on the last mora of
+# the number; 'counter-initial': on the first mora of the counter.
+# Sound changes map the last digit to (number part, counter part) readings.
+COUNTERS = {
+    '時': ('numeral-final', {'四': ('よ', 'じ'), '七': ('しち', 'じ'), '九': ('く', 'じ')}),
+    '分': ('numeral-final', {'一': ('いっ', 'ぷん'), '三': ('さん', 'ぷん'), '四': ('よん', 'ぷん'),
+                             '六': ('ろっ', 'ぷん'), '八': ('はっ', 'ぷん'), '十': ('じゅっ', 'ぷん'),
+                             '百': ('ひゃっ', 'ぷん')}),
+    '歳': ('numeral-final', {'一': ('いっ', 'さい'), '八': ('はっ', 'さい'), '十': ('じゅっ', 'さい')}),
+    '才': ('numeral-final', {'一': ('いっ', 'さい'), '八': ('はっ', 'さい'), '十': ('じゅっ', 'さい')}),
+    '度': ('numeral-final', {}),
+    '時間': ('counter-initial', {'四': ('よ', 'じかん'), '七': ('しち', 'じかん'), '九': ('く', 'じかん')}),
+    '週間': ('counter-initial', {'一': ('いっ', 'しゅうかん'), '八': ('はっ', 'しゅうかん'),
+                                 '十': ('じゅっ', 'しゅうかん')}),
+}
+
+# Readings Sudachi may give a final digit; stripped before a sound change
+DIGIT_READINGS = {
+    '〇': ('ぜろ', 'れい'), '一': ('いち',), '二': ('に',), '三': ('さん',), '四': ('よん', 'よ', 'し'),
+    '五': ('ご',), '六': ('ろく',), '七': ('なな', 'しち'), '八': ('はち',), '九': ('きゅう', 'く'),
+    '十': ('じゅう',), '百': ('ひゃく',), '千': ('せん',), '万': ('まん',),
+}
+
+# Single digits as Sudachi writes them; longer digit strings get letter-by-letter readings
+_DIGITS = dict(zip('0123456789０１２３４５６７８９', '〇一二三四五六七八九' * 2))
+
+# Vowel of each kana, for long vowels and diphthongs the nucleus cannot sit on
+_VOWELS = {}
+for _vowel, _row in (('a', 'あかさたなはまやらわがざだばぱぁゃ'),
+                     ('i', 'いきしちにひみりぎじぢびぴぃ'),
+                     ('u', 'うくすつぬふむゆるぐずづぶぷぅゅゔ'),
+                     ('e', 'えけせてねへめれげぜでべぺぇ'),
+                     ('o', 'おこそとのほもよろをごぞどぼぽぉょ')):
+    for _kana in _row:
+        _VOWELS[_kana] = _vowel
+
+# Loanwords of this many morae are often heiban (アメリカ, イギリス); not predicted
+UNCERTAIN_LOANWORD_MORAE = {4}
+
+
+def closed_class_accent(surface: str, reading: str, pos):
+    """
+    Accent of a particle or auxiliary from the table, or None.
+    """
+    nucleus = CLOSED_CLASS_ACCENTS.get(pos[0], {}).get(surface)
+    if nucleus is None:
+        return None
+    return _pitch_info(katakana_to_hiragana(reading), nucleus, 'closed-class')
+
+
+def numeral_counter_accent(numeral: dict, counter: dict):
+    """
+    Accent of a number followed by a counter (both token dicts with surface,
+    reading and pos), or None if the pair is not covered.
+    """
+    if numeral['pos'][1] != '数詞' or counter['pos'][0] not in ('名詞', '接尾辞'):
+        return None
+    rule = COUNTERS.get(counter['surface'])
+    if rule is None:
+        return None
+    kind, sound_changes = rule
+
+    digits = numeral['surface']
+    if len(digits) == 1:
+        digits = _DIGITS.get(digits, digits)
+    if any(digit not in DIGIT_READINGS for digit in digits):
+        return None
+    numeral_reading = katakana_to_hiragana(numeral['reading'])
+    counter_reading = katakana_to_hiragana(counter['reading'])
+    last = digits[-1]
+    if last in sound_changes:
+        stem = _strip_digit_reading(numeral_reading, last)
+        if stem is None:
+            return None
+        numeral_part, counter_reading = sound_changes[last]
+        numeral_reading = stem + numeral_part
+
+    numeral_morae = len(split_mora(numeral_reading))
+    reading = numeral_reading + counter_reading
+    if kind == 'counter-initial':
+        return _pitch_info(reading, numeral_morae + 1, kind)
+    morae = split_mora(reading)
+    nucleus = numeral_morae
+    while nucleus > 1 and _is_dependent(morae, nucleus - 1):
+        nucleus -= 1
+    return _pitch_info(reading, nucleus, kind)
+
+
+def loanword_accent(surface: str, reading: str, pos):
+    """
+    Antepenultimate-rule accent of a katakana common noun, or None.
+    The nucleus falls on the third mora from the end, moved back off ー/ン/ッ
+    and the second half of a diphthong; words of one to three morae are
+    atamadaka. Word lengths that are often heiban are marked uncertain.
+    """
+    if pos[0] != '名詞' or pos[1] != '普通名詞' or not _is_katakana(surface):
+        return None
+    reading = katakana_to_hiragana(reading or surface)
+    morae = split_mora(reading)
+    nucleus = max(1, len(morae) - 2)
+    while nucleus > 1 and _is_dependent(morae, nucleus - 1):
+        nucleus -= 1
+    return _pitch_info(reading, nucleus, 'antepenultimate',
+                       uncertain=len(morae) in UNCERTAIN_LOANWORD_MORAE)
+
+
+def word_accent(surface: str, reading: str, pos):
+    """
+    Table accent of a single word (closed class or loanword), or None if the
+    tables do not cover it or are unsure.
+    """
+    result = closed_class_accent(surface, reading, pos) or loanword_accent(surface, reading, pos)
+    if result is None or result['uncertain']:
+        return None
+    return result
+
+
+def table_accent(tokens: list, start: int):
+    """
+    Table accent for tokens[start:], trying number + counter pairs first.
+    Returns (pitch info, number of tokens covered), or (None, 1).
+    """
+    token = tokens[start]
+    if token_flags(token) & NUMERAL and start + 1 < len(tokens):
+        result = numeral_counter_accent(token, tokens[start + 1])
+        if result is not None:
+            return result, 2
+    return word_accent(token['surface'], token['reading'], token['pos']), 1
+
+
+def _strip_digit_reading(reading: str, digit: str):
+    for digit_reading in DIGIT_READINGS[digit]:
+        if reading.endswith(digit_reading):
+            return reading[:len(reading) - len(digit_reading)]
+    return None
+
+
+def _is_dependent(morae: list, index: int) -> bool:
+    """
+    Whether morae[index] cannot carry the nucleus: ん/っ/ー, or the second
+    half of a long vowel or diphthong (じゅう, ない).
+    """
+    mora = morae[index]
+    if mora[0] in SPECIAL_MORA:
+        return True
+    if index == 0 or mora not in ('い', 'う'):
+        return False
+    previous = _VOWELS.get(katakana_to_hiragana(morae[index - 1])[-1])
+    if mora == 'い':
+        return previous in ('a', 'u', 'e', 'o')
+    return previous in ('u', 'o')
+
+
+def _is_katakana(text: str) -> bool:
+    return bool(text) and all('ァ' <= char <= 'ヶ' or char == 'ー' for char in text)
+
+
+def _pitch_info(reading: str, nucleus: int, rule: str, uncertain: bool = False) -> dict:
+    num_mora = len(split_mora(reading))
+    pitch_type = drop_pos_to_type(nucleus, num_mora)
+    return {
+        "reading": reading,
+        "drop_pos": nucleus,
+        "num_mora": num_mora,
+        "pitch_type": pitch_type,
+        "pitch_type_label": PITCH_TYPE_LABELS[pitch_type],
+        "uncertain": uncertain,
+        "rule": rule,
+        "source": TABLE_SOURCE
+    }
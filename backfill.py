@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Deck-wide backfill of the Reading and Pitch fields.
+Scans every note of the pitch accent note type, processes each distinct
+Expression once and writes the results back in chunks. Progress is
+checkpointed after every chunk so an interrupted run can be resumed.
+"""
+
+import json
+import os
+import time
+
+import lookup_scheduler
+from fingerprint import compute_fingerprint
+from pitch_svg import RENDERER_VERSION
+
+BACKFILL_CHECKPOINT_PATH = os.path.join(os.path.dirname(__file__), "backfill_checkpoint.json")
+
+
+def collection_expressions(col, model, expression_field: str = "Expression"):
+    """
+    Yield (note_id, text) for every note of a note type, in collection order.
+    Reads the raw field data directly, which is much faster than loading notes.
+    """
+    field_idx = col.models.field_names(model).index(expression_field)
+    rows = col.db.all("select id, flds from notes where mid = ? order by id", model['id'])
+    for note_id, flds in rows:
+        yield note_id, flds.split("\x1f")[field_idx].strip()
+
+
+def fields_from_result(processor, result: dict) -> dict:
+    """
+    Turn a process_sentence() result into the field values to write.
+    Returns an empty dict when the text produced no reading.
+    """
+    fields = {}
+    if result and result['reading']:
+        fields['Reading'] = result['reading']
+        if result['pattern']:
+            fields['Pitch'] = processor.generate_result_field(result)
+    return fields
+
+
+def apply_fields(note, fields: dict) -> bool:
+    """
+    Write field values into a note, skipping fields its note type lacks.
+    Returns True if any field changed.
+    """
+    changed = False
+    for name, value in fields.items():
+        if name in note and note[name] != value:
+            note[name] = value
+            changed = True
+    return changed
+
+
+def format_progress(progress: dict) -> str:
+    """
+    Format a progress dict as a one-line status message.
+    """
+    line = f"{progress['done']}/{progress['total']} notes"
+    if progress['notes_per_sec']:
+        line += f" · {progress['notes_per_sec']:.1f} notes/s"
+    if progress['eta_seconds'] is not None:
+        minutes, seconds = divmod(int(progress['eta_seconds']), 60)
+        line += f" · ETA {minutes}m {seconds:02d}s"
+    return line
+
+
+class BackfillJob:
+    """
+    Fills Reading/Pitch for every note of a note type.
+    Distinct Expression texts are processed once and all notes sharing a text
+    are updated together with col.update_notes().
+    """
+
+    def __init__(
+        self,
+        col,
+        processor,
+        model_name: str,
+        chunk_size: int = 200,
+        checkpoint_path: str = BACKFILL_CHECKPOINT_PATH,
+        expression_field: str = "Expression",
+        fingerprints=None,
+        renderer=RENDERER_VERSION
+    ):
+        self.col = col
+        self.processor = processor
+        self.model_name = model_name
+        self.chunk_size = chunk_size
+        self.checkpoint_path = checkpoint_path
+        self.expression_field = expression_field
+        self.fingerprints = fingerprints
+        self.renderer = renderer
+        self.model_id = None
+        self.done_note_ids = set()
+
+    def scan(self) -> dict:
+        """
+        Read the Expression of every pending note.
+        Returns a dict mapping each distinct text to the note ids that use it,
+        in collection order. Notes recorded in the checkpoint, and notes whose
+        fingerprint shows they are already current, are left out.
+        """
+        model = self.col.models.by_name(self.model_name)
+        if not model:
+            print(f"Note type not found: {self.model_name}")
+            return {}
+        self.model_id = model['id']
+        self._load_checkpoint()
+
+        groups = {}
+        for note_id, text in collection_expressions(self.col, model, self.expression_field):
+            if note_id in self.done_note_ids:
+                continue
+            if self.fingerprints is not None and self.fingerprints.matches(note_id, self._fingerprint(text)):
+                self.done_note_ids.add(note_id)
+                continue
+            groups.setdefault(text, []).append(note_id)
+        return groups
+
+    def run(self, on_progress=None, should_cancel=None) -> dict:
+        """
+        Run (or resume) the backfill.
+        on_progress is called with a progress dict after every chunk.
+        should_cancel is polled between chunks; the checkpoint is kept on cancel.
+        Returns the final progress dict.
+        """
+        with lookup_scheduler.priority(lookup_scheduler.BACKFILL):
+            return self._run(on_progress, should_cancel)
+
+    def _run(self, on_progress, should_cancel) -> dict:
+        groups = self.scan()
+        total = len(self.done_note_ids) + sum(len(ids) for ids in groups.values())
+        start_time = time.time()
+        done_this_run = 0
+        print(f"Backfill: {total} notes, {len(groups)} distinct expressions pending")
+
+        for texts in self._chunk(groups):
+            if should_cancel and should_cancel():
+                print("Backfill cancelled")
+                break
+
+            results = self.processor.process_sentences([text for text in texts if text])
+            updated = []
+            for text in texts:
+                fields = fields_from_result(self.processor, results.get(text)) if text else {}
+                for note_id in groups[text]:
+                    note = self.col.get_note(note_id)
+                    if apply_fields(note, fields):
+                        updated.append(note)
+            if updated:
+                self.col.update_notes(updated)
+            if self.fingerprints is not None:
+                for text in texts:
+                    if text:
+                        fingerprint = self._fingerprint(text)
+                        for note_id in groups[text]:
+                            self.fingerprints.set(note_id, fingerprint)
+                self.fingerprints.save()
+
+            chunk_ids = [note_id for text in texts for note_id in groups[text]]
+            self.done_note_ids.update(chunk_ids)
+            done_this_run += len(chunk_ids)
+            self._save_checkpoint()
+
+            progress = self._progress(total, done_this_run, start_time)
+            print(f"Backfill: {format_progress(progress)}")
+            if on_progress:
+                on_progress(progress)
+        else:
+            self._clear_checkpoint()
+
+        return self._progress(total, done_this_run, start_time)
+
+    def _fingerprint(self, text: str) -> str:
+        """
+        Fingerprint a text against the current cache generation and renderer.
+        """
+        return compute_fingerprint(text, self.processor.db.generation, self.renderer)
+
+    def _chunk(self, groups: dict):
+        """
+        Yield lists of texts covering roughly chunk_size notes each.
+        """
+        texts = []
+        note_count = 0
+        for text, note_ids in groups.items():
+            texts.append(text)
+            note_count += len(note_ids)
+            if note_count >= self.chunk_size:
+                yield texts
+                texts = []
+                note_count = 0
+        if texts:
+            yield texts
+
+    def _progress(self, total: int, done_this_run: int, start_time: float) -> dict:
+        """
+        Build a progress dict with throughput and ETA for this run.
+        """
+        done = len(self.done_note_ids)
+        elapsed = time.time() - start_time
+        notes_per_sec = done_this_run / elapsed if elapsed > 0 else 0.0
+        eta_seconds = (total - done) / notes_per_sec if notes_per_sec else None
+        return {
+            'done': done,
+            'total': total,
+            'elapsed': elapsed,
+            'notes_per_sec': notes_per_sec,
+            'eta_seconds': eta_seconds
+        }
+
+    def _load_checkpoint(self):
+        """
+        Restore completed note ids from a checkpoint for the same note type.
+        """
+        self.done_note_ids = set()
+        if not os.path.exists(self.checkpoint_path):
+            return
+        try:
+            with open(self.checkpoint_path, encoding="utf-8") as f:
+                checkpoint = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable backfill checkpoint: {e}")
+            return
+        if checkpoint.get("model_id") == self.model_id:
+            self.done_note_ids = set(checkpoint.get("done_note_ids", []))
+            print(f"Resuming backfill: {len(self.done_note_ids)} notes already done")
+
+    def _save_checkpoint(self):
+        """
+        Persist completed note ids so the job can resume after a restart.
+        """
+        tmp_path = self.checkpoint_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "model_id": self.model_id,
+                "done_note_ids": sorted(self.done_note_ids)
+            }, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _clear_checkpoint(self):
+        """
+        Remove the checkpoint once the job has finished.
+        """
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+
+
+def run_backfill(col, processor, model_name: str, on_progress=None, should_cancel=None, **kwargs) -> dict:
+    """
+    Scriptable entry point: backfill every note of model_name in col.
+    Extra keyword arguments are passed to BackfillJob.
+    """
+    job = BackfillJob(col, processor, model_name, **kwargs)
+    return job.run(on_progress=on_progress, should_cancel=should_cancel)
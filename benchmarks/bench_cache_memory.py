@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark for the pitch cache.
+Builds a synthetic cache of N entries as the old dict of dicts and as the
+compact EntryStore, and reports bytes per entry for each.
+
+Usage: python benchmarks/bench_cache_memory.py [N]
+"""
+
+import sys
+import os
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pitch_store import EntryStore
+
+KANA = "あいうえおかきくけこさしすせそたちつてとなにぬねのはひふへほまみむめもやゆよらりるれろわん"
+
+
+def synthetic_entries(n: int):
+    """
+    Yield (dict_form, entry) pairs with unique keys and realistic small values.
+    Readings repeat (homophones), as they do in a real cache.
+    """
+    for i in range(n):
+        key = "".join(KANA[(i // len(KANA) ** k) % len(KANA)] for k in range(4)) + str(i)
+        reading = "".join(KANA[(i * 7 + k) % len(KANA)] for k in range(2 + i % 3))
+        num_mora = len(reading)
+        drop_pos = i % (num_mora + 1)
+        yield key, {
+            "reading": reading,
+            "drop_pos": drop_pos,
+            "num_mora": num_mora,
+            "pitch_type": 0 if drop_pos == 0 else min(drop_pos, 3),
+            "meaning": None
+        }
+
+
+def measure(build, n: int) -> int:
+    """
+    Bytes allocated by build(entries) and still alive afterwards.
+    """
+    # Materialize the input first so only the container itself is measured
+    entries = [(key, dict(value)) for key, value in synthetic_entries(n)]
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    container = build(entries)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del container
+    return after - before
+
+
+def build_dicts(entries):
+    # The old representation: one dict per word, with its own copy of the reading
+    return {key: {**value, "reading": "".join(value["reading"])} for key, value in entries}
+
+
+def build_store(entries):
+    return EntryStore({key: {**value, "reading": "".join(value["reading"])} for key, value in entries})
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    print(f"Pitch cache memory, {n} entries")
+    results = {}
+    for name, build in [("dict of dicts", build_dicts), ("EntryStore", build_store)]:
+        used = measure(build, n)
+        results[name] = used
+        print(f"  {name:<14} {used / n:8.1f} bytes/entry  ({used / 1024 / 1024:.1f} MiB)")
+    saved = 1 - results["EntryStore"] / results["dict of dicts"]
+    print(f"  saved {saved:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark for pitch contour assembly.
+Compares the per-mora H/L and bool lists phrases were built from before with
+bit-packed contours (per phrase, batched and through the phrase cache), and
+the word mask engine on lists and on NumPy arrays, on synthetic phrases.
+
+Usage: python benchmarks/bench_contour.py [num_phrases]
+"""
+
+import random
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import contour
+from contour import phrase_contour, phrase_contours, join_contours, word_masks_batch, PhraseContourCache
+from pitch_svg import get_pitch_pattern, get_accent_position
+from sentence_records import TokenPitch
+
+ROUNDS = 5
+
+
+def legacy_phrase(group):
+    """The list-based connection the processor used before contours."""
+    pattern, accents = [], []
+    for i, token in enumerate(group):
+        word_pattern = get_pitch_pattern(token.num_mora, token.drop_pos)
+        word_accents = get_accent_position(token.num_mora, token.drop_pos)
+        if i == 0:
+            pattern.extend(word_pattern)
+            accents.extend(word_accents)
+        elif word_pattern:
+            if token.pitch_type == 1:
+                pattern.extend(['H'] + word_pattern[1:])
+                accents.extend([True] + word_accents[1:])
+            else:
+                pattern.extend([pattern[-1] if pattern else 'L'] + word_pattern[1:])
+                accents.extend(word_accents.copy())
+    return pattern, accents
+
+
+def legacy_sentence(phrases):
+    pattern, accents = [], []
+    for phrase_pattern, phrase_accents in phrases:
+        pattern.extend(phrase_pattern)
+        accents.extend(phrase_accents)
+    return pattern, accents
+
+
+def timed(function, phrases) -> float:
+    best = None
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        function(phrases)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / len(phrases) * 1e6
+
+
+def timed_words(function, words) -> float:
+    return timed(lambda _: function(), words)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    rng = random.Random(0)
+    phrases = []
+    for _ in range(count):
+        group = []
+        for _ in range(rng.randint(1, 4)):
+            mora_count = rng.randint(1, 6)
+            drop_pos = rng.randint(0, mora_count)
+            group.append(TokenPitch("x", "x", "x", drop_pos, drop_pos, mora_count, (), 0))
+        phrases.append(group)
+    # Sentences of four phrases each
+    sentences = [phrases[i:i + 4] for i in range(0, count, 4)]
+
+    for group in phrases[:1000]:
+        legacy = legacy_phrase(group)
+        c = phrase_contour(group)
+        assert (c.pattern(), c.accents()) == legacy
+
+    cases = [
+        ("lists (old)", lambda ps: [legacy_phrase(p) for p in ps]),
+        ("contour per phrase", lambda ps: [phrase_contour(p) for p in ps]),
+        ("contour batch", phrase_contours),
+    ]
+    print(f"{count} phrases, best of {ROUNDS} rounds")
+    for name, function in cases:
+        print(f"{name:32s} {timed(function, phrases):8.3f} µs/phrase")
+
+    # Phrase shapes as they repeat in text: a content word, usually a particle
+    shaped = []
+    for _ in range(count):
+        mora_count = min(int(rng.paretovariate(1.5)) + 1, 8)
+        drop_pos = rng.choice([0, 0, 1, mora_count, rng.randint(0, mora_count)])
+        group = [TokenPitch("x", "x", "x", drop_pos, drop_pos, mora_count, (), 0)]
+        if rng.random() < 0.7:
+            group.append(TokenPitch("x", "x", "x", 0, 0, rng.choice([1, 1, 2]), (), 0))
+        shaped.append(group)
+    cache = PhraseContourCache()
+    print(f"{'uncached, text-like shapes':32s} {timed(phrase_contours, shaped):8.3f} µs/phrase")
+    print(f"{'phrase cache, text-like shapes':32s} {timed(cache.contours, shaped):8.3f} µs/phrase")
+    print(f"{'phrase cache, one phrase a call':32s} "
+          f"{timed(lambda ps: [cache.contours([p]) for p in ps], shaped):8.3f} µs/phrase")
+    stats = cache.stats()
+    print(f"{'':32s} {len(cache)} shapes, first pass hit ratio "
+          f"{1 - stats['resident'] / count:.1%}")
+
+    words = [word for group in phrases for word in group]
+    mora_counts = [word.num_mora for word in words]
+    drop_positions = [word.drop_pos for word in words]
+    print(f"{'word masks, lists':32s} {timed_words(lambda: word_masks_batch(mora_counts, drop_positions), words):8.3f} µs/word")
+    if contour.numpy is not None:
+        arrays = contour.numpy.array(mora_counts), contour.numpy.array(drop_positions)
+        print(f"{'word masks, NumPy arrays':32s} {timed_words(lambda: word_masks_batch(*arrays), words):8.3f} µs/word")
+        print(f"{'word masks, lists via NumPy':32s} "
+              f"{timed_words(lambda: [a.tolist() for a in word_masks_batch(*map(contour.numpy.array, (mora_counts, drop_positions)))], words):8.3f} µs/word")
+
+    contours = [[phrase_contour(p) for p in sentence] for sentence in sentences]
+    lists = [[legacy_phrase(p) for p in sentence] for sentence in sentences]
+    print(f"{'join sentence (lists)':32s} {timed(lambda ss: [legacy_sentence(s) for s in ss], lists):8.3f} µs/sentence")
+    print(f"{'join sentence (contours)':32s} {timed(lambda ss: [join_contours(s) for s in ss], contours):8.3f} µs/sentence")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark for re-processing an edited expression.
+Times process_sentence() on the edited text against
+process_sentence_incremental() from the result before the edit, for texts of
+growing length with one word replaced in the middle, and counts the cache
+lookups each makes.
+
+Usage: python benchmarks/bench_incremental.py [rounds]
+"""
+
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pitch_db import PitchDB, PITCH_DB_PATH
+from sentence_pitch_processor import SentencePitchProcessor
+
+SENTENCES = [
+    "私は日本語を勉強していますが、今日は雨でしょう。",
+    "猫も犬も好きです。",
+    "東京タワーは高いですね、でも私は行きません。",
+    "三時にテレビを見た。",
+    "新しい本を買いました。",
+]
+
+
+def timed(function, rounds: int) -> float:
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1e3
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db_path = os.path.join(tmpdir, "pitch_db.json")
+        if os.path.exists(PITCH_DB_PATH):
+            shutil.copy(PITCH_DB_PATH, db_path)
+        rows = []
+        with contextlib.redirect_stdout(io.StringIO()):
+            db = PitchDB(db_path)
+            db.fetch_from_ojad_with_reading = lambda word, reading: None
+            db.autosave = False
+            processor = SentencePitchProcessor(db)
+            lookups = []
+            lookup = db.lookup_with_cache
+            db.lookup_with_cache = lambda word: lookups.append(word) or lookup(word)
+
+            for copies in (1, 4, 16):
+                text = "".join(SENTENCES * copies)
+                # The occurrence of 猫 nearest the middle of the text
+                middle = min((i for i in range(len(text)) if text.startswith("猫も", i)),
+                             key=lambda i: abs(i - len(text) // 2))
+                edited = text[:middle] + "鳥も" + text[middle + 2:]
+                previous = processor.process_sentence(text)
+                processor.process_sentence(edited)  # Warm the cache for the new word
+
+                del lookups[:]
+                full_ms = timed(lambda: processor.process_sentence(edited), rounds)
+                full_lookups = len(lookups) // rounds
+                del lookups[:]
+                incremental_ms = timed(lambda: processor.process_sentence_incremental(edited, previous), rounds)
+                incremental_lookups = len(lookups) // rounds
+                rows.append((len(edited), full_ms, full_lookups, incremental_ms, incremental_lookups))
+
+    print(f"one word replaced in the middle, best of {rounds} rounds")
+    for length, full_ms, full_lookups, incremental_ms, incremental_lookups in rows:
+        print(f"{length:5d} chars  full {full_ms:7.2f} ms ({full_lookups:3d} lookups)  "
+              f"incremental {incremental_ms:7.2f} ms ({incremental_lookups:3d} lookups)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark for kana normalization and mora segmentation.
+Compares the per-call table build and per-character loops the addon used
+before with kana.py, on synthetic readings.
+
+Usage: python benchmarks/bench_kana.py [num_readings]
+"""
+
+import random
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import kana
+
+SMALL = set('ぁぃぅぇぉゃゅょゎァィゥェォャュョヮ')
+KANA = "かきくけこさしすせそたちつてとなにぬねのんっーキャシュチョコンピュータ"
+ROUNDS = 5
+
+
+def legacy_katakana_to_hiragana(text):
+    katakana = kana._KATAKANA
+    hiragana = kana._HIRAGANA
+    return text.translate(str.maketrans(katakana, hiragana))
+
+
+def legacy_split_mora(reading):
+    morae = []
+    for char in reading:
+        if char in SMALL and morae:
+            morae[-1] += char
+        else:
+            morae.append(char)
+    return morae
+
+
+def legacy_count_mora(reading):
+    return sum(1 for char in reading if char not in SMALL)
+
+
+def timed(function, readings) -> float:
+    best = None
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        function(readings)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / len(readings) * 1e6
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    rng = random.Random(0)
+    readings = ["".join(rng.choice(KANA) for _ in range(rng.randint(2, 8))) for _ in range(count)]
+    assert [legacy_split_mora(r) for r in readings] == kana.split_mora_batch(readings)
+    # Counts agree with segmentation (the old counter gave a leading small kana no mora)
+    assert [len(legacy_split_mora(r)) for r in readings] == kana.mora_counts(readings)
+
+    cases = [
+        ("to hiragana (per call table)", lambda rs: [legacy_katakana_to_hiragana(r) for r in rs]),
+        ("to hiragana", kana.to_hiragana_batch),
+        ("split mora (loop)", lambda rs: [legacy_split_mora(r) for r in rs]),
+        ("split mora", kana.split_mora_batch),
+        ("count mora (loop)", lambda rs: [legacy_count_mora(r) for r in rs]),
+        ("count mora", kana.mora_counts),
+    ]
+    print(f"{count} readings, best of {ROUNDS} rounds")
+    for name, function in cases:
+        print(f"{name:32s} {timed(function, readings):8.3f} µs/reading")
+
+
+if __name__ == "__main__":
+    main()
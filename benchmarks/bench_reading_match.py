@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark for matching a target reading against the readings of an OJAD page.
+Compares the old linear matcher with ReadingIndex on quality and speed.
+
+Pages are synthetic OJAD word rows (a verb and its conjugations), or saved
+OJAD result pages given as arguments. Queries are every reading on a page,
+plus variants that should still find it: in katakana, with a prefix (suffix
+match) and with one kana changed (fuzzy match).
+
+Usage: python benchmarks/bench_reading_match.py [page.html ...]
+"""
+
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bs4 import BeautifulSoup
+from reading_index import ReadingIndex
+from pitch_db import PitchDB
+
+STEMS = ["か", "よ", "はし", "あそ", "はたら", "およ", "つか", "まな", "たたか", "うたが"]
+ENDINGS = ["う", "います", "いません", "いました", "わない", "わなかった", "って", "った",
+           "えば", "おう", "える", "われる", "わせる", "え", "いたい", "いながら"]
+ROUNDS = 20
+HIRA_TO_KATA = str.maketrans(
+    "".join(chr(c) for c in range(ord("ぁ"), ord("ゖ") + 1)),
+    "".join(chr(c) for c in range(ord("ァ"), ord("ヶ") + 1))
+)
+
+
+def synthetic_page(stem: str) -> str:
+    """
+    One OJAD-style word row with a conjugation table for stem.
+    """
+    words = []
+    for ending in ENDINGS:
+        reading = stem + ending
+        moras = "".join(
+            f'<span class="mola_{i}{" accent_top" if i == len(stem) else ""}"><span class="char">{char}</span></span>'
+            for i, char in enumerate(reading, 1)
+        )
+        words.append(f'<td><span class="accented_word">{moras}</span></td>')
+    return f'<table><tr id="word_{stem}">{"".join(words)}</tr></table>'
+
+
+def legacy_find_matching_reading(search_word, all_readings):
+    """
+    The matcher PitchDB used before ReadingIndex (linear passes).
+    """
+    for reading_data in all_readings:
+        if reading_data['reading'] == search_word:
+            return reading_data
+    for reading_data in all_readings:
+        reading = reading_data['reading']
+        if reading == search_word:
+            return reading_data
+        if len(reading) > 2 and search_word.endswith(reading):
+            return reading_data
+    for reading_data in all_readings:
+        reading = reading_data['reading']
+        if any(char in reading for char in search_word) or any(char in search_word for char in reading):
+            return reading_data
+    if all_readings:
+        return all_readings[0]
+    return None
+
+
+def queries_for(readings):
+    """
+    (query, expected reading, kind) triples for one page.
+    """
+    queries = []
+    for reading in readings:
+        queries.append((reading, reading, "exact"))
+        queries.append((reading.translate(HIRA_TO_KATA), reading, "katakana"))
+        queries.append(("お" + reading, reading, "suffix"))
+        if len(reading) > 3:
+            changed = reading[:-1] + ("あ" if reading[-1] != "あ" else "い")
+            if changed not in readings:
+                queries.append((changed, reading, "fuzzy"))
+    return queries
+
+
+def main():
+    db = PitchDB.__new__(PitchDB)  # Only the row parser is needed, not the cache
+    if len(sys.argv) > 1:
+        sources = [open(path, encoding="utf-8").read() for path in sys.argv[1:]]
+    else:
+        sources = [synthetic_page(stem) for stem in STEMS]
+
+    pages = []
+    for html in sources:
+        row = BeautifulSoup(html, "html.parser").find("tr", id=lambda x: x and x.startswith("word_"))
+        if row:
+            readings = db._extract_all_readings_from_ojad_row(row)
+            pages.append((readings, queries_for([r['reading'] for r in readings])))
+
+    total = sum(len(queries) for _, queries in pages)
+    print(f"{len(pages)} pages, {total} queries")
+    matchers = [
+        ("legacy", lambda readings: lambda word: legacy_find_matching_reading(word, readings)),
+        ("ReadingIndex", lambda readings: ReadingIndex(readings).best_match)
+    ]
+    for name, build in matchers:
+        # kind -> [hits, queries, seconds]
+        results = {}
+        build_time = 0.0
+        for _ in range(ROUNDS):
+            for readings, queries in pages:
+                # One index per page, as PitchDB builds it once per fetched page
+                start = time.perf_counter()
+                matcher = build(readings)
+                build_time += time.perf_counter() - start
+                for query, expected, kind in queries:
+                    start = time.perf_counter()
+                    match = matcher(query)
+                    elapsed = time.perf_counter() - start
+                    result = results.setdefault(kind, [0, 0, 0.0])
+                    result[0] += match is not None and match['reading'] == expected
+                    result[1] += 1
+                    result[2] += elapsed
+        print(f"  {name} (build {build_time / ROUNDS / len(pages) * 1e6:.1f} us/page)")
+        for kind, (hits, count, seconds) in results.items():
+            print(f"    {kind:<9} {hits / count:5.0%} correct  {seconds / count * 1e6:6.1f} us/query")
+
+if __name__ == "__main__":
+    main()
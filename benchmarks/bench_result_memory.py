@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the memory held by processed sentence results.
+Processes sentences in batch mode and compares the bytes retained per result
+by the slotted records with the nested dicts the pipeline used to return
+(rebuilt here with the same sharing as the old code: word boundaries pointing
+at the token dicts, pattern lists copied into the sentence result).
+
+Usage: python benchmarks/bench_result_memory.py [num_sentences]
+"""
+
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pitch_db import PitchDB, PITCH_DB_PATH
+from sentence_pitch_processor import SentencePitchProcessor
+
+SENTENCES = [
+    "大学に行きます",
+    "私は日本語を勉強しています",
+    "新しい本を買いました",
+    "三時にテレビを見た、でも眠い。",
+    "今日は雨でしょう",
+    "猫も犬も好きです",
+    "お菓子を食べる",
+    "学生でした",
+]
+
+
+def legacy_token(token) -> dict:
+    return {
+        'surface': token.surface,
+        'dict_form': token.dict_form,
+        'reading': token.reading,
+        'pitch_type': token.pitch_type,
+        'drop_pos': token.drop_pos,
+        'num_mora': token.num_mora,
+        'pos': token.pos,
+        'flags': token.flags,
+        'pitch_info': token.pitch_info
+    }
+
+
+def legacy_result(result) -> dict:
+    """
+    The dict shape process_sentence() returned before the records.
+    """
+    phrases = []
+    pattern, accent_positions, reading = [], [], ''
+    for phrase in result.phrases:
+        tokens = [legacy_token(token) for token in phrase.tokens]
+        boundaries = []
+        start = 0
+        phrase_reading = ''
+        for token in tokens:
+            boundaries.append({
+                'token': token,
+                'mora_start': start,
+                'mora_end': start + token['num_mora'],
+                'reading': token['reading'],
+                'drop_pos': token['drop_pos'],
+                'pitch_type': token['pitch_type']
+            })
+            start += token['num_mora']
+            phrase_reading += token['reading']
+        phrases.append({
+            'pattern': list(phrase.pattern),
+            'accent_positions': list(phrase.accent_positions),
+            'reading': phrase_reading,
+            'mora_count': len(phrase.pattern),
+            'tokens': tokens,
+            'word_boundaries': boundaries
+        })
+        pattern.extend(phrase.pattern)
+        accent_positions.extend(phrase.accent_positions)
+        reading += phrase_reading
+    return {
+        'pattern': pattern,
+        'accent_positions': accent_positions,
+        'reading': reading,
+        'mora_count': len(pattern),
+        'phrases': phrases,
+        'original_sentence': result.original_sentence
+    }
+
+
+def retained(build) -> tuple:
+    """
+    (bytes, allocated blocks) still held by build()'s return value.
+    """
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    kept = build()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = after.compare_to(before, 'filename')
+    size = sum(stat.size_diff for stat in stats)
+    blocks = sum(stat.count_diff for stat in stats)
+    del kept
+    return size, blocks
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    sentences = [SENTENCES[i % len(SENTENCES)] for i in range(count)]
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db_path = os.path.join(tmpdir, "pitch_db.json")
+        if os.path.exists(PITCH_DB_PATH):
+            shutil.copy(PITCH_DB_PATH, db_path)
+        with contextlib.redirect_stdout(io.StringIO()):
+            db = PitchDB(db_path)
+            db.fetch_from_ojad_with_reading = lambda word, reading: None
+            db.autosave = False
+            processor = SentencePitchProcessor(db)
+            # Warm the cache so the measured runs only allocate results
+            for sentence in SENTENCES:
+                processor.process_sentence(sentence)
+
+            def records():
+                return [processor.process_sentence(sentence) for sentence in sentences]
+
+            def dicts():
+                # Same processing; only the old shape is kept
+                return [legacy_result(processor.process_sentence(sentence)) for sentence in sentences]
+
+            def records_used():
+                # Records after the sentence-wide views were read once
+                kept = records()
+                for result in kept:
+                    result.pattern, result.accent_positions
+                return kept
+
+            measurements = [
+                ("dict results (old shape)", retained(dicts)),
+                ("slotted records", retained(records)),
+                ("slotted records, views read", retained(records_used)),
+            ]
+
+    print(f"{count} sentences")
+    for name, (size, blocks) in measurements:
+        print(f"{name:32s} {size / count:8.0f} bytes/sentence {blocks / count:7.1f} blocks/sentence")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Benchmark for pitch SVG rendering.
+Compares the += string building generate_pitch_svg() used before with the
+list-join renderer, uncached and through the render cache, per call for word
+and sentence patterns, and for rendering a deck whose sentences repeat.
+Also reports the stored size of full and compact SVGs and of Pitch fields
+holding HTML or pitch notation.
+
+Usage: python benchmarks/bench_svg.py [num_cards]
+"""
+
+import random
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pitch_svg
+from pitch_notation import encode_notation
+from pitch_svg import generate_pitch_svg, generate_pitch_html, get_pitch_pattern, get_accent_position
+
+ROUNDS = 5
+
+
+def legacy_svg(pitch_pattern, accent_positions, text_length=None):
+    if not pitch_pattern or not accent_positions:
+        return ""
+    circle_radius = 3
+    circle_stroke = 0.75
+    point_spacing = 15
+    vertical_gap = 8
+    margin = 8
+    if text_length and text_length > len(pitch_pattern):
+        scale_factor = text_length / len(pitch_pattern)
+        point_spacing = int(point_spacing * scale_factor)
+    width = margin * 2 + (len(pitch_pattern) - 1) * point_spacing
+    height = margin + vertical_gap + circle_radius * 2
+    high_y = margin
+    low_y = high_y + vertical_gap
+    svg = f'<svg width="{width}" height="{height}" viewBox="0 0 {width} {height}" xmlns="http://www.w3.org/2000/svg">'
+    points = []
+    for i, pitch in enumerate(pitch_pattern):
+        x = margin + (i * point_spacing)
+        y = high_y if pitch == 'H' else low_y
+        points.append((x, y))
+    path = []
+    for i in range(len(points)):
+        x, y = points[i][0], points[i][1]
+        if i == 0:
+            path.append(f"M {x},{y}")
+        else:
+            path.append(f"L {x},{y}")
+    svg += f'<path d="{" ".join(path)}" stroke="black" fill="none" stroke-width="{circle_stroke}"/>'
+    for i, (x, y) in enumerate(points):
+        is_accent = accent_positions[i]
+        fill_color = "white" if is_accent else "black"
+        svg += f'<circle cx="{x}" cy="{y}" r="{circle_radius}" stroke="black" stroke-width="{circle_stroke}" fill="{fill_color}"/>'
+    svg += '</svg>'
+    return svg
+
+
+def uncached_svg(pitch_pattern, accent_positions, text_length=None):
+    pitch_svg._render_svg.cache_clear()
+    return generate_pitch_svg(pitch_pattern, accent_positions, text_length)
+
+
+def timed(render, inputs) -> float:
+    best = None
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        for pattern, accents, text_length in inputs:
+            render(pattern, accents, text_length)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / len(inputs) * 1e6
+
+
+def sentence(rng):
+    """A sentence pattern joined from word patterns."""
+    pattern, accents = [], []
+    for _ in range(rng.randint(3, 8)):
+        mora_count = rng.randint(1, 5)
+        drop_pos = rng.randint(0, mora_count)
+        pattern += get_pitch_pattern(mora_count, drop_pos)
+        accents += get_accent_position(mora_count, drop_pos)
+    return pattern, accents, len(pattern) + rng.randint(0, 6)
+
+
+def main():
+    cards = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    rng = random.Random(0)
+    words = []
+    for _ in range(2000):
+        mora_count = rng.randint(1, 6)
+        drop_pos = rng.randint(0, mora_count)
+        words.append((get_pitch_pattern(mora_count, drop_pos), get_accent_position(mora_count, drop_pos),
+                      rng.choice([None, mora_count, mora_count + 1])))
+    sentences = [sentence(rng) for _ in range(2000)]
+    for pattern, accents, text_length in words + sentences:
+        assert generate_pitch_svg(pattern, accents, text_length) == legacy_svg(pattern, accents, text_length)
+
+    print(f"best of {ROUNDS} rounds")
+    for name, inputs in (("word", words), ("sentence", sentences)):
+        pitch_svg._render_svg.cache_clear()
+        print(f"{name:9s} += (old) {timed(legacy_svg, inputs):7.2f} µs  "
+              f"list join {timed(uncached_svg, inputs):7.2f} µs  "
+              f"cached {timed(generate_pitch_svg, inputs):7.2f} µs per call")
+
+    # A deck: most expressions share their pattern with others, some are unique
+    shared = [sentence(rng) for _ in range(cards // 10)]
+    deck = [rng.choice(shared) if rng.random() < 0.8 else sentence(rng) for _ in range(cards)]
+    start = time.perf_counter()
+    for pattern, accents, text_length in deck:
+        legacy_svg(pattern, accents, text_length)
+    legacy_ms = (time.perf_counter() - start) * 1e3
+    pitch_svg._render_svg.cache_clear()
+    start = time.perf_counter()
+    for pattern, accents, text_length in deck:
+        generate_pitch_svg(pattern, accents, text_length)
+    cached_ms = (time.perf_counter() - start) * 1e3
+    info = pitch_svg.svg_cache_info()
+    print(f"{cards} card deck: += (old) {legacy_ms:.1f} ms, cached {cached_ms:.1f} ms "
+          f"({info.hits / (info.hits + info.misses):.0%} cache hits)")
+
+    # Stored size; Pitch fields also hold the text, 3 bytes a character
+    for name, inputs in (("word", words), ("sentence", sentences)):
+        for label, render in (("svg", lambda p, a, t, mode: generate_pitch_svg(p, a, t, mode)),
+                              ("field", lambda p, a, t, mode: generate_pitch_html(p, a, "あ" * (t or len(p)), mode=mode))):
+            full, compact = (sum(len(render(p, a, t, mode).encode()) for p, a, t in inputs) / len(inputs)
+                             for mode in ("full", "compact"))
+            print(f"{name:9s} {label:5s} full {full:6.0f} B  compact {compact:6.0f} B  ({full / compact:.1f}x smaller)")
+        notation = sum(len(encode_notation(p, a, "あ" * (t or len(p))).encode()) for p, a, t in inputs) / len(inputs)
+        print(f"{name:9s} field notation {notation:6.0f} B  ({full / notation:.1f}x smaller than full)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Persisted Bloom filter over cache keys.
+Answers "definitely not stored" without touching disk, so lookups of words that
+no local tier has can skip shard loads and dictionary queries.
+"""
+
+import hashlib
+import json
+import math
+import os
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter sized for `capacity` keys at `error_rate` false positives.
+    Filters with the same size and source can be merged with update().
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01, source: str = ""):
+        self.capacity = max(int(capacity), 1)
+        self.error_rate = error_rate
+        self.num_bits = max(int(-self.capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.num_hashes = max(int(round(self.num_bits / self.capacity * math.log(2))), 1)
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+        # Describes what the filter was built from; a mismatch means rebuild
+        self.source = source
+
+    def _positions(self, key: str):
+        # Double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, key: str):
+        added = False
+        for position in self._positions(key):
+            mask = 1 << (position & 7)
+            if not self.bits[position >> 3] & mask:
+                self.bits[position >> 3] |= mask
+                added = True
+        if added:
+            self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    @property
+    def overfull(self) -> bool:
+        return self.count > self.capacity
+
+    def compatible(self, other: "BloomFilter") -> bool:
+        return (self.num_bits, self.num_hashes, self.source) == (other.num_bits, other.num_hashes, other.source)
+
+    def update(self, other: "BloomFilter"):
+        """
+        Add every key of a compatible filter (bitwise union).
+        """
+        self.bits = bytearray(a | b for a, b in zip(self.bits, other.bits))
+        self.count = max(self.count, other.count)
+
+    def save(self, path: str):
+        """
+        Write a JSON header line followed by the raw bit array.
+        """
+        header = {
+            "capacity": self.capacity,
+            "error_rate": self.error_rate,
+            "num_bits": self.num_bits,
+            "num_hashes": self.num_hashes,
+            "count": self.count,
+            "source": self.source
+        }
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(json.dumps(header).encode("utf-8") + b"\n")
+            f.write(self.bits)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str):
+        """
+        Read a filter written by save(), or None if missing or unreadable.
+        """
+        try:
+            with open(path, "rb") as f:
+                header = json.loads(f.readline())
+                bits = f.read()
+        except (OSError, ValueError):
+            return None
+        bloom = cls(header["capacity"], header["error_rate"], header.get("source", ""))
+        if (bloom.num_bits, bloom.num_hashes) != (header["num_bits"], header["num_hashes"]) \
+                or len(bits) != len(bloom.bits):
+            return None
+        bloom.bits = bytearray(bits)
+        bloom.count = header["count"]
+        return bloom
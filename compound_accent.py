@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Accent prediction for compound nouns from their components.
+Tokyo compound accent rules, for N1 + N2 (N1 may itself be several words):
+- heiban-forming suffixes (日本+語, 近代+化) make the whole compound heiban
+- N2 of three or more morae keeps its own nucleus (国際+会議 → こくさいか\いぎ),
+  or takes it on its first mora if it is heiban or odaka
+- N2 of one or two morae puts the nucleus on the last mora of N1
+Predictions are tagged with source "compound" so they can be verified later.
+"""
+
+from utils import split_mora, SPECIAL_MORA
+from pitch_db import drop_pos_to_type, PITCH_TYPE_LABELS
+
+COMPOUND_SOURCE = "compound"
+
+# Suffixes after which a compound is heiban
+HEIBAN_SUFFIXES = {'語', '色', '的', '性', '製', '化', '組', '家', '式', '用', '風', '産'}
+
+# N2 of at least this many morae keeps (or starts) its own accent
+LONG_ELEMENT_MORAE = 3
+
+
+def predict_compound_accent(components: list, reading: str):
+    """
+    Predict the accent of a compound.
+
+    components: (surface, reading, entry) per element, in order; entry is the
+        element's looked-up (not guessed) pitch entry or None (only needed for
+        a long final element)
+    reading: hiragana reading of the whole compound
+
+    Returns a pitch info dict with 'uncertain', 'rule' and 'source' keys, or
+    None if the components cannot predict it.
+    """
+    if len(components) < 2:
+        return None
+    morae = split_mora(reading)
+    n1_morae = sum(len(split_mora(component[1])) for component in components[:-1])
+    surface, n2_reading, n2_entry = components[-1]
+    n2_morae = len(split_mora(n2_reading))
+    if n1_morae + n2_morae != len(morae):
+        # Readings do not line up (contraction or a wrong split)
+        return None
+
+    uncertain = False
+    if surface in HEIBAN_SUFFIXES:
+        rule, nucleus = 'heiban-suffix', 0
+    elif n2_morae >= LONG_ELEMENT_MORAE:
+        if n2_entry is None:
+            return None
+        n2_nucleus = n2_entry['drop_pos']
+        rule = 'long-element'
+        if n2_nucleus == 0 or n2_nucleus >= n2_morae:
+            nucleus = n1_morae + 1
+        else:
+            nucleus = n1_morae + n2_nucleus
+    else:
+        rule, nucleus = 'short-element', n1_morae
+        # The nucleus cannot sit on ん/っ/ー (e.g. 日本+人); leave those to OJAD
+        while nucleus > 1 and morae[nucleus - 1][0] in SPECIAL_MORA:
+            nucleus -= 1
+            uncertain = True
+
+    pitch_type = drop_pos_to_type(nucleus, len(morae))
+    return {
+        "reading": reading,
+        "drop_pos": nucleus,
+        "num_mora": len(morae),
+        "pitch_type": pitch_type,
+        "pitch_type_label": PITCH_TYPE_LABELS[pitch_type],
+        "uncertain": uncertain,
+        "rule": rule,
+        "source": COMPOUND_SOURCE
+    }
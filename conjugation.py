@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Rule-based accent of conjugated verbs and adjectives.
+Derives the accent of ます/た/て/ない/ば forms from the dictionary form's
+accent and the Sudachi part of speech, so a conjugated phrase needs only the
+lemma's cache entry. Forms the rules are not sure about are flagged as
+uncertain; callers should confirm those with OJAD.
+
+Tokyo accent rules used (nucleus = mora after which the pitch drops):
+- ます forms: nucleus on ま (ません/ましょう: on せ/しょ), whatever the verb
+- た/て forms: heiban verbs stay heiban; accented verbs keep their nucleus but
+  at most on the mora before the last stem mora (食べる→た\べて, 書く→か\いて)
+- ない: accented verbs drop before ない (か\かない→かか\ない), heiban stay heiban
+- ば: accented verbs keep their nucleus (か\けば)
+- adjectives (かった/くて/ければ): accented adjectives move the nucleus one
+  mora back (たか\い→た\かった), heiban adjectives stay heiban before て
+"""
+
+from utils import katakana_to_hiragana, split_mora, SPECIAL_MORA
+from pitch_db import drop_pos_to_type, PITCH_TYPE_LABELS, FALLBACK_SOURCE
+from accent_model import MODEL_SOURCE
+from pos_table import (token_flags, CONJUGATING, VERB, AUXILIARY, PAST_AUXILIARY,
+                       CONJUNCTIVE_PARTICLE)
+
+# Lemma entries that are guesses: forms derived from them are uncertain
+GUESSED_SOURCES = {FALLBACK_SOURCE, MODEL_SOURCE}
+
+# Connecting particles that end a conjugation chain
+CHAIN_PARTICLES = {'て', 'で', 'ば'}
+
+
+def is_conjugating(token: dict) -> bool:
+    return bool(token_flags(token) & CONJUGATING)
+
+
+def attaches_to(head: dict, token: dict) -> bool:
+    """
+    Whether token continues the conjugation chain started by head.
+    Verbs take any auxiliary; adjectives only た (かった). Both take て/で/ば.
+    """
+    flags = token_flags(token)
+    if flags & CONJUNCTIVE_PARTICLE:
+        return token['surface'] in CHAIN_PARTICLES
+    if not flags & AUXILIARY:
+        return False
+    return bool(token_flags(head) & VERB or flags & PAST_AUXILIARY)
+
+
+def conjugation_chain(tokens: list, start: int) -> list:
+    """
+    The head token at start plus the auxiliaries it takes (a list of tokens).
+    A connecting particle always ends the chain.
+    """
+    head = tokens[start]
+    chain = [head]
+    if not is_conjugating(head):
+        return chain
+    for token in tokens[start + 1:]:
+        if not attaches_to(head, token):
+            break
+        chain.append(token)
+        if token_flags(token) & CONJUNCTIVE_PARTICLE:
+            break
+    return chain
+
+
+def derive_accent(lemma: dict, chain: list):
+    """
+    Accent of a conjugated chain from its lemma's pitch entry.
+
+    lemma: cache entry of the head's dictionary form (drop_pos in morae)
+    chain: head token followed by its auxiliaries, as from conjugation_chain()
+
+    Returns a pitch info dict with 'uncertain' and 'rule' keys, or None if the
+    chain is not a conjugation at all. Forms of a guessed lemma (Heiban
+    fallback, accent model) are always uncertain.
+    """
+    if lemma is None or len(chain) < 2:
+        return None
+    head, auxiliaries = chain[0], chain[1:]
+    stem_morae = len(split_mora(katakana_to_hiragana(head['reading'])))
+    reading = katakana_to_hiragana("".join(token['reading'] for token in chain))
+    morae = split_mora(reading)
+    dict_nucleus = lemma['drop_pos']
+
+    if head['pos'][0] == '形容詞':
+        rule, nucleus, uncertain = _adjective_rule(dict_nucleus, auxiliaries)
+    else:
+        rule, nucleus, uncertain = _verb_rule(dict_nucleus, stem_morae, auxiliaries)
+    if lemma.get('source') in GUESSED_SOURCES:
+        uncertain = True
+
+    if nucleus:
+        nucleus = min(nucleus, len(morae))
+        # The nucleus cannot sit on ん/っ/ー; move it back (these cases are less sure)
+        while nucleus > 1 and morae[nucleus - 1][0] in SPECIAL_MORA:
+            nucleus -= 1
+            uncertain = True
+
+    pitch_type = drop_pos_to_type(nucleus, len(morae))
+    return {
+        "reading": reading,
+        "drop_pos": nucleus,
+        "num_mora": len(morae),
+        "pitch_type": pitch_type,
+        "pitch_type_label": PITCH_TYPE_LABELS[pitch_type],
+        "uncertain": uncertain,
+        "rule": rule
+    }
+
+
+def _verb_rule(dict_nucleus: int, stem_morae: int, auxiliaries: list):
+    """
+    (rule, nucleus, uncertain) for a verb stem followed by auxiliaries.
+    """
+    first = auxiliaries[0]
+    aux_type = first['pos'][4]
+    accented = dict_nucleus > 0
+
+    if aux_type == '助動詞-マス':
+        # ます/ました: ま; ません/ませんでした/ましょう: the mora after ま
+        offset = 2 if first['surface'].startswith(('ませ', 'ましょ')) else 1
+        return 'masu', stem_morae + offset, False
+
+    if aux_type == '助動詞-タ' or first['surface'] in ('て', 'で'):
+        if not accented:
+            return 'ta', 0, False
+        return 'ta', max(1, min(dict_nucleus, stem_morae - 1)), False
+
+    if aux_type == '助動詞-ナイ':
+        if accented:
+            return 'nai', stem_morae, False
+        # Heiban verbs: ない stays heiban, but なかった tends to take a nucleus
+        return 'nai', 0, len(auxiliaries) > 1
+
+    if first['surface'] == 'ば':
+        if accented:
+            return 'ba', dict_nucleus, False
+        # Heiban verbs vary between heiban and a drop before ば
+        return 'ba', 0, True
+
+    return 'other', dict_nucleus, True
+
+
+def _adjective_rule(dict_nucleus: int, auxiliaries: list):
+    """
+    (rule, nucleus, uncertain) for an adjective stem followed by auxiliaries.
+    """
+    first = auxiliaries[0]
+    accented = dict_nucleus > 0
+    if accented:
+        return 'adjective', max(1, dict_nucleus - 1), False
+    if first['surface'] == 'て':
+        return 'adjective', 0, False
+    # Heiban adjectives before かった/ければ commonly take a nucleus; leave to OJAD
+    return 'adjective', 0, True
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Bit-packed pitch contours.
+A contour is two ints of mora bits (bit i = mora i: high pitch, accent mora)
+and a length. Word contours come from arithmetic on (mora_count, drop_pos),
+phrases connect words and sentences join phrases with shifts and ors, so no
+step walks the morae one by one. The 'H'/'L' and bool lists the SVG code
+draws from are only built when a contour is read.
+
+word_masks_batch() computes many words at once: with NumPy array operations
+for arrays (NumPy is optional), with the cached per-word function for lists.
+PhraseContourCache memoizes whole phrases by their words' accent signatures,
+since a few shapes (noun + が, verb + ます) make up most phrases.
+"""
+
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+try:
+    import numpy
+except ImportError:  # Optional; only needed for array input
+    numpy = None
+
+# NumPy masks are int64; longer words (never seen in practice) use Python ints
+_NUMPY_MAX_MORA = 62
+_HL = str.maketrans('01', 'LH')
+_TRUTH = {'0': False, '1': True}
+
+
+def _bits(mask: int, length: int) -> str:
+    """'0'/'1' per mora, first mora first."""
+    return format(mask, f'0{length}b')[::-1] if length else ''
+
+
+class Contour:
+    """
+    Pitch (high bits) and accent marks (accent bits) of `length` morae.
+    Treated as immutable: word contours are shared through a cache.
+    """
+
+    __slots__ = ('high', 'accent', 'length')
+
+    def __init__(self, high: int = 0, accent: int = 0, length: int = 0):
+        self.high = high
+        self.accent = accent
+        self.length = length
+
+    @classmethod
+    def from_lists(cls, pattern: list, accent_positions: list) -> 'Contour':
+        high = sum(1 << i for i, pitch in enumerate(pattern) if pitch == 'H')
+        accent = sum(1 << i for i, is_accent in enumerate(accent_positions) if is_accent)
+        return cls(high, accent, len(pattern))
+
+    def pattern(self) -> list:
+        """['L', 'H', ...] as get_pitch_pattern() returns it."""
+        return list(_bits(self.high, self.length).translate(_HL))
+
+    def accents(self) -> list:
+        """[False, True, ...] as get_accent_position() returns it."""
+        return list(map(_TRUTH.__getitem__, _bits(self.accent, self.length)))
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __add__(self, other: 'Contour') -> 'Contour':
+        return Contour(self.high | other.high << self.length,
+                       self.accent | other.accent << self.length,
+                       self.length + other.length)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Contour):
+            return NotImplemented
+        return (self.high, self.accent, self.length) == (other.high, other.accent, other.length)
+
+    def __hash__(self) -> int:
+        return hash((self.high, self.accent, self.length))
+
+    def __repr__(self):
+        return f"Contour({''.join(self.pattern())!r}, accent={_bits(self.accent, self.length)!r})"
+
+
+@lru_cache(maxsize=None)
+def word_masks(mora_count: int, drop_pos: int) -> tuple:
+    """
+    (high, accent) bits of one word, matching get_pitch_pattern() and
+    get_accent_position() for every input.
+    """
+    if mora_count <= 0:
+        return 0, 0
+    full = (1 << mora_count) - 1
+    if drop_pos == 0 or (drop_pos == mora_count and drop_pos != 1):
+        high = full & ~1               # Heiban / Odaka: low start, then high
+    elif drop_pos == 1:
+        high = 1                       # Atamadaka: high start, then low
+    elif mora_count == 2:
+        high = 0b10
+    else:                              # Nakadaka: high up to the accent mora
+        high = ((1 << min(max(drop_pos, 0), mora_count)) - 1) & ~1
+    accent = 1 << (drop_pos - 1) if 0 < drop_pos <= mora_count else 0
+    return high, accent
+
+
+def word_contour(mora_count: int, drop_pos: int) -> Contour:
+    high, accent = word_masks(mora_count, drop_pos)
+    return Contour(high, accent, max(mora_count, 0))
+
+
+def word_masks_batch(mora_counts, drop_positions) -> tuple:
+    """
+    High bits and accent bits for many words in one call.
+    NumPy arrays are computed with array operations and give arrays back.
+    Lists go through the cached word_masks(): a corpus has few distinct
+    (mora_count, drop_pos) pairs, so this beats converting lists to arrays.
+    """
+    if numpy is not None and isinstance(mora_counts, numpy.ndarray):
+        if not len(mora_counts) or mora_counts.max() <= _NUMPY_MAX_MORA:
+            return _numpy_masks(mora_counts, numpy.asarray(drop_positions))
+        mora_counts, drop_positions = mora_counts.tolist(), numpy.asarray(drop_positions).tolist()
+    masks = [word_masks(m, d) for m, d in zip(mora_counts, drop_positions)]
+    return [high for high, _ in masks], [accent for _, accent in masks]
+
+
+def _numpy_masks(m, d) -> tuple:
+    m = m.astype(numpy.int64)
+    d = d.astype(numpy.int64)
+    rising = (numpy.left_shift(1, m) - 1) & ~1
+    nakadaka = (numpy.left_shift(1, numpy.clip(d, 0, m)) - 1) & ~1
+    high = numpy.select(
+        [m <= 0, (d == 0) | ((d == m) & (d != 1)), d == 1, m == 2],
+        [0, rising, 1, 0b10],
+        nakadaka)
+    accented = (d > 0) & (d <= m)
+    accent = numpy.where(accented, numpy.left_shift(1, numpy.where(accented, d - 1, 0)), 0)
+    return high, accent
+
+
+def connect(words: list, highs: list, accents: list, start: int = 0) -> Contour:
+    """
+    Contour of one accent phrase from its words and their masks, found in
+    highs/accents from index start.
+    After the first word, a word's first mora takes the previous mora's pitch,
+    except Atamadaka words (pitch_type 1), which start high on an accent.
+    """
+    high = accent = length = 0
+    for i, word in enumerate(words):
+        mora_count = word.num_mora
+        if mora_count <= 0:
+            continue
+        word_high = highs[start + i]
+        word_accent = accents[start + i]
+        if i:
+            if word.pitch_type == 1:
+                first = 1
+                word_accent |= 1
+            else:
+                first = high >> (length - 1) & 1 if length else 0
+            word_high = word_high & ~1 | first
+        high |= word_high << length
+        accent |= word_accent << length
+        length += mora_count
+    return Contour(high, accent, length)
+
+
+def phrase_contour(words: list) -> Contour:
+    """Contour of one phrase (tokens with num_mora, drop_pos and pitch_type)."""
+    masks = [word_masks(word.num_mora, word.drop_pos) for word in words]
+    return connect(words, [high for high, _ in masks], [accent for _, accent in masks])
+
+
+def phrase_contours(phrases: list) -> list:
+    """
+    Contours of many phrases, with all their words' masks computed in one
+    word_masks_batch() call.
+    """
+    highs, accents = word_masks_batch([word.num_mora for phrase in phrases for word in phrase],
+                                      [word.drop_pos for phrase in phrases for word in phrase])
+    contours = []
+    start = 0
+    for phrase in phrases:
+        contours.append(connect(phrase, highs, accents, start))
+        start += len(phrase)
+    return contours
+
+
+def join_contours(contours: list) -> Contour:
+    """Contours laid end to end (phrases into a sentence)."""
+    high = accent = length = 0
+    for contour in contours:
+        high |= contour.high << length
+        accent |= contour.accent << length
+        length += contour.length
+    return Contour(high, accent, length)
+
+
+def phrase_signature(words: list) -> tuple:
+    """Everything a phrase contour depends on: (num_mora, drop_pos, pitch_type) per word."""
+    return tuple([(word.num_mora, word.drop_pos, word.pitch_type) for word in words])
+
+
+class PhraseContourCache:
+    """
+    Bounded LRU cache of phrase contours keyed by phrase_signature().
+    Contours are immutable, so phrases with the same signature share one.
+    """
+
+    def __init__(self, capacity: int = 4096):
+        self.capacity = max(int(capacity), 1)
+        self._contours = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def contours(self, phrases: list) -> list:
+        """
+        Contours of many phrases; the misses are computed in one phrase_contours() batch.
+        """
+        signatures = [phrase_signature(phrase) for phrase in phrases]
+        cached = self._contours
+        results = []
+        missing = {}
+        with self._lock:
+            for signature in signatures:
+                contour = cached.get(signature)
+                if contour is None:
+                    missing[signature] = len(results)
+                else:
+                    cached.move_to_end(signature)
+                results.append(contour)
+            self.misses += len(missing)
+            self.hits += len(signatures) - len(missing)
+
+        if missing:
+            computed = dict(zip(missing, phrase_contours([phrases[i] for i in missing.values()])))
+            with self._lock:
+                cached.update(computed)
+                while len(cached) > self.capacity:
+                    cached.popitem(last=False)
+                    self.evictions += 1
+            # Phrases repeated within this batch were computed once
+            results = [computed[signature] if contour is None else contour
+                       for signature, contour in zip(signatures, results)]
+        return results
+
+    def clear(self):
+        with self._lock:
+            self._contours.clear()
+
+    def __len__(self) -> int:
+        return len(self._contours)
+
+    def stats(self) -> dict:
+        """
+        Resident size, hit ratio and eviction count.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'resident': len(self._contours),
+                'capacity': self.capacity,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions
+            }
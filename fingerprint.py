@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Content fingerprints for processed notes.
+A fingerprint covers everything that determines the Reading/Pitch output:
+the Expression text, the pitch cache generation and the renderer version.
+When a note's stored fingerprint matches, processing can be skipped.
+"""
+
+import hashlib
+import json
+import os
+
+FINGERPRINT_INDEX_PATH = os.path.join(os.path.dirname(__file__), "fingerprints.json")
+
+
+def compute_fingerprint(text: str, generation: int, renderer) -> str:
+    """
+    Return a short stable hash of an Expression and the processing inputs.
+    """
+    key = f"{text.strip()}\x1f{generation}\x1f{renderer}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+class FingerprintIndex:
+    """
+    Sidecar index mapping note ids to the fingerprint they were last processed with.
+    Kept outside the collection so checking a note never touches it.
+    """
+
+    def __init__(self, path: str = FINGERPRINT_INDEX_PATH):
+        self.path = path
+        self.fingerprints = {}
+        self._dirty = False
+        if os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self.fingerprints = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Ignoring unreadable fingerprint index: {e}")
+
+    def matches(self, note_id, fingerprint: str) -> bool:
+        """
+        Check whether a note was last processed with this fingerprint.
+        """
+        return self.fingerprints.get(str(note_id)) == fingerprint
+
+    def set(self, note_id, fingerprint: str):
+        """
+        Record the fingerprint a note was processed with (call save() to persist).
+        """
+        self.fingerprints[str(note_id)] = fingerprint
+        self._dirty = True
+
+    def save(self):
+        """
+        Write the index to disk if it changed.
+        """
+        if not self._dirty:
+            return
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.fingerprints, f)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Kana normalization and mora segmentation.
+All tables and patterns are built once at import; the per-call work is a
+single str.translate or regex scan in C, so these are cheap enough to run on
+every token and cache hit.
+
+A mora is one kana plus any small ゃ/ゅ/ょ/ぁ... that follow it (きょ, ファ).
+ん, っ and the long vowel mark ー are morae of their own.
+"""
+
+import re
+
+_KATAKANA = 'ァアィイゥウェエォオカガキギクグケゲコゴサザシジスズセゼソゾタダチヂッツヅテデトドナニヌネノハバパヒビピフブプヘベペホボポマミムメモャヤュユョヨラリルレロヮワヰヱヲンヴヵヶ'
+_HIRAGANA = 'ぁあぃいぅうぇえぉおかがきぎくぐけげこごさざしじすずせぜそぞただちぢっつづてでとどなにぬねのはばぱひびぴふぶぷへべぺほぼぽまみむめもゃやゅゆょよらりるれろゎわゐゑをんゔゕゖ'
+
+KATAKANA_TO_HIRAGANA = str.maketrans(_KATAKANA, _HIRAGANA)
+HIRAGANA_TO_KATAKANA = str.maketrans(_HIRAGANA, _KATAKANA)
+
+# Small kana that combine with the preceding kana into one mora
+SMALL_KANA = frozenset('ぁぃぅぇぉゃゅょゎァィゥェォャュョヮ')
+
+# Morae that cannot carry the accent nucleus
+SPECIAL_MORA = frozenset('んっーンッ')
+
+_MORA = re.compile('.[' + ''.join(sorted(SMALL_KANA)) + ']*', re.DOTALL)
+_SMALL = re.compile('[' + ''.join(sorted(SMALL_KANA)) + ']')
+
+
+def to_hiragana(text: str) -> str:
+    """Convert katakana to hiragana (other characters are kept)."""
+    return text.translate(KATAKANA_TO_HIRAGANA)
+
+
+def to_katakana(text: str) -> str:
+    """Convert hiragana to katakana (other characters are kept)."""
+    return text.translate(HIRAGANA_TO_KATAKANA)
+
+
+def split_mora(reading: str) -> list:
+    """Split a kana reading into morae, e.g. 'きょう' -> ['きょ', 'う']."""
+    return _MORA.findall(reading)
+
+
+def mora_count(reading: str) -> int:
+    """Number of morae in a kana reading, without building the list."""
+    count = len(reading) - len(_SMALL.findall(reading))
+    if reading and reading[0] in SMALL_KANA:
+        # A stray leading small kana still counts as a mora, as in split_mora
+        count += 1
+    return count
+
+
+def to_hiragana_batch(texts) -> list:
+    """to_hiragana for each of many strings."""
+    table = KATAKANA_TO_HIRAGANA
+    return [text.translate(table) for text in texts]
+
+
+def split_mora_batch(readings) -> list:
+    """split_mora for each of many readings."""
+    findall = _MORA.findall
+    return [findall(reading) for reading in readings]
+
+
+def mora_counts(readings) -> list:
+    """mora_count for each of many readings."""
+    return [mora_count(reading) for reading in readings]
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Priority scheduling for network lookups.
+Interactive editor lookups, deck backfills and idle prefetching share one OJAD
+client. The scheduler admits requests one at a time by priority class, so a
+bulk job can never put an interactive lookup behind its queue: whenever a slot
+frees up, the highest-priority waiter gets it (preemption at request
+boundaries).
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Priority classes, highest first
+INTERACTIVE = 0
+BACKFILL = 1
+PREFETCH = 2
+
+PRIORITY_NAMES = {
+    INTERACTIVE: "interactive",
+    BACKFILL: "backfill",
+    PREFETCH: "prefetch"
+}
+
+DEFAULT_CLASS_LIMITS = {
+    INTERACTIVE: 2,
+    BACKFILL: 1,
+    PREFETCH: 1
+}
+
+_local = threading.local()
+
+
+def current_priority() -> int:
+    """
+    Priority class of lookups made by the calling thread (interactive by default).
+    """
+    return getattr(_local, "priority", INTERACTIVE)
+
+
+@contextmanager
+def priority(level: int):
+    """
+    Run the enclosed lookups of the calling thread at the given priority class.
+    """
+    previous = current_priority()
+    _local.priority = level
+    try:
+        yield
+    finally:
+        _local.priority = previous
+
+
+class LookupScheduler:
+    """
+    Admits network requests by priority class with per-class concurrency limits.
+    One slot is reserved for interactive requests (when max_concurrent > 1), so
+    background classes can never occupy every slot.
+    """
+
+    def __init__(self, max_concurrent: int = 2, class_limits: dict = None):
+        self.max_concurrent = max_concurrent
+        self.class_limits = {**DEFAULT_CLASS_LIMITS, **(class_limits or {})}
+        self._cond = threading.Condition()
+        self._waiting = {level: deque() for level in PRIORITY_NAMES}
+        self._active = {level: 0 for level in PRIORITY_NAMES}
+        self._stats = {
+            level: {'submitted': 0, 'completed': 0, 'wait_time': 0.0, 'max_queue_depth': 0}
+            for level in PRIORITY_NAMES
+        }
+
+    def run(self, fn, *args, level: int = None, **kwargs):
+        """
+        Call fn(*args, **kwargs) once a slot for its priority class is free.
+        level defaults to the calling thread's current_priority().
+        """
+        if level is None:
+            level = current_priority()
+        ticket = object()
+        queued_at = time.monotonic()
+
+        with self._cond:
+            queue = self._waiting[level]
+            queue.append(ticket)
+            stats = self._stats[level]
+            stats['submitted'] += 1
+            stats['max_queue_depth'] = max(stats['max_queue_depth'], len(queue))
+            while not self._can_start(level, ticket):
+                self._cond.wait()
+            queue.popleft()
+            self._active[level] += 1
+            stats['wait_time'] += time.monotonic() - queued_at
+
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._cond:
+                self._active[level] -= 1
+                stats['completed'] += 1
+                self._cond.notify_all()
+
+    def _can_start(self, level: int, ticket) -> bool:
+        """
+        Check whether the ticket may take a slot now. Caller holds the lock.
+        """
+        if self._waiting[level][0] is not ticket:
+            return False
+        if self._active[level] >= self.class_limits[level]:
+            return False
+        total_active = sum(self._active.values())
+        capacity = self.max_concurrent if level == INTERACTIVE else max(self.max_concurrent - 1, 1)
+        if total_active >= capacity:
+            return False
+        # Lower classes wait while any higher class has requests queued
+        return not any(self._waiting[higher] for higher in PRIORITY_NAMES if higher < level)
+
+    def metrics(self) -> dict:
+        """
+        Queue depth, active requests and wait statistics per priority class.
+        """
+        with self._cond:
+            metrics = {}
+            for level, name in PRIORITY_NAMES.items():
+                stats = self._stats[level]
+                started = stats['submitted'] - len(self._waiting[level])
+                metrics[name] = {
+                    'queued': len(self._waiting[level]),
+                    'active': self._active[level],
+                    'submitted': stats['submitted'],
+                    'completed': stats['completed'],
+                    'max_queue_depth': stats['max_queue_depth'],
+                    'avg_wait': stats['wait_time'] / started if started else 0.0
+                }
+            return metrics
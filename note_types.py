@@ -3,9 +3,12 @@ from anki.models import ModelManager
 import json
 import os
 
+from pitch_svg import COMPACT_SVG_CSS, COMPACT_SVG_CLASS
+from pitch_notation import PITCH_TEMPLATE, add_notation_renderer
+
 DEFAULT_MODEL_NAME = "Japanese with Pitch Accent"
 
-def setup_note_types():
+def setup_note_types(pitch_storage: str = "html"):
     """Set up the note types for pitch accent display"""
     if not mw.col:
         print("Collection not loaded")
@@ -23,6 +26,7 @@ def setup_note_types():
         mm.add_field(model, mm.new_field("Expression"))
         mm.add_field(model, mm.new_field("Reading"))
         mm.add_field(model, mm.new_field("Meaning"))
+        mm.add_field(model, mm.new_field("Pitch"))
         
         # Add card templates
         t = mm.new_template("Recognition")
@@ -34,7 +38,7 @@ def setup_note_types():
 <hr id="answer">
 <div class="reading">{{Reading}}</div>
 <div class="meaning">{{Meaning}}</div>
-'''
+''' + PITCH_TEMPLATE
         mm.add_template(model, t)
         
         # Add CSS
@@ -61,12 +65,30 @@ def setup_note_types():
     color: #333;
     margin-top: 20px;
 }
-'''
+''' + COMPACT_SVG_CSS
         
         # Save model
         mm.add(model)
         print(f"Created note type: {model['name']}")
     else:
         print(f"Note type already exists: {model['name']}")
+        changed = False
+        # Note types created before compact SVGs lack their styling
+        if f'svg.{COMPACT_SVG_CLASS}' not in model['css']:
+            model['css'] += COMPACT_SVG_CSS
+            changed = True
+            print(f"Added pitch SVG styling to: {model['name']}")
+        # Stored notation needs the script wherever a template shows {{Pitch}};
+        # layouts are otherwise left as the user made them
+        if pitch_storage == "notation":
+            for t in model['tmpls']:
+                for side in ('qfmt', 'afmt'):
+                    updated = add_notation_renderer(t[side])
+                    if updated != t[side]:
+                        t[side] = updated
+                        changed = True
+                        print(f"Added pitch notation renderer to template: {t['name']}")
+        if changed:
+            mm.save(model)
         
     return model 
\ No newline at end of file
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Read-only offline pitch dictionary stored in SQLite.
+A full dictionary (hundreds of thousands of words) stays on disk; PitchDB
+reads single entries from it through a bounded working set.
+
+Build one from a pitch_db.json-style JSON file or from a tab-separated
+word/reading/accent list (accent = drop position, first value used when
+several are given, e.g. "1,0"):
+
+    python offline_dict.py import accents.txt offline_dict.sqlite
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import threading
+
+from utils import katakana_to_hiragana, count_mora
+
+SCHEMA = """
+create table if not exists entries (
+    dict_form text primary key,
+    reading text not null,
+    drop_pos integer not null,
+    num_mora integer not null,
+    pitch_type integer not null,
+    meaning text
+)
+"""
+
+
+class OfflineDictionary:
+    """
+    Point lookups into an SQLite dictionary file.
+    Each thread gets its own read-only connection.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            uri = "file:" + os.path.abspath(self.path).replace("?", "%3f") + "?mode=ro"
+            connection = sqlite3.connect(uri, uri=True)
+            self._local.connection = connection
+        return connection
+
+    def get(self, dict_form: str):
+        """
+        Return the entry dict for dict_form, or None.
+        """
+        row = self._connection().execute(
+            "select reading, drop_pos, num_mora, pitch_type, meaning from entries where dict_form = ?",
+            (dict_form,)
+        ).fetchone()
+        if row is None:
+            return None
+        reading, drop_pos, num_mora, pitch_type, meaning = row
+        return {
+            "reading": reading,
+            "drop_pos": drop_pos,
+            "num_mora": num_mora,
+            "pitch_type": pitch_type,
+            "meaning": meaning
+        }
+
+    def keys(self):
+        """
+        Yield every dict_form in the dictionary.
+        """
+        for (dict_form,) in self._connection().execute("select dict_form from entries"):
+            yield dict_form
+
+    def __len__(self) -> int:
+        return self._connection().execute("select count(*) from entries").fetchone()[0]
+
+    def close(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+
+def build_offline_dictionary(path: str, entries):
+    """
+    Write (dict_form, entry dict) pairs into an SQLite dictionary at path.
+    Existing words are replaced. Returns the number of rows written.
+    """
+    connection = sqlite3.connect(path)
+    try:
+        connection.execute(SCHEMA)
+        rows = [
+            (dict_form, katakana_to_hiragana(entry["reading"]), entry["drop_pos"],
+             entry["num_mora"], entry["pitch_type"], entry.get("meaning"))
+            for dict_form, entry in entries
+        ]
+        with connection:
+            connection.executemany("insert or replace into entries values (?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+    finally:
+        connection.close()
+
+
+def read_source(source_path: str):
+    """
+    Yield (dict_form, entry) pairs from a JSON cache file or a word/reading/accent TSV.
+    """
+    # Imported here: pitch_db itself imports this module
+    from pitch_db import drop_pos_to_type
+
+    if source_path.endswith(".json"):
+        with open(source_path, encoding="utf-8") as f:
+            yield from json.load(f).items()
+        return
+
+    with open(source_path, encoding="utf-8") as f:
+        for line in f:
+            parts = line.rstrip("\n").split("\t")
+            if len(parts) < 3 or not parts[2]:
+                continue
+            word, reading, accent = parts[:3]
+            reading = katakana_to_hiragana(reading or word)
+            try:
+                drop_pos = int(accent.split(",")[0])
+            except ValueError:
+                continue
+            num_mora = count_mora(reading)
+            yield word, {
+                "reading": reading,
+                "drop_pos": drop_pos,
+                "num_mora": num_mora,
+                "pitch_type": drop_pos_to_type(drop_pos, num_mora),
+                "meaning": None
+            }
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4 or sys.argv[1] != "import":
+        print("Usage: python offline_dict.py import <source.json|source.tsv> <dictionary.sqlite>")
+        sys.exit(1)
+    count = build_offline_dictionary(sys.argv[3], read_source(sys.argv[2]))
+    print(f"Imported {count} entries into {sys.argv[3]}")
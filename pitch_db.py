@@ -1,13 +1,37 @@
 import json
 import os
+import threading
+import time
 import requests
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
 from bs4 import BeautifulSoup
 from sudachipy import tokenizer
 from sudachipy import dictionary
-from utils import katakana_to_hiragana
+from utils import katakana_to_hiragana, count_mora
+from lookup_scheduler import LookupScheduler
+from pitch_store import EntryStore
+from sharded_store import ShardedStore
+from offline_dict import OfflineDictionary
+from working_set import WorkingSet
+from bloom import BloomFilter
+from trie import Trie
+from reading_index import ReadingIndex
 
 PITCH_DB_PATH = os.path.join(os.path.dirname(__file__), "pitch_db.json")
 
+# Compact the journal into the main file once it grows past this size
+JOURNAL_COMPACT_BYTES = 256 * 1024
+
+# Source tag of Heiban guesses stored when nothing else had the word
+FALLBACK_SOURCE = "fallback"
+
 # Map drop position to type
 # 0: Heiban, 1: Atamadaka, n==num_mora: Odaka, else Nakadaka
 PITCH_TYPE_LABELS = {
@@ -36,29 +60,156 @@ def drop_pos_to_type(drop_pos: int, num_mora: int) -> int:
     else:
         return 2  # Nakadaka
 
+class RateLimiter:
+    """
+    Spaces out OJAD requests to at most `rate` per second, across all threads.
+    """
+
+    def __init__(self, rate: float = 5):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_time = 0.0
+
+    def wait(self):
+        """
+        Block until the caller may send the next request.
+        """
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_time)
+            self._next_time = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+class FileLock:
+    """
+    Advisory lock on a sidecar file, shared by every process using the cache.
+    Uses fcntl where available and msvcrt on Windows. Each thread opens its own
+    handle, so threads of one process exclude each other too. Not re-entrant.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+
+    def __enter__(self):
+        lock_file = open(self.path, "a+")
+        if fcntl:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        elif msvcrt:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        self._local.file = lock_file
+        return self
+
+    def __exit__(self, *exc):
+        lock_file = self._local.file
+        try:
+            if fcntl:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            elif msvcrt:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            lock_file.close()
+            self._local.file = None
+
+
 class PitchDB:
     """
     Handles pitch accent lookup, caching, OJAD queries, and fallback reading analysis.
+    Safe to share between threads, and between processes using the same db_path:
+    writes are appended to a journal under an advisory file lock and merged
+    with whatever other processes wrote.
+    With sharded=True, db_path is a directory of lazily loaded shards that are
+    rewritten individually under the same file lock instead.
+    An optional offline dictionary (offline_path) is consulted after the cache;
+    only a bounded working set of it is kept in memory.
+    An optional accent model (accent_model_path) answers words stored nowhere:
+    predictions of at least model_confidence skip OJAD, and weaker ones replace
+    the Heiban guess when OJAD has nothing.
+    When either disk tier is in use, a persisted Bloom filter over its keys lets
+    lookups of words stored nowhere skip disk reads entirely.
     """
 
-    def __init__(self, db_path: str = PITCH_DB_PATH):
+    def __init__(self, db_path: str = PITCH_DB_PATH, rate_limit: float = 5, timeout: float = 10,
+                 offline_path: str = None, working_set_size: int = 20000, sharded: bool = False,
+                 bloom_error_rate: float = 0.01, accent_model_path: str = None,
+                 model_confidence: float = 0.9):
         self.db_path: str = db_path
-        if os.path.exists(db_path):
-            with open(db_path, encoding="utf-8") as f:
-                self.db = json.load(f)
+        # Sharded caches are a directory of shard files instead of one JSON file
+        self.sharded: bool = sharded
+        self.rate_limiter = RateLimiter(rate_limit)
+        self.scheduler = LookupScheduler()
+        self.timeout = timeout
+        base_path = os.path.splitext(db_path)[0]
+        self.meta_path: str = base_path + ".meta.json"
+        self.journal_path: str = base_path + ".journal"
+        self.file_lock = FileLock(base_path + ".lock")
+        self.autosave: bool = True
+        # Entries added by this process that are not on disk yet
+        self._pending = {}
+        self._journal_offset: int = 0
+        self._main_signature = None
+        # Reads of self.db are lock-free; every mutation holds _lock, and
+        # _save_lock serializes snapshots and file writes
+        self._lock = threading.RLock()
+        self._save_lock = threading.Lock()
+        self._tokenizer_lock = threading.Lock()
+        self._local = threading.local()
+        self.generation: int = self._load_generation()
+        # Tries over cached keys and readings, for splitting unknown compounds
+        self.key_index = Trie()
+        self.reading_index = Trie()
+        self._indexed = not sharded  # A sharded cache is indexed on first use
+        self.offline = None
+        self.working_set = None
+        if offline_path and os.path.exists(offline_path):
+            self.offline = OfflineDictionary(offline_path)
+            self.working_set = WorkingSet(self.offline.get, working_set_size)
+        if sharded:
+            # Shards are read on first access, so startup reads none of them
+            self.db = ShardedStore(db_path)
         else:
-            self.db = {}
-            self.save()
+            self.db = EntryStore()
+            if os.path.exists(db_path):
+                self._load()
+            else:
+                self.save()
+        self.bloom_path: str = base_path + ".bloom"
+        self.bloom_error_rate = bloom_error_rate
+        self.bloom = None
+        self.bloom_skips: int = 0
+        self._bloom_dirty = False
+        self._bloom_signature = None
+        if sharded or self.offline is not None:
+            self._init_bloom()
+        # Offline accent model; confident predictions skip OJAD
+        self.accent_model_path = accent_model_path
+        self.model_confidence = model_confidence
+        self.accent_model = None
+        if accent_model_path:
+            # Imported here: accent_model itself imports this module
+            from accent_model import AccentModel
+            self.accent_model = AccentModel.load(accent_model_path)
         self.tokenizer = dictionary.Dictionary().create()
         self.mode = tokenizer.Tokenizer.SplitMode.C
 
     def lookup(self, dict_form: str):
         """
-        Look up a dictionary form in cache.
+        Look up a dictionary form in cache, then in the offline dictionary.
         """
         print(f"Looking up {dict_form} in cache...")
-        result = self.db.get(dict_form)
-        if result and result.get("reading"):
+        maybe_stored = self.bloom is None or dict_form in self.bloom or self._bloom_recheck(dict_form)
+        if not maybe_stored:
+            self.bloom_skips += 1
+        # Both tiers build a fresh dict per read, so callers never share cached data
+        # (a JSON cache is fully in memory, so only a sharded one needs the filter)
+        result = self.db.get(dict_form) if maybe_stored or not self.sharded else None
+        if result is None and maybe_stored and self.working_set is not None:
+            result = self.working_set.get(dict_form)
+        if result is not None and result.get("reading"):
             # Ensure reading is in hiragana
             result["reading"] = katakana_to_hiragana(result["reading"])
         print(f"Cache result: {result}")
@@ -71,31 +222,391 @@ class PitchDB:
         drop_pos: int,
         num_mora: int,
         pitch_type: int,
-        meaning: str = None
+        meaning: str = None,
+        source: str = None
     ):
         """
         Add a new entry to the local pitch accent database and save it.
+        source tags predicted entries with how they were derived.
         """
         # Ensure reading is in hiragana
         reading = katakana_to_hiragana(reading)
         
         print(f"Adding entry to cache: {dict_form} = {reading} (drop_pos {drop_pos}, type {pitch_type})")
-        self.db[dict_form] = {
+        entry = {
             "reading": reading,
             "drop_pos": drop_pos,
             "num_mora": num_mora,
             "pitch_type": pitch_type,
             "meaning": meaning
         }
-        self.save()
+        if source:
+            entry["source"] = source
+        with self._lock:
+            previous = self.db.get(dict_form)
+            self.db[dict_form] = entry
+            if not self.sharded:
+                # The sharded store tracks its own dirty entries
+                self._pending[dict_form] = entry
+            elif self.bloom is not None and dict_form not in self.bloom:
+                self.bloom.add(dict_form)
+                self._bloom_dirty = True
+            self._index_entry(dict_form, entry)
+        if previous is not None and previous != entry:
+            # Changing an existing entry can change already processed notes
+            self.bump_generation()
+        if self.autosave and not getattr(self._local, "defer_save", False):
+            self.flush()
+
+    def flush(self):
+        """
+        Append entries added since the last write to the shared journal.
+        Appending is cheap and merges with entries written by other processes;
+        the journal is compacted into the main file once it grows large.
+        A sharded cache rewrites its dirty shards instead.
+        """
+        with self._save_lock, self.file_lock:
+            if self.sharded:
+                self.db.flush()
+                self._save_bloom_locked()
+                return
+            self._refresh_locked()
+            with self._lock:
+                pending = self._pending
+                self._pending = {}
+            if pending:
+                with open(self.journal_path, "a", encoding="utf-8") as f:
+                    for dict_form, entry in pending.items():
+                        f.write(json.dumps([dict_form, entry], ensure_ascii=False) + "\n")
+                    self._journal_offset = f.tell()
+            if self._journal_offset > JOURNAL_COMPACT_BYTES:
+                self._compact_locked()
 
     def save(self):
         """
         Save the pitch accent database to disk.
+        Merges whatever other processes have written, writes a consistent
+        snapshot to a temporary file, swaps it in and empties the journal.
+        """
+        with self._save_lock, self.file_lock:
+            if self.sharded:
+                self.db.flush()
+                self._save_bloom_locked()
+                return
+            self._refresh_locked()
+            with self._lock:
+                self._pending = {}
+            self._compact_locked()
+
+    def refresh(self) -> bool:
+        """
+        Pick up entries written by other processes.
+        Only stats the files unless something changed, and then reads just the
+        new part of the journal. Returns True if new data was loaded.
+        """
+        with self._save_lock:
+            return self._refresh_locked()
+
+    def _refresh_locked(self) -> bool:
+        """
+        refresh() body; caller holds _save_lock.
+        """
+        if self.sharded:
+            bloom_changed = self._refresh_bloom()
+            reloaded = self.db.refresh()
+            with self._lock:
+                for dict_form, entry in reloaded:
+                    self._index_entry(dict_form, entry)
+            if not reloaded and not bloom_changed:
+                return False
+            self.generation = max(self.generation, self._load_generation())
+            return True
+        main_signature = self._file_signature(self.db_path)
+        journal_size = os.path.getsize(self.journal_path) if os.path.exists(self.journal_path) else 0
+        if main_signature != self._main_signature or journal_size < self._journal_offset:
+            # Another process compacted the journal into the main file
+            self._load()
+        elif journal_size > self._journal_offset:
+            self._read_journal()
+        else:
+            return False
+        self.generation = max(self.generation, self._load_generation())
+        return True
+
+    def _load(self):
+        """
+        Load the main file and the journal, keeping unsaved local entries.
+        """
+        data = {}
+        if os.path.exists(self.db_path):
+            with open(self.db_path, encoding="utf-8") as f:
+                data = json.load(f)
+        self._main_signature = self._file_signature(self.db_path)
+        store = EntryStore(data)
+        with self._lock:
+            store.update(self._pending)
+            self.db = store
+            self.key_index = Trie()
+            self.reading_index = Trie()
+            for dict_form, entry in store.to_dict().items():
+                self._index_entry(dict_form, entry)
+        self._journal_offset = 0
+        self._read_journal()
+
+    def _read_journal(self):
+        """
+        Apply journal lines past the current offset.
         """
+        if not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path, "rb") as f:
+            f.seek(self._journal_offset)
+            data = f.read()
+        # Ignore a trailing partial line; it is read once complete
+        end = data.rfind(b"\n") + 1
+        with self._lock:
+            for line in data[:end].splitlines():
+                try:
+                    dict_form, entry = json.loads(line)
+                except ValueError:
+                    continue
+                if dict_form not in self._pending:
+                    self.db[dict_form] = entry
+                    self._index_entry(dict_form, entry)
+        self._journal_offset += end
+
+    def _compact_locked(self):
+        """
+        Write the merged cache to the main file and empty the journal.
+        Caller holds _save_lock and the file lock.
+        """
+        with self._lock:
+            snapshot = self.db.to_dict()
         print(f"Saving cache to {self.db_path}")
-        with open(self.db_path, "w", encoding="utf-8") as f:
-            json.dump(self.db, f, ensure_ascii=False, indent=2)
+        tmp_path = f"{self.db_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.db_path)
+        open(self.journal_path, "w").close()
+        self._main_signature = self._file_signature(self.db_path)
+        self._journal_offset = 0
+
+    @staticmethod
+    def _file_signature(path: str):
+        """
+        Cheap change detector for a file: (mtime_ns, size), or None if missing.
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def bump_generation(self):
+        """
+        Mark cached results as changed.
+        The generation is part of every note fingerprint, so bumping it makes
+        already processed notes eligible for reprocessing. The counter is shared
+        by every process using this cache.
+        """
+        with self.file_lock:
+            generation = max(self.generation, self._load_generation()) + 1
+            with open(self.meta_path, "w", encoding="utf-8") as f:
+                json.dump({"generation": generation}, f)
+            with self._lock:
+                self.generation = generation
+
+    def _index_entry(self, dict_form: str, entry: dict):
+        if self._indexed:
+            self.key_index.insert(dict_form)
+            if entry.get("reading"):
+                self.reading_index.insert(katakana_to_hiragana(entry["reading"]), dict_form)
+
+    def _ensure_index(self):
+        """
+        Build the tries of a sharded cache from its shard files, once.
+        """
+        if self._indexed:
+            return
+        with self._lock:
+            if self._indexed:
+                return
+            self._indexed = True
+            for dict_form, entry in self.db.disk_items():
+                self._index_entry(dict_form, entry)
+
+    def decompose(self, word: str):
+        """
+        Split a word missing from the cache into cached components, using the
+        fewest (and so longest) components. Returns the list of component
+        dict_forms, or None if the word cannot be covered by two or more of them.
+        Runs in time proportional to the word length, not the cache size.
+        """
+        self._ensure_index()
+        segments = self.key_index.segment(word)
+        if not segments or len(segments) < 2:
+            return None
+        return segments
+
+    def decompose_reading(self, reading: str):
+        """
+        Split a hiragana reading into cached readings. Returns a list of
+        (reading segment, sorted dict_forms with that reading), or None.
+        """
+        self._ensure_index()
+        reading = katakana_to_hiragana(reading)
+        segments = self.reading_index.segment(reading)
+        if not segments or len(segments) < 2:
+            return None
+        return [(segment, sorted(self.reading_index.get(segment))) for segment in segments]
+
+    def cache_stats(self) -> dict:
+        """
+        Entry count of the cache, plus working set statistics of the offline
+        dictionary (resident size, hit ratio, evictions) when one is configured.
+        """
+        if self.sharded:
+            # len() would load every shard
+            stats = self.db.stats()
+        else:
+            stats = {'cached_entries': len(self.db)}
+        if self.working_set is not None:
+            stats['offline'] = self.working_set.stats()
+        if self.bloom is not None:
+            stats['bloom'] = {
+                'keys': self.bloom.count,
+                'capacity': self.bloom.capacity,
+                'error_rate': self.bloom.error_rate,
+                'skipped_probes': self.bloom_skips
+            }
+        return stats
+
+    def _bloom_source(self) -> str:
+        """
+        Identifies the key set the filter covers; the filter is rebuilt when it changes.
+        """
+        parts = []
+        if self.sharded:
+            parts.append(f"shards={self.db.num_shards}")
+        if self.offline is not None:
+            parts.append(f"offline={self._file_signature(self.offline.path)}")
+        return ";".join(parts)
+
+    def _init_bloom(self):
+        """
+        Load the persisted filter, rebuilding it if missing, stale or overfull.
+        """
+        bloom = BloomFilter.load(self.bloom_path)
+        if bloom is None or bloom.source != self._bloom_source() or bloom.overfull \
+                or bloom.error_rate != self.bloom_error_rate:
+            with self.file_lock:
+                self._build_bloom_locked()
+        else:
+            self.bloom = bloom
+            self._bloom_signature = self._file_signature(self.bloom_path)
+
+    def _build_bloom_locked(self):
+        """
+        Build the filter from every key on disk and save it. Caller holds the file lock.
+        """
+        keys = []
+        if self.sharded:
+            keys.extend(self.db.disk_keys())
+        if self.offline is not None:
+            keys.extend(self.offline.keys())
+        print(f"Building Bloom filter over {len(keys)} keys")
+        # Leave room to grow before the false positive rate degrades
+        bloom = BloomFilter(max(2 * len(keys), 10000), self.bloom_error_rate, self._bloom_source())
+        for key in keys:
+            bloom.add(key)
+        bloom.save(self.bloom_path)
+        self.bloom = bloom
+        self._bloom_dirty = False
+        self._bloom_signature = self._file_signature(self.bloom_path)
+
+    def _save_bloom_locked(self):
+        """
+        Merge keys added here into the persisted filter. Caller holds the file lock.
+        """
+        if not self._bloom_dirty:
+            return
+        self._refresh_bloom()
+        if self.bloom.overfull:
+            self._build_bloom_locked()
+            return
+        self._bloom_dirty = False
+        self.bloom.save(self.bloom_path)
+        self._bloom_signature = self._file_signature(self.bloom_path)
+
+    def _bloom_recheck(self, dict_form: str) -> bool:
+        """
+        Test a key the loaded filter rejects again, in case another process
+        has added it since: if the persisted filter changed, refresh (new
+        filter bits and entries) first. Costs a stat when nothing changed.
+        """
+        with self._save_lock:
+            if self._file_signature(self.bloom_path) == self._bloom_signature:
+                return False
+            self._refresh_locked()
+        return dict_form in self.bloom
+
+    def _refresh_bloom(self) -> bool:
+        """
+        Union in keys other processes added to the persisted filter.
+        """
+        if self.bloom is None:
+            return False
+        signature = self._file_signature(self.bloom_path)
+        if signature == self._bloom_signature:
+            return False
+        on_disk = BloomFilter.load(self.bloom_path)
+        self._bloom_signature = signature
+        if on_disk is None or not self.bloom.compatible(on_disk):
+            return False
+        with self._lock:
+            self.bloom.update(on_disk)
+        return True
+
+    def _load_generation(self) -> int:
+        """
+        Read the cache generation from the metadata file (0 if absent).
+        """
+        if not os.path.exists(self.meta_path):
+            return 0
+        try:
+            with open(self.meta_path, encoding="utf-8") as f:
+                return int(json.load(f).get("generation", 0))
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable cache metadata: {e}")
+            return 0
+
+    def lookup_batch(self, words):
+        """
+        Look up many words, resolving each distinct word once.
+        New entries are written to disk in a single flush at the end.
+        Returns a dict mapping each distinct word to its pitch info (or None).
+        """
+        results = {}
+        # Deferral is per thread so other callers keep saving as usual
+        self._local.defer_save = True
+        try:
+            for word in dict.fromkeys(words):
+                results[word] = self.lookup_with_cache(word)
+        finally:
+            self._local.defer_save = False
+            if self._pending and self.autosave:
+                self.flush()
+        return results
+
+    def _ojad_request(self, url: str):
+        """
+        GET an OJAD page through the lookup scheduler and rate limiter.
+        The request runs at the calling thread's priority class.
+        """
+        def request():
+            self.rate_limiter.wait()
+            return requests.get(url, timeout=self.timeout)
+        return self.scheduler.run(request)
 
     def fetch_from_ojad(self, dict_form: str):
         """
@@ -107,7 +618,7 @@ class PitchDB:
         try:
             target_url = url + dict_form
             print(f"Making request to {target_url}")
-            resp = requests.get(target_url, timeout=10)
+            resp = self._ojad_request(target_url)
             resp.raise_for_status()
             print("Got response from OJAD")
             soup = BeautifulSoup(resp.text, "html.parser")
@@ -189,39 +700,7 @@ class PitchDB:
         Find the reading that best matches the search word.
         For conjugated forms, we need to find the specific conjugation.
         """
-        # First, try exact match
-        for reading_data in all_readings:
-            if reading_data['reading'] == search_word:
-                return reading_data
-        
-        # If no exact match, try to find the conjugated form
-        # Look for the specific conjugation that matches what we're searching for
-        for reading_data in all_readings:
-            reading = reading_data['reading']
-            
-            # Check if this reading matches the search word's reading
-            # For example, if searching for "買います", look for "かいます"
-            if reading == search_word:
-                return reading_data
-            
-            # Also check if the reading is contained in the search word's reading
-            # This handles cases where the search word might be in a different format
-            if len(reading) > 2 and search_word.endswith(reading):
-                return reading_data
-        
-        # If still no match, try to find the most similar reading
-        # This is a fallback for cases where exact matching fails
-        for reading_data in all_readings:
-            reading = reading_data['reading']
-            # Check for partial matches
-            if any(char in reading for char in search_word) or any(char in search_word for char in reading):
-                return reading_data
-        
-        # If still no match, return the first reading (fallback)
-        if all_readings:
-            return all_readings[0]
-        
-        return None
+        return ReadingIndex(all_readings).best_match(search_word)
 
     def analyze_word(self, word: str):
         """
@@ -232,20 +711,23 @@ class PitchDB:
         - pos
         or None if analysis failed.
         """
-        tokens = self.tokenizer.tokenize(word, self.mode)
-        if not tokens:
-            return None
-        token = tokens[0]
-        return {
-            "surface": token.surface(),
-            "dict_form": token.dictionary_form(),
-            "reading": token.reading_form(),
-            "pos": token.part_of_speech()
-        }
+        # SudachiPy tokenizers cannot be used from two threads at once
+        with self._tokenizer_lock:
+            tokens = self.tokenizer.tokenize(word, self.mode)
+            if not tokens:
+                return None
+            token = tokens[0]
+            return {
+                "surface": token.surface(),
+                "dict_form": token.dictionary_form(),
+                "reading": token.reading_form(),
+                "pos": token.part_of_speech()
+            }
 
     def lookup_with_cache(self, word: str):
         """
-        Looks up a word for pitch accent info, first in cache, then OJAD, then fallback to reading.
+        Looks up a word for pitch accent info, first in the built-in tables, then cache,
+        then OJAD, then fallback to reading.
         Returns a dict of pitch info.
         """
         print(f"\nLooking up {word} with cache...")
@@ -263,13 +745,40 @@ class PitchDB:
         hiragana_reading = katakana_to_hiragana(reading)
         print(f"Hiragana reading: {hiragana_reading}")
         
-        # First, check cache
+        # Closed-class words and loanwords come from the built-in tables
+        if analysis["surface"] == word:
+            # Imported here: accent_tables itself imports this module
+            from accent_tables import word_accent
+            predicted = word_accent(word, reading, analysis["pos"])
+            if predicted is not None:
+                print(f"Found in accent tables ({predicted['rule']})")
+                return predicted
+
+        # Then check cache (including entries other processes just added)
         result = self.lookup(dict_form)
+        if result is None and self.refresh():
+            result = self.lookup(dict_form)
         if result is not None:
             print("Found in cache")
             return result
 
-        # Second, try OJAD with the hiragana reading
+        # Next, predict compound nouns from their components
+        if analysis["pos"][0] == '名詞':
+            predicted = self.predict_compound(dict_form, hiragana_reading)
+            if predicted is not None:
+                print(f"Predicted compound accent ({predicted['rule']})")
+                self.add_entry(dict_form, predicted['reading'], predicted['drop_pos'],
+                               predicted['num_mora'], predicted['pitch_type'], source=predicted['source'])
+                return predicted
+
+        # A confident model prediction saves the network request
+        model_prediction = self.predict_accent(dict_form, hiragana_reading, analysis["pos"][0])
+        if model_prediction is not None and model_prediction['confidence'] >= self.model_confidence:
+            print(f"Predicted by accent model (confidence {model_prediction['confidence']:.2f})")
+            self._add_prediction(dict_form, model_prediction)
+            return model_prediction
+
+        # Then try OJAD with the hiragana reading
         print("Not in cache, trying OJAD...")
         ojad_result = self.fetch_from_ojad_with_reading(dict_form, hiragana_reading)
         if ojad_result:
@@ -284,21 +793,129 @@ class PitchDB:
                 "pitch_type_label": PITCH_TYPE_LABELS[pitch_type]
             }
 
-        # Third, fallback to SudachiPy reading (convert katakana to hiragana)
+        # Finally, the model's best guess, or Heiban with the SudachiPy reading
+        if model_prediction is not None:
+            print(f"OJAD failed, using accent model (confidence {model_prediction['confidence']:.2f})")
+            self._add_prediction(dict_form, model_prediction)
+            return model_prediction
         print("OJAD failed, using SudachiPy reading with default pitch")
         reading = hiragana_reading
         drop_pos = 0
-        num_mora = len(reading)
+        num_mora = count_mora(reading)
         pitch_type = 0
-        self.add_entry(dict_form, reading, drop_pos, num_mora, pitch_type)
+        self.add_entry(dict_form, reading, drop_pos, num_mora, pitch_type, source=FALLBACK_SOURCE)
         return {
             "reading": reading,
             "drop_pos": drop_pos,
             "num_mora": num_mora,
             "pitch_type": pitch_type,
-            "pitch_type_label": PITCH_TYPE_LABELS[pitch_type]
+            "pitch_type_label": PITCH_TYPE_LABELS[pitch_type],
+            "source": FALLBACK_SOURCE
         }
+
+    def _add_prediction(self, dict_form: str, prediction: dict):
+        self.add_entry(dict_form, prediction['reading'], prediction['drop_pos'],
+                       prediction['num_mora'], prediction['pitch_type'], source=prediction['source'])
+
+    def predict_accent(self, word: str, reading: str, pos: str):
+        """
+        Accent model prediction for word (with a 'confidence' key), or None
+        without a model or a matching context.
+        """
+        if self.accent_model is None:
+            return None
+        return self.accent_model.predict(word, reading, pos)
+
+    def train_accent_model(self, path: str = None):
+        """
+        Train the accent model on every looked-up entry of the cache and the
+        offline dictionary (predicted entries are left out), save it to path
+        (default: accent_model_path) and start using it.
+        """
+        # Imported here: accent_model itself imports this module
+        from accent_model import AccentModel, ACCENT_MODEL_PATH
+
+        path = path or self.accent_model_path or ACCENT_MODEL_PATH
+        model = AccentModel.train(self._training_samples())
+        model.save(path)
+        self.accent_model_path = path
+        self.accent_model = model
+        return model
+
+    def _training_samples(self):
+        items = self.db.disk_items() if self.sharded else self.db.to_dict().items()
+        for dict_form, entry in items:
+            if entry.get('source'):
+                continue
+            yield self._training_sample(dict_form, entry)
+        if self.offline is not None:
+            for dict_form in self.offline.keys():
+                if dict_form in self.db:
+                    continue
+                entry = self.offline.get(dict_form)
+                if entry is not None:
+                    yield self._training_sample(dict_form, entry)
+
+    def _training_sample(self, dict_form: str, entry: dict):
+        analysis = self.analyze_word(dict_form)
+        pos = analysis["pos"][0] if analysis else ""
+        return dict_form, entry['reading'], entry['drop_pos'], pos
     
+    def predict_compound(self, word: str, reading: str):
+        """
+        Predict the accent of a compound noun from components found locally
+        (cache or offline dictionary). Returns pitch info tagged with its
+        source, or None if the components are unknown or the rules are unsure.
+        """
+        # Imported here: compound_accent itself imports this module
+        from compound_accent import predict_compound_accent
+
+        components = self._compound_components(word)
+        if components is None:
+            return None
+        prediction = predict_compound_accent(components, katakana_to_hiragana(reading))
+        if prediction is None or prediction['uncertain']:
+            return None
+        return prediction
+
+    def _compound_components(self, word: str):
+        """
+        (surface, reading, entry) per component of word, or None unless every
+        component is found locally. Sudachi's short units come first; words it
+        keeps whole are split into cached words with the trie. Words with a
+        prefix unit (お茶, ご飯) are not compounds. Guessed or predicted
+        entries do not count as found, so guesses are never stacked.
+        """
+        # Imported here: both modules import this one
+        from compound_accent import COMPOUND_SOURCE
+        from conjugation import GUESSED_SOURCES
+
+        with self._tokenizer_lock:
+            morphemes = self.tokenizer.tokenize(word, tokenizer.Tokenizer.SplitMode.A)
+            if any(m.part_of_speech()[0] == '接頭辞' for m in morphemes):
+                return None
+            units = [(m.surface(), katakana_to_hiragana(m.reading_form())) for m in morphemes]
+        if len(units) < 2:
+            segments = self.decompose(word)
+            if not segments:
+                return None
+            units = [(segment, None) for segment in segments]
+        components = []
+        for surface, reading in units:
+            entry = self.lookup(surface)
+            if entry is None or entry.get('source') in GUESSED_SOURCES | {COMPOUND_SOURCE}:
+                return None
+            components.append((surface, reading or entry['reading'], entry))
+        return components
+
+    def predicted_entries(self) -> dict:
+        """
+        dict_form -> source for every cached entry that was predicted rather
+        than looked up, e.g. to verify them against OJAD later.
+        """
+        items = self.db.disk_items() if self.sharded else self.db.to_dict().items()
+        return {dict_form: entry['source'] for dict_form, entry in items if entry.get('source')}
+
     def lookup_conjugated_form(self, conjugated_surface: str, conjugated_reading: str, dict_form: str):
         """
         Look up a conjugated form specifically.
@@ -339,7 +956,7 @@ class PitchDB:
         try:
             target_url = url + dict_form
             print(f"Making request to {target_url}")
-            resp = requests.get(target_url, timeout=10)
+            resp = self._ojad_request(target_url)
             resp.raise_for_status()
             print("Got response from OJAD")
             soup = BeautifulSoup(resp.text, "html.parser")
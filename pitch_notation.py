@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Compact pitch notation for the Pitch field.
+Instead of rendered HTML a note can store its contour as a line of text,
+"p1:<morae>:<high bits>:<accent bits>:<text>", with the masks in hex (bit i =
+mora i, as in contour.Contour) and the annotated text last. The card
+template's script (NOTATION_RENDERER_JS) draws it as the compact SVG HTML when
+the card is shown, so the field stays a few dozen bytes and restyling needs no
+reprocessing. decode_notation() and render_notation_html() are the reference
+the script is tested against.
+"""
+
+import re
+
+from contour import Contour
+from pitch_svg import generate_pitch_html, POINT_SPACING, MARGIN, VERTICAL_GAP, COMPACT_SVG_CLASS
+
+NOTATION_PREFIX = "p1:"
+# Fingerprint renderer id for notation fields; bump with NOTATION_PREFIX
+RENDERER_ID = "notation-1"
+
+_NOTATION = re.compile(r"p1:(\d+):([0-9a-f]+):([0-9a-f]+):(.*)", re.DOTALL)
+
+
+def encode_contour(contour: Contour, text: str = "") -> str:
+    """
+    Notation for a contour and the text it annotates.
+    """
+    return f"{NOTATION_PREFIX}{contour.length}:{contour.high:x}:{contour.accent:x}:{text}"
+
+
+def encode_notation(pitch_pattern: list, accent_positions: list, text: str = "") -> str:
+    """
+    Notation for an H/L pattern and accent positions.
+    """
+    return encode_contour(Contour.from_lists(pitch_pattern, accent_positions), text)
+
+
+def is_notation(value: str) -> bool:
+    return _NOTATION.fullmatch(value.strip()) is not None
+
+
+def decode_notation(notation: str) -> tuple:
+    """
+    Return (contour, text) of a notation.
+    Raises ValueError if it is not one.
+    """
+    match = _NOTATION.fullmatch(notation.strip())
+    if not match:
+        raise ValueError(f"not a pitch notation: {notation[:40]!r}")
+    length, high, accent, text = match.groups()
+    return Contour(int(high, 16), int(accent, 16), int(length)), text
+
+
+def render_notation_html(notation: str, mode: str = "compact") -> str:
+    """
+    The HTML the card template draws for a notation.
+    """
+    contour, text = decode_notation(notation)
+    return generate_pitch_html(contour.pattern(), contour.accents(), text, mode=mode)
+
+
+# Draws every .pitch element holding a notation as generate_pitch_html() does
+# in compact mode; other content (HTML stored by older versions) is left as is.
+# pitchNotationHtml() returns null for anything that is not a notation.
+NOTATION_RENDERER_JS = (
+    f"var PITCH_SPACING = {POINT_SPACING}, PITCH_MARGIN = {MARGIN}, PITCH_LOW = {MARGIN + VERTICAL_GAP}, "
+    f"PITCH_CLASS = \"{COMPACT_SVG_CLASS}\";\n"
+    r"""function pitchNotationHtml(notation) {
+    var match = /^p1:(\d+):([0-9a-f]+):([0-9a-f]+):([\s\S]*)$/.exec(notation.trim());
+    if (!match) {
+        return null;
+    }
+    var count = parseInt(match[1], 10), text = match[4];
+    function bit(hex, i) {
+        var digit = hex.length - 1 - (i >> 2);
+        return digit >= 0 && (parseInt(hex.charAt(digit), 16) >> (i & 3)) & 1;
+    }
+    function step(dx, dy) {
+        return dy < 0 ? dx + "" + dy : dx + " " + dy;
+    }
+    function dotPath(points) {
+        var path = "M" + points[0][0] + " " + points[0][1] + "h0";
+        for (var i = 1; i < points.length; i++) {
+            path += "m" + step(points[i][0] - points[i - 1][0], points[i][1] - points[i - 1][1]) + "h0";
+        }
+        return path;
+    }
+    var svg = "";
+    if (count > 0) {
+        var textLength = Array.from(text).length, spacing = PITCH_SPACING;
+        if (textLength > count) {
+            spacing = Math.floor(spacing * (textLength / count));
+        }
+        var points = [], accents = [], steps = [];
+        for (var i = 0; i < count; i++) {
+            points.push([PITCH_MARGIN + i * spacing, bit(match[2], i) ? PITCH_MARGIN : PITCH_LOW]);
+            if (bit(match[3], i)) {
+                accents.push(points[i]);
+            }
+            if (i > 0) {
+                steps.push(step(spacing, points[i][1] - points[i - 1][1]));
+            }
+        }
+        svg = '<svg class="' + PITCH_CLASS + '" width="' + (PITCH_MARGIN * 2 + (count - 1) * spacing) + '">' +
+            (steps.length ? '<path d="M' + points[0][0] + " " + points[0][1] + "l" + steps.join(" ") + '"/>' : "") +
+            '<path class="d" d="' + dotPath(points) + '"/>' +
+            (accents.length ? '<path class="a" d="' + dotPath(accents) + '"/>' : "") + "</svg>";
+    }
+    return (text ? "<div>" + text + "</div>" : "") + svg;
+}
+if (typeof document !== "undefined") {
+    var pitchElements = document.querySelectorAll(".pitch");
+    for (var p = 0; p < pitchElements.length; p++) {
+        var pitchHtml = pitchNotationHtml(pitchElements[p].innerHTML);
+        if (pitchHtml !== null) {
+            pitchElements[p].innerHTML = pitchHtml;
+        }
+    }
+}
+""")
+
+PITCH_SCRIPT = f"<script>\n{NOTATION_RENDERER_JS}</script>\n"
+
+# Pitch field placement for the back template, with its renderer
+PITCH_TEMPLATE = f'''
+<div class="pitch">{{{{Pitch}}}}</div>
+{PITCH_SCRIPT}'''
+
+_PITCH_PLACEMENT = re.compile(r'(<div class="pitch">\s*)?\{\{\s*Pitch\s*\}\}')
+
+
+def add_notation_renderer(template: str) -> str:
+    """
+    A card template that draws pitch notation: each {{Pitch}} placement is
+    wrapped in <div class="pitch"> and the script is appended. Templates
+    without {{Pitch}} or with the script already are returned unchanged.
+    """
+    if 'pitchNotationHtml' in template or not _PITCH_PLACEMENT.search(template):
+        return template
+    wrapped = _PITCH_PLACEMENT.sub(
+        lambda match: match.group(0) if match.group(1) else f'<div class="pitch">{match.group(0)}</div>', template)
+    return wrapped.rstrip("\n") + "\n" + PITCH_SCRIPT
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Compact in-memory storage for pitch cache entries.
+Each cached word is kept as a small __slots__ record instead of a five-key
+dict; the store still behaves like the old dict of dicts for callers.
+"""
+
+import sys
+from collections.abc import MutableMapping
+
+
+class PitchEntry:
+    """
+    One cached word. The integer fields are small enough to point at Python's
+    shared small-int objects, and readings are interned so repeated readings
+    share one string. source records how a predicted entry was derived
+    (None for entries looked up from OJAD or a dictionary).
+    """
+
+    __slots__ = ("reading", "drop_pos", "num_mora", "pitch_type", "meaning", "source")
+
+    def __init__(self, reading: str, drop_pos: int, num_mora: int, pitch_type: int, meaning: str = None,
+                 source: str = None):
+        self.reading = sys.intern(reading) if reading else reading
+        self.drop_pos = drop_pos
+        self.num_mora = num_mora
+        self.pitch_type = pitch_type
+        self.meaning = meaning
+        self.source = sys.intern(source) if source else None
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "PitchEntry":
+        return cls(data["reading"], data["drop_pos"], data["num_mora"], data["pitch_type"], data.get("meaning"),
+                   data.get("source"))
+
+    def to_dict(self) -> dict:
+        data = {
+            "reading": self.reading,
+            "drop_pos": self.drop_pos,
+            "num_mora": self.num_mora,
+            "pitch_type": self.pitch_type,
+            "meaning": self.meaning
+        }
+        if self.source:
+            # Only predicted entries carry a source, keeping the cache file small
+            data["source"] = self.source
+        return data
+
+    def __eq__(self, other):
+        if not isinstance(other, PitchEntry):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return f"PitchEntry({self.to_dict()})"
+
+
+class EntryStore(MutableMapping):
+    """
+    Dict-like view over compact entries.
+    Values go in and come out as plain dicts (a fresh dict per read), so code
+    written against the old dict of dicts keeps working.
+    """
+
+    def __init__(self, data: dict = None):
+        self._entries = {}
+        if data:
+            self.update(data)
+
+    def __getitem__(self, dict_form: str) -> dict:
+        return self._entries[dict_form].to_dict()
+
+    def get(self, dict_form: str, default=None):
+        entry = self._entries.get(dict_form)
+        return entry.to_dict() if entry is not None else default
+
+    def __setitem__(self, dict_form: str, value):
+        if not isinstance(value, PitchEntry):
+            value = PitchEntry.from_dict(value)
+        self._entries[sys.intern(dict_form)] = value
+
+    def __delitem__(self, dict_form: str):
+        del self._entries[dict_form]
+
+    def __contains__(self, dict_form) -> bool:
+        return dict_form in self._entries
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def entry(self, dict_form: str):
+        """
+        Return the compact record itself (or None), without building a dict.
+        """
+        return self._entries.get(dict_form)
+
+    def to_dict(self) -> dict:
+        """
+        Plain dict of dicts, e.g. for JSON serialization.
+        """
+        return {dict_form: entry.to_dict() for dict_form, entry in self._entries.items()}
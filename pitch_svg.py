@@ -1,4 +1,8 @@
 import math
+from functools import lru_cache
+
+# Bump whenever the rendered output changes so stored Pitch fields are regenerated
+RENDERER_VERSION = 1
 
 def get_pitch_pattern(mora_count: int, drop_pos: int) -> list[str]:
     """
@@ -68,86 +72,176 @@ def get_accent_position(mora_count: int, drop_pos: int) -> list[bool]:
     
     return accent_positions
 
-def generate_pitch_svg(pitch_pattern: list[str], accent_positions: list[bool], text_length: int = None) -> str:
+# SVG parameters - adjusted for more compact display
+CIRCLE_RADIUS = 3
+CIRCLE_STROKE = 0.75
+POINT_SPACING = 15  # Reduced spacing between points
+VERTICAL_GAP = 8    # Reduced vertical gap
+MARGIN = 8          # Reduced margin
+
+# Rendered SVGs kept by (pattern, accents, spacing, mode); word patterns come
+# from a small set and sentences repeat across a deck
+SVG_CACHE_SIZE = 4096
+
+# "full" styles every element inline; "compact" draws the line and the dots as
+# three relative paths styled by COMPACT_SVG_CSS, which the note type carries,
+# and wraps them in classless divs
+SVG_MODES = ("full", "compact")
+
+# Bump whenever the compact output changes (RENDERER_VERSION covers "full")
+COMPACT_RENDERER_VERSION = 2
+
+# Class of compact SVGs (short: it is stored in every Pitch field)
+COMPACT_SVG_CLASS = "pa"
+
+# The height is the same for every SVG, so it lives here. Dots are zero-length
+# round-capped strokes: a black dot (.d) as wide as a circle with its outline,
+# and a white one (.a) as wide as the circle's inside on accents
+COMPACT_SVG_CSS = f'''
+svg.{COMPACT_SVG_CLASS} {{
+    height: {MARGIN + VERTICAL_GAP + CIRCLE_RADIUS * 2}px;
+    fill: none;
+    stroke: black;
+    stroke-width: {CIRCLE_STROKE};
+    stroke-linecap: round;
+}}
+
+svg.{COMPACT_SVG_CLASS} .d {{
+    stroke-width: {CIRCLE_RADIUS * 2 + CIRCLE_STROKE};
+}}
+
+svg.{COMPACT_SVG_CLASS} .a {{
+    stroke: white;
+    stroke-width: {CIRCLE_RADIUS * 2 - CIRCLE_STROKE};
+}}
+'''
+
+def renderer_id(mode: str = "full"):
+    """
+    Renderer identity for note fingerprints: changes with the output format.
+    """
+    return RENDERER_VERSION if mode == "full" else f"{RENDERER_VERSION}-{mode}{COMPACT_RENDERER_VERSION}"
+
+def generate_pitch_svg(pitch_pattern: list[str], accent_positions: list[bool], text_length: int = None,
+                       mode: str = "full") -> str:
     """
     Generate SVG for a pitch accent pattern.
     pitch_pattern: list of 'H' (high position) or 'L' (low position)
     accent_positions: list of booleans where True = accent mora (white dot), False = normal mora (black dot)
     text_length: length of the text this SVG will annotate (for proportional sizing)
+    mode: "full" (self-contained) or "compact" (needs COMPACT_SVG_CSS)
     Returns: SVG string
     """
+    if mode not in SVG_MODES:
+        raise ValueError(f"unknown SVG mode {mode!r}")
     if not pitch_pattern or not accent_positions:
         return ""
-
-    # SVG parameters - adjusted for more compact display
-    circle_radius = 3
-    circle_stroke = 0.75
-    
-    # Layout parameters
-    point_spacing = 15  # Reduced spacing between points
-    vertical_gap = 8   # Reduced vertical gap
-    margin = 8        # Reduced margin
     
     # Adjust spacing based on text length if provided
+    point_spacing = POINT_SPACING
     if text_length and text_length > len(pitch_pattern):
         # Scale spacing proportionally to text length
         scale_factor = text_length / len(pitch_pattern)
         point_spacing = int(point_spacing * scale_factor)
     
+    return _render_svg(''.join(pitch_pattern), tuple(accent_positions), point_spacing, mode)
+
+@lru_cache(maxsize=SVG_CACHE_SIZE)
+def _render_svg(pattern: str, accents: tuple, point_spacing: int, mode: str) -> str:
+    """
+    Build the SVG of a pattern ('LHH...') with the given point spacing.
+    """
     # Calculate dimensions
-    width = margin * 2 + (len(pitch_pattern) - 1) * point_spacing
-    height = margin + vertical_gap + circle_radius * 2
+    width = MARGIN * 2 + (len(pattern) - 1) * point_spacing
+    height = MARGIN + VERTICAL_GAP + CIRCLE_RADIUS * 2
     
     # Y positions for high and low pitch
-    high_y = margin
-    low_y = high_y + vertical_gap
+    high_y = MARGIN
+    low_y = high_y + VERTICAL_GAP
     
-    # Start SVG
-    svg = f'<svg width="{width}" height="{height}" viewBox="0 0 {width} {height}" xmlns="http://www.w3.org/2000/svg">'
+    # Points based on pitch pattern (high/low positioning)
+    points = [(MARGIN + i * point_spacing, high_y if pitch == 'H' else low_y) for i, pitch in enumerate(pattern)]
+    
+    if mode == "compact":
+        return _compact_svg(points, accents, width)
+    
+    parts = [f'<svg width="{width}" height="{height}" viewBox="0 0 {width} {height}" xmlns="http://www.w3.org/2000/svg">']
     
-    # Calculate points based on pitch pattern (high/low positioning)
-    points = []
-    for i, pitch in enumerate(pitch_pattern):
-        x = margin + (i * point_spacing)
-        y = high_y if pitch == 'H' else low_y
-        points.append((x, y))
-
     # Draw connecting lines first
-    path = []
-    for i in range(len(points)):
-        x, y = points[i][0], points[i][1]
-        if i == 0:
-            path.append(f"M {x},{y}")
-        else:
-            path.append(f"L {x},{y}")
-            
-    svg += f'<path d="{" ".join(path)}" stroke="black" fill="none" stroke-width="{circle_stroke}"/>'
+    path = " ".join(f"{'L' if i else 'M'} {x},{y}" for i, (x, y) in enumerate(points))
+    parts.append(f'<path d="{path}" stroke="black" fill="none" stroke-width="{CIRCLE_STROKE}"/>')
     
     # Add circles on top of lines - accent morae are white, others are black
     for i, (x, y) in enumerate(points):
-        is_accent = accent_positions[i]
-        fill_color = "white" if is_accent else "black"
-        svg += f'<circle cx="{x}" cy="{y}" r="{circle_radius}" stroke="black" stroke-width="{circle_stroke}" fill="{fill_color}"/>'
+        fill_color = "white" if accents[i] else "black"
+        parts.append(f'<circle cx="{x}" cy="{y}" r="{CIRCLE_RADIUS}" stroke="black" '
+                     f'stroke-width="{CIRCLE_STROKE}" fill="{fill_color}"/>')
     
-    svg += '</svg>'
-    return svg
+    parts.append('</svg>')
+    return ''.join(parts)
+
+def _compact_svg(points: list, accents: tuple, width: int) -> str:
+    """
+    Build a compact SVG: the line, then all dots, then the accent dots.
+    The height comes from COMPACT_SVG_CSS; the viewBox is left out as it
+    equals the width and height.
+    """
+    x, y = points[0]
+    steps = [f"{x2 - x1}{y2 - y1}" if y2 < y1 else f"{x2 - x1} {y2 - y1}"
+             for (x1, y1), (x2, y2) in zip(points, points[1:])]
+    parts = [f'<svg class="{COMPACT_SVG_CLASS}" width="{width}">']
+    if steps:
+        # A single mora has no line
+        line = ' '.join(steps)
+        parts.append(f'<path d="M{x} {y}l{line}"/>')
+    parts.append(f'<path class="d" d="{_dot_path(points)}"/>')
+    accent_points = [point for point, accent in zip(points, accents) if accent]
+    if accent_points:
+        parts.append(f'<path class="a" d="{_dot_path(accent_points)}"/>')
+    parts.append('</svg>')
+    return ''.join(parts)
+
+def _dot_path(points: list) -> str:
+    """
+    Zero-length subpaths at each point, moving relative after the first.
+    """
+    x, y = points[0]
+    parts = [f"M{x} {y}h0"]
+    for (x1, y1), (x2, y2) in zip(points, points[1:]):
+        dy = y2 - y1
+        parts.append(f"m{x2 - x1}{dy}h0" if dy < 0 else f"m{x2 - x1} {dy}h0")
+    return ''.join(parts)
+
+def svg_cache_info():
+    """
+    Hits, misses and size of the rendered SVG cache.
+    """
+    return _render_svg.cache_info()
 
-def generate_pitch_html(pitch_pattern: list[str], accent_positions: list[bool], text: str = "", label: str = "") -> str:
+def generate_pitch_html(pitch_pattern: list[str], accent_positions: list[bool], text: str = "", label: str = "",
+                        mode: str = "full") -> str:
     """
     Generate HTML with embedded SVG for a pitch accent pattern.
     pitch_pattern: list of 'H' (high), 'L' (low) - for positioning
     accent_positions: list of booleans where True = accent mora (white dot), False = normal mora (black dot)
     text: the text this pattern is annotating (for proportional sizing)
     label: optional label for the pattern
+    mode: SVG mode, see generate_pitch_svg()
     Returns: HTML string with embedded SVG
     """
     text_length = len(text) if text else None
-    svg = generate_pitch_svg(pitch_pattern, accent_positions, text_length)
-    html = f'<div class="pitch-accent-container">'
+    svg = generate_pitch_svg(pitch_pattern, accent_positions, text_length, mode)
+    if mode == "compact":
+        # The SVG carries its own class; the text's div needs none
+        parts = [f'<div>{text}</div>', svg] if text else [svg]
+        if label:
+            parts.append(f'<div class="pattern">{label}</div>')
+        return ''.join(parts)
+    parts = ['<div class="pitch-accent-container">']
     if text:
-        html += f'<div class="word">{text}</div>'
-    html += f'<div class="pitch-accent">{svg}</div>'
+        parts.append(f'<div class="word">{text}</div>')
+    parts.append(f'<div class="pitch-accent">{svg}</div>')
     if label:
-        html += f'<div class="pattern">{label}</div>'
-    html += '</div>'
-    return html 
\ No newline at end of file
+        parts.append(f'<div class="pattern">{label}</div>')
+    parts.append('</div>')
+    return ''.join(parts) 
\ No newline at end of file
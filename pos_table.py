@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Part-of-speech categories as bit flags.
+Sudachi numbers every POS tuple of its dictionary; PosTable maps each
+part_of_speech_id() to an int of category flags once, so classifying a token
+in the sentence loop is a list index and a bitwise and instead of comparing
+tuples of strings.
+"""
+
+from functools import lru_cache
+
+VERB = 1 << 0
+ADJECTIVE = 1 << 1
+AUXILIARY = 1 << 2
+PAST_AUXILIARY = 1 << 3          # 助動詞-タ (かった, ました)
+CONJUNCTIVE_PARTICLE = 1 << 4    # 接続助詞 (て, ば, けど)
+ATTACHING_PARTICLE = 1 << 5      # 格助詞 (が, を, に)
+BOUNDARY_PARTICLE = 1 << 6       # 係助詞 (は, も)
+PUNCTUATION = 1 << 7             # 句点/読点 (。、！？)
+NUMERAL = 1 << 8
+COUNTER = 1 << 9
+
+CONJUGATING = VERB | ADJECTIVE
+PARTICLE = CONJUNCTIVE_PARTICLE | ATTACHING_PARTICLE | BOUNDARY_PARTICLE
+
+
+@lru_cache(maxsize=None)
+def pos_flags(pos: tuple) -> int:
+    """
+    Category flags of a Sudachi POS tuple.
+    """
+    main, sub = pos[0], pos[1]
+    flags = 0
+    if main == '動詞':
+        flags |= VERB
+    elif main == '形容詞':
+        flags |= ADJECTIVE
+    elif main == '助動詞':
+        flags |= AUXILIARY
+        if len(pos) > 4 and pos[4] == '助動詞-タ':
+            flags |= PAST_AUXILIARY
+    elif main == '助詞':
+        if sub == '接続助詞':
+            flags |= CONJUNCTIVE_PARTICLE
+        elif sub == '格助詞':
+            flags |= ATTACHING_PARTICLE
+        elif sub == '係助詞':
+            flags |= BOUNDARY_PARTICLE
+    elif main == '補助記号' and sub in ('句点', '読点'):
+        flags |= PUNCTUATION
+    if sub == '数詞':
+        flags |= NUMERAL
+    elif len(pos) > 2 and pos[2] in ('助数詞', '助数詞可能'):
+        flags |= COUNTER
+    return flags
+
+
+def token_flags(token: dict) -> int:
+    """
+    Flags of a token dict: precomputed by the tokenizer, or derived from its
+    POS tuple for tokens built elsewhere.
+    """
+    flags = token.get('flags')
+    if flags is None:
+        flags = pos_flags(tuple(token['pos']))
+    return flags
+
+
+class PosTable:
+    """
+    POS tuples and category flags of every part_of_speech_id of a Sudachi
+    dictionary, built once per dictionary.
+    """
+
+    def __init__(self, sudachi_dictionary):
+        self.pos = []
+        pos_id = 0
+        while True:
+            pos = sudachi_dictionary.pos_of(pos_id)
+            if pos is None:
+                break
+            self.pos.append(tuple(pos))
+            pos_id += 1
+        self.flags = [pos_flags(pos) for pos in self.pos]
+
+    def __len__(self) -> int:
+        return len(self.pos)
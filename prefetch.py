@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Idle-time cache prefetch.
+Walks the Expression texts of the collection, finds vocabulary that is not in
+the pitch cache yet and fetches it from OJAD in a low-priority background
+thread. Only the cache is written; notes are never touched.
+"""
+
+import threading
+
+from sudachipy import tokenizer
+from sudachipy import dictionary
+from utils import katakana_to_hiragana
+from accent_tables import word_accent
+import lookup_scheduler
+
+# Tokens that never need a pitch lookup
+SKIPPED_POS = {'補助記号', '空白'}
+
+
+class CachePrefetcher:
+    """
+    Prefetches pitch data for collection vocabulary missing from a PitchDB.
+    The background thread runs at prefetch priority, so its requests queue in
+    the database's lookup scheduler and OJAD rate limiter behind interactive and
+    backfill lookups. The work also pauses whenever is_busy() reports that the
+    user is reviewing or editing.
+    """
+
+    def __init__(self, db, texts, is_busy=None, idle_poll: float = 2.0):
+        """
+        db: the PitchDB to warm
+        texts: callable returning an iterable of Expression texts; it is called
+               from the background thread, so it must not touch the collection
+        is_busy: optional callable; prefetching pauses while it returns True
+        idle_poll: seconds between busy checks while paused
+        """
+        self.db = db
+        self.texts = texts
+        self.is_busy = is_busy
+        self.idle_poll = idle_poll
+        # Separate tokenizer: SudachiPy tokenizers must not be shared across threads
+        self.tokenizer = dictionary.Dictionary().create()
+        self.mode = tokenizer.Tokenizer.SplitMode.C
+        self._stop = threading.Event()
+        self._thread = None
+        self.stats = {'missing': 0, 'fetched': 0, 'failed': 0}
+
+    def start(self):
+        """
+        Start prefetching in a daemon thread.
+        """
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run_safely, name="pitch-prefetch", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> bool:
+        """
+        Stop the background thread after its current request and wait for it.
+        Returns False if it is still running after timeout seconds.
+        """
+        self._stop.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+            return not self._thread.is_alive()
+        return True
+
+    def missing_words(self, texts) -> list:
+        """
+        Tokenize texts and return (dict_form, hiragana_reading) pairs for every
+        distinct dictionary form that is not cached yet.
+        """
+        missing = {}
+        for text in texts:
+            if self._stop.is_set():
+                break
+            for token in self.tokenizer.tokenize(text, self.mode):
+                if token.part_of_speech()[0] in SKIPPED_POS:
+                    continue
+                if word_accent(token.surface(), token.reading_form(), token.part_of_speech()):
+                    continue  # Answered by the built-in tables
+                dict_form = token.dictionary_form()
+                if dict_form in missing or self.db.lookup(dict_form) is not None:
+                    continue
+                missing[dict_form] = self._dict_form_reading(dict_form, token)
+        return list(missing.items())
+
+    def run(self) -> dict:
+        """
+        Prefetch synchronously. Returns counts of missing, fetched and failed words.
+        """
+        words = self.missing_words(self.texts())
+        self.stats['missing'] = len(words)
+        print(f"Prefetch: {len(words)} words missing from cache")
+
+        for dict_form, reading in words:
+            if not self._wait_until_idle():
+                break
+            if self.db.lookup(dict_form) is not None:
+                continue  # Looked up interactively in the meantime
+            result = self.db.fetch_from_ojad_with_reading(dict_form, reading)
+            if result:
+                self.db.add_entry(dict_form, *result)
+                self.stats['fetched'] += 1
+            else:
+                # Leave it uncached so an interactive lookup can still try
+                self.stats['failed'] += 1
+
+        print(f"Prefetch finished: {self.stats}")
+        return self.stats
+
+    def _run_safely(self):
+        try:
+            with lookup_scheduler.priority(lookup_scheduler.PREFETCH):
+                self.run()
+        except Exception as e:
+            print(f"Prefetch stopped: {e}")
+
+    def _wait_until_idle(self) -> bool:
+        """
+        Pause while the user is busy. Returns False if asked to stop.
+        """
+        while self.is_busy and self.is_busy():
+            if self._stop.wait(self.idle_poll):
+                return False
+        return not self._stop.is_set()
+
+    def _dict_form_reading(self, dict_form: str, token) -> str:
+        """
+        Reading of the dictionary form (the token itself may be conjugated).
+        """
+        if token.surface() == dict_form:
+            return katakana_to_hiragana(token.reading_form())
+        analysis = self.tokenizer.tokenize(dict_form, self.mode)
+        if analysis:
+            return katakana_to_hiragana(analysis[0].reading_form())
+        return katakana_to_hiragana(token.reading_form())
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Reading index for one OJAD result page.
+Replaces the linear passes of the old matcher: an exact hash, a suffix lookup
+over the search word, and an edit-distance fallback that only visits
+candidates whose length could still beat the best match so far.
+"""
+
+from utils import katakana_to_hiragana
+
+
+def edit_distance(a: str, b: str, limit: int = None) -> int:
+    """
+    Levenshtein distance between a and b. With limit, returns limit + 1 as
+    soon as the distance is known to exceed it.
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        if limit is not None and min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class ReadingIndex:
+    """
+    Indexes the readings extracted from an OJAD word row.
+    readings: list of dicts with at least a 'reading' key, in page order.
+    best_match() always returns the same candidate for the same page and query.
+    """
+
+    # Shortest reading accepted as a suffix match (shorter ones are mostly endings)
+    MIN_SUFFIX_LENGTH = 3
+
+    def __init__(self, readings: list):
+        self.readings = readings
+        self._normalized = [katakana_to_hiragana(reading_data['reading']) for reading_data in readings]
+        self._exact = {}
+        for position, reading in enumerate(self._normalized):
+            # Keep the first occurrence, so page order breaks ties
+            self._exact.setdefault(reading, position)
+        # Length buckets for the fuzzy fallback, built only if it is needed
+        self._by_length = None
+
+    def best_match(self, search_word: str):
+        """
+        Best candidate for search_word (a reading, or the word itself):
+        1. exact reading
+        2. longest reading that is a suffix of the search word
+        3. smallest edit distance (ties: longer common prefix, then page order),
+           if close enough to be the same word
+        4. the first reading on the page
+        Returns the reading dict, or None for an empty page.
+        """
+        if not self.readings:
+            return None
+        search_word = katakana_to_hiragana(search_word)
+
+        position = self._exact.get(search_word)
+        if position is not None:
+            return self.readings[position]
+
+        position = self._suffix_match(search_word)
+        if position is not None:
+            return self.readings[position]
+
+        position = self._closest(search_word)
+        if position is not None:
+            return self.readings[position]
+
+        return self.readings[0]
+
+    def _suffix_match(self, search_word: str):
+        # One hash probe per suffix, longest first
+        for start in range(1, len(search_word) - self.MIN_SUFFIX_LENGTH + 1):
+            position = self._exact.get(search_word[start:])
+            if position is not None:
+                return position
+        return None
+
+    def _closest(self, search_word: str):
+        if self._by_length is None:
+            self._by_length = {}
+            for position, reading in enumerate(self._normalized):
+                self._by_length.setdefault(len(reading), []).append((position, reading))
+        limit = max(1, len(search_word) // 2)
+        best = None  # (distance, -common prefix, position)
+        # Visit lengths nearest the search word first; a length difference of d
+        # means a distance of at least d, so stop once d cannot win
+        for delta in range(limit + 1):
+            if best is not None and delta > best[0]:
+                break
+            lengths = {len(search_word) - delta, len(search_word) + delta}
+            for length in lengths:
+                for position, reading in self._by_length.get(length, ()):
+                    bound = best[0] if best is not None else limit
+                    distance = edit_distance(search_word, reading, bound)
+                    if distance > bound:
+                        continue
+                    key = (distance, -_common_prefix(search_word, reading), position)
+                    if best is None or key < best:
+                        best = key
+        return best[2] if best is not None else None
+
+
+def _common_prefix(a: str, b: str) -> int:
+    length = 0
+    for char_a, char_b in zip(a, b):
+        if char_a != char_b:
+            break
+        length += 1
+    return length
@@ -6,13 +6,18 @@ Preserves individual word pitch patterns and connects them properly across word
 
 import sys
 import os
+import threading
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from pitch_db import PitchDB, PITCH_TYPE_LABELS
-from pitch_svg import get_pitch_pattern, get_accent_position
 from sudachipy import tokenizer
 from sudachipy import dictionary
-from utils import katakana_to_hiragana
+from kana import to_hiragana_batch, mora_count
+from conjugation import conjugation_chain, derive_accent
+from accent_tables import table_accent
+from pos_table import PosTable, pos_flags, BOUNDARY_PARTICLE, PUNCTUATION
+from sentence_records import Token, TokenPitch, Phrase, SentenceResult
+from contour import PhraseContourCache
 
 class SentencePitchProcessor:
     """
@@ -20,9 +25,20 @@ class SentencePitchProcessor:
     Preserves individual word pitch patterns and connects them properly.
     """
     
-    def __init__(self):
-        self.db = PitchDB()
-        self.tokenizer = dictionary.Dictionary().create()
+    def __init__(self, db: PitchDB = None, contour_cache_size: int = 4096, svg_mode: str = "full",
+                 pitch_storage: str = "html"):
+        self.db = db if db is not None else PitchDB()
+        sudachi_dictionary = dictionary.Dictionary()
+        self.tokenizer = sudachi_dictionary.create()
+        self._tokenizer_lock = threading.Lock()
+        # Category flags per POS id, so token checks are integer operations
+        self.pos_table = PosTable(sudachi_dictionary)
+        # Finished phrase contours by word accent signature (phrase shapes repeat)
+        self.contour_cache = PhraseContourCache(contour_cache_size)
+        # "full" or "compact" pitch SVGs (see pitch_svg.SVG_MODES)
+        self.svg_mode = svg_mode
+        # Pitch field content: rendered "html" or a "notation" the card template draws
+        self.pitch_storage = pitch_storage
         
         # Particles that typically form phrase boundaries
         self.boundary_particles = {
@@ -34,7 +50,7 @@ class SentencePitchProcessor:
             'が', 'を', 'に', 'で', 'へ', 'と', 'から', 'まで', 'より', 'まで'
         }
     
-    def process_sentence(self, sentence: str) -> dict:
+    def process_sentence(self, sentence: str) -> SentenceResult:
         """
         Process entire sentence and return unified pitch pattern.
         
@@ -42,102 +58,191 @@ class SentencePitchProcessor:
             sentence: Japanese sentence to process
             
         Returns:
-            dict with unified pitch pattern, accent positions, and metadata
+            SentenceResult with unified pitch pattern, accent positions, and
+            metadata (readable like a dict; to_dict() for a plain copy)
+        """
+        phrase_groups = self._phrase_groups(sentence)
+        
+        # Step 4: Connect each phrase group's word contours
+        contours = self.contour_cache.contours(phrase_groups)
+        
+        # Step 5: Combine phrase results
+        return self._combine_phrase_results(
+            [Phrase(group, contour) for group, contour in zip(phrase_groups, contours)], sentence)
+    
+    def _phrase_groups(self, sentence: str, reusable: dict = None) -> list:
+        """
+        Tokenize a sentence, look up each word and split it into phrase groups.
         """
         print(f"🎯 Processing sentence: {sentence}")
         
         # Step 1: Tokenize sentence
         tokens = self._tokenize(sentence)
-        print(f"   Tokens: {[t['surface'] for t in tokens]}")
+        print(f"   Tokens: {[t.surface for t in tokens]}")
         
         # Step 2: Get pitch info for each token
-        token_pitch_info = self._get_token_pitch_info(tokens)
+        token_pitch_info = self._get_token_pitch_info(tokens, reusable)
         
         # Step 3: Detect phrase groups
         phrase_groups = self._detect_phrase_groups(token_pitch_info)
-        
-        # Step 4: Process each phrase group
-        phrase_results = []
         for i, group in enumerate(phrase_groups):
-            print(f"   Processing phrase group {i+1}: {[t['surface'] for t in group]}")
-            phrase_result = self._process_phrase_group(group)
-            phrase_results.append(phrase_result)
+            print(f"   Processing phrase group {i+1}: {[t.surface for t in group]}")
+        return phrase_groups
+    
+    def process_sentence_incremental(self, sentence: str, previous: SentenceResult = None) -> SentenceResult:
+        """
+        Process an edited sentence, reusing the words the edit did not touch.
         
-        # Step 5: Combine phrase results
-        final_result = self._combine_phrase_results(phrase_results, sentence)
+        previous is the result for the text before the edit. The new text is
+        diffed against it; words wholly before or after the changed characters
+        that tokenize the same way again keep their resolved pitch info, so
+        only the words in the edited span are looked up.
+        
+        Returns:
+            the same SentenceResult process_sentence(sentence) would
+        """
+        if previous is None:
+            return self.process_sentence(sentence)
+        old_sentence = previous.original_sentence
+        if sentence == old_sentence:
+            return previous
+        
+        # Characters shared before and after the edit
+        shortest = min(len(sentence), len(old_sentence))
+        prefix = 0
+        while prefix < shortest and sentence[prefix] == old_sentence[prefix]:
+            prefix += 1
+        suffix = 0
+        while suffix < shortest - prefix and sentence[-1 - suffix] == old_sentence[-1 - suffix]:
+            suffix += 1
+        
+        # Words outside the edit, by where they start in the new text
+        shift = len(sentence) - len(old_sentence)
+        reusable = {}
+        position = 0
+        for phrase in previous.phrases:
+            for token in phrase.tokens:
+                end = position + len(token.surface)
+                if token.pitch_info is not None:
+                    if end <= prefix:
+                        reusable[(position, token.surface, token.reading)] = token
+                    elif position >= len(old_sentence) - suffix:
+                        reusable[(position + shift, token.surface, token.reading)] = token
+                position = end
+        
+        phrase_groups = self._phrase_groups(sentence, reusable)
+        kept = {id(token) for token in reusable.values()}
+        words = [token for group in phrase_groups for token in group]
+        print(f"   Reused {sum(1 for token in words if id(token) in kept)} of {len(words)} words")
+        contours = self.contour_cache.contours(phrase_groups)
+        return self._combine_phrase_results(
+            [Phrase(group, contour) for group, contour in zip(phrase_groups, contours)], sentence)
+    
+    def process_sentences(self, sentences: list) -> dict:
+        """
+        Process many sentences at once.
+        Sentences are deduplicated and their combined vocabulary is resolved in
+        one batch before the per-sentence passes, which then hit the cache.
         
-        return final_result
+        Returns:
+            dict mapping each distinct sentence to its process_sentence() result
+        """
+        unique_sentences = list(dict.fromkeys(sentences))
+        vocabulary = []
+        for sentence in unique_sentences:
+            vocabulary.extend(token.dict_form for token in self._tokenize(sentence))
+        self.db.lookup_batch(vocabulary)
+        
+        # Contours of every phrase of every sentence are looked up in one batch
+        sentence_groups = [self._phrase_groups(sentence) for sentence in unique_sentences]
+        contours = iter(self.contour_cache.contours([group for groups in sentence_groups for group in groups]))
+        return {
+            sentence: self._combine_phrase_results(
+                [Phrase(group, next(contours)) for group in groups], sentence)
+            for sentence, groups in zip(unique_sentences, sentence_groups)
+        }
     
     def _tokenize(self, text):
         """
         Tokenize Japanese text using SudachiPy.
-        Returns a list of dictionaries with surface form and dictionary form.
+        Returns a list of Token records with surface form and dictionary form.
         """
         tokens = []
         mode = tokenizer.Tokenizer.SplitMode.C  # Use mode C for most granular tokenization
         
-        for token in self.tokenizer.tokenize(text, mode):
-            # Convert katakana reading to hiragana
-            reading = katakana_to_hiragana(token.reading_form())
-            
-            tokens.append({
-                'surface': token.surface(),  # Surface form (as written)
-                'dict_form': token.dictionary_form(),  # Dictionary form
-                'reading': reading,  # Reading in hiragana
-                'pos': token.part_of_speech()  # Part of speech info
-            })
+        # The editor and background jobs may share this processor
+        with self._tokenizer_lock:
+            morphemes = list(self.tokenizer.tokenize(text, mode))
+        # Convert all katakana readings to hiragana in one pass
+        readings = to_hiragana_batch(token.reading_form() for token in morphemes)
+        table_pos, table_flags = self.pos_table.pos, self.pos_table.flags
+        for token, reading in zip(morphemes, readings):
+            pos_id = token.part_of_speech_id()
+            if pos_id < len(table_pos):
+                pos, flags = table_pos[pos_id], table_flags[pos_id]
+            else:
+                pos = token.part_of_speech()
+                flags = pos_flags(tuple(pos))
+            tokens.append(Token(
+                token.surface(),  # Surface form (as written)
+                token.dictionary_form(),  # Dictionary form
+                reading,  # Reading in hiragana
+                pos,  # Part of speech info
+                pos_id,
+                flags  # pos_table category flags
+            ))
             
         return tokens
     
 
     
-    def _get_token_pitch_info(self, tokens: list) -> list:
+    def _get_token_pitch_info(self, tokens: list, reusable: dict = None) -> list:
         """
         Get pitch accent information for each token.
-        Combines conjugated verb tokens to get full readings.
+        Combines conjugated verb and adjective tokens to get full readings.
+        reusable maps (offset, surface, reading) of words resolved earlier to
+        their TokenPitch; words found there are not looked up again.
         """
         token_pitch_info = []
+        position = 0
         
         i = 0
         while i < len(tokens):
             token = tokens[i]
-            surface = token['surface']
-            dict_form = token['dict_form']
-            reading = token['reading']  # Use the actual reading from tokenization
-            pos = token['pos']
+            dict_form = token.dict_form
+            pos = token.pos
+            flags = token.flags
             
-            # Check if this is part of a conjugated verb
-            combined_surface = surface
-            combined_reading = reading
-            combined_dict_form = dict_form
+            # Particles, auxiliaries, numbers with counters and loanwords come
+            # from the built-in tables without touching the cache
+            table_info, count = table_accent(tokens, i)
+            if table_info is not None:
+                chain = tokens[i:i + count]
+            else:
+                # A verb or adjective takes its auxiliaries along (買い+まし+た)
+                chain = conjugation_chain(tokens, i)
+            combined_surface = ''.join(t.surface for t in chain)
+            combined_reading = ''.join(t.reading for t in chain)
+            combined_dict_form = dict_form  # Keep the main verb's dict form
+            i += len(chain) - 1
             
-            # Look ahead to see if we have a conjugated verb
-            if i + 1 < len(tokens):
-                next_token = tokens[i + 1]
-                next_surface = next_token['surface']
-                next_reading = next_token['reading']
-                next_pos = next_token['pos']
-                
-                # Check if this forms a conjugated verb (verb + auxiliary/particle)
-                if (pos[0] == '動詞' and 
-                    next_pos[0] in ['助動詞', '助詞'] and
-                    (next_pos[1] in ['接続助詞', '助動詞-タ', '助動詞-ナイ'] or 
-                     next_pos[4] in ['助動詞-マス', '助動詞-タ', '助動詞-ナイ'])):
-                    
-                    # Combine the tokens
-                    combined_surface = surface + next_surface
-                    combined_reading = reading + next_reading
-                    combined_dict_form = dict_form  # Keep the main verb's dict form
-                    
-                    # Skip the next token since we combined it
+            if reusable:
+                previous = reusable.get((position, combined_surface, self._normalize_reading(combined_reading)))
+                position += len(combined_surface)
+                if previous is not None and previous.dict_form == dict_form and previous.pos == pos:
+                    token_pitch_info.append(previous)
                     i += 1
+                    continue
             
             # Get pitch info from database using the combined form
-            # For conjugated forms, we need to search with the combined reading
-            if combined_surface != surface:
-                # This is a conjugated form, search with the combined reading
-                # Use the new conjugated form lookup method
-                pitch_info = self.db.lookup_conjugated_form(combined_surface, combined_reading, combined_dict_form)
+            if table_info is not None:
+                pitch_info = table_info
+            elif len(chain) > 1:
+                # Derive the conjugated accent from the lemma's entry; only
+                # forms the rules are unsure about go to OJAD
+                pitch_info = derive_accent(self.db.lookup_with_cache(dict_form), chain)
+                if pitch_info is None or pitch_info['uncertain']:
+                    pitch_info = self.db.lookup_conjugated_form(combined_surface, combined_reading, combined_dict_form)
             else:
                 # Single token, search normally
                 pitch_info = self.db.lookup_with_cache(combined_surface)
@@ -147,37 +252,47 @@ class SentencePitchProcessor:
                 actual_reading = combined_reading if combined_reading else pitch_info['reading']
                 
                 # Normalize common reading variations
-                if actual_reading == 'わたくし':
-                    actual_reading = 'わたし'  # Use informal form
+                actual_reading = self._normalize_reading(actual_reading)
                 
-                token_pitch_info.append({
-                    'surface': combined_surface,
-                    'dict_form': combined_dict_form,
-                    'reading': actual_reading,
-                    'pitch_type': pitch_info['pitch_type'],
-                    'drop_pos': pitch_info['drop_pos'],
-                    'num_mora': len(actual_reading),  # Use actual reading length
-                    'pos': pos,
-                    'pitch_info': pitch_info
-                })
+                token_pitch_info.append(TokenPitch(
+                    combined_surface,
+                    combined_dict_form,
+                    actual_reading,
+                    pitch_info['pitch_type'],
+                    pitch_info['drop_pos'],
+                    mora_count(actual_reading),  # Morae of the actual reading
+                    pos,
+                    flags,
+                    pitch_info
+                ))
             else:
                 print(f"   {combined_surface}: No pitch info found")
                 # Add with default Heiban pattern
-                token_pitch_info.append({
-                    'surface': combined_surface,
-                    'dict_form': combined_dict_form,
-                    'reading': combined_reading,
-                    'pitch_type': 0,  # Heiban
-                    'drop_pos': 0,
-                    'num_mora': len(combined_reading),
-                    'pos': pos,
-                    'pitch_info': None
-                })
+                token_pitch_info.append(TokenPitch(
+                    combined_surface,
+                    combined_dict_form,
+                    combined_reading,
+                    0,  # Heiban
+                    0,
+                    mora_count(combined_reading),
+                    pos,
+                    flags,
+                    None
+                ))
             
             i += 1
         
         return token_pitch_info
     
+    @staticmethod
+    def _normalize_reading(reading: str) -> str:
+        """
+        Normalize common reading variations.
+        """
+        if reading == 'わたくし':
+            return 'わたし'  # Use informal form
+        return reading
+    
     def _detect_phrase_groups(self, token_pitch_info: list) -> list:
         """
         Detect phrase boundaries and group tokens.
@@ -187,18 +302,17 @@ class SentencePitchProcessor:
         current_group = []
         
         for i, token in enumerate(token_pitch_info):
-            surface = token['surface']
-            pos = token['pos']
+            flags = token.flags
             
             # Check if this token starts a new phrase
             starts_new_phrase = False
             
             # Boundary particles start new phrases
-            if surface in self.boundary_particles:
+            if flags & BOUNDARY_PARTICLE and token.surface in self.boundary_particles:
                 starts_new_phrase = True
             
             # Pause indicators (comma, period) start new phrases
-            elif surface in ['、', '。', '！', '？', '，', '．']:
+            elif flags & PUNCTUATION:
                 starts_new_phrase = True
             
             # Start new phrase if needed
@@ -215,169 +329,13 @@ class SentencePitchProcessor:
         print(f"   Detected {len(phrase_groups)} phrase groups")
         return phrase_groups
     
-    def _process_phrase_group(self, group: list) -> dict:
-        """
-        Process a single phrase group.
-        Preserves individual word pitch patterns and connects them properly.
-        """
-        if not group:
-            return {'pattern': [], 'accent_positions': [], 'reading': '', 'mora_count': 0}
-        
-        # Step 1: Combine readings and track word boundaries
-        combined_reading = ''
-        word_boundaries = []  # Track where each word starts/ends
-        current_mora = 0
-        
-        for token in group:
-            reading = token['reading']
-            mora_count = len(reading)
-            
-            # Record word boundaries
-            word_boundaries.append({
-                'token': token,
-                'mora_start': current_mora,
-                'mora_end': current_mora + mora_count,
-                'reading': reading,
-                'drop_pos': token['drop_pos'],
-                'pitch_type': token['pitch_type']
-            })
-            
-            combined_reading += reading
-            current_mora += mora_count
-        
-        # Step 2: Generate unified pattern by connecting individual word patterns
-        unified_pattern = []
-        accent_positions = []
-        
-        for i, boundary in enumerate(word_boundaries):
-            token = boundary['token']
-            reading = boundary['reading']
-            drop_pos = boundary['drop_pos']
-            
-            # Get individual word pattern
-            word_pattern = get_pitch_pattern(len(reading), drop_pos)
-            
-            # Get accent positions for this word
-            word_accent_positions = get_accent_position(len(reading), drop_pos)
-            
-            # Connect to previous word's pattern
-            if i == 0:
-                # First word: use its pattern as starting point
-                unified_pattern.extend(word_pattern)
-                accent_positions.extend(word_accent_positions)
-            else:
-                # Subsequent words: apply Japanese pitch accent connection rules
-                prev_final_pitch = unified_pattern[-1] if unified_pattern else 'L'
-                
-                # Adjust first mora of current word based on Japanese rules
-                if word_pattern:
-                    # JAPANESE PITCH CONNECTION RULES:
-                    # 1. Atamadaka words ALWAYS start HIGH (even after low-ending words)
-                    # 2. Other words inherit pitch from previous word's final mora
-                    # 3. Particles inherit pitch from preceding word
-                    
-                    if token['pitch_type'] == 1:  # Atamadaka
-                        # Atamadaka words always start HIGH
-                        adjusted_word_pattern = ['H'] + word_pattern[1:]
-                    else:
-                        # Other words inherit pitch from previous word
-                        adjusted_word_pattern = [prev_final_pitch] + word_pattern[1:]
-                    
-                    unified_pattern.extend(adjusted_word_pattern)
-                    
-                    # Adjust accent positions based on the adjusted pattern
-                    if token['pitch_type'] == 1:  # Atamadaka
-                        # For Atamadaka, if we changed the first mora to HIGH, 
-                        # the accent should be on the first mora (which is now HIGH)
-                        adjusted_accent_positions = [True] + word_accent_positions[1:]
-                    else:
-                        # For other words, if we changed the first mora's pitch,
-                        # we need to adjust the accent position accordingly
-                        if prev_final_pitch != word_pattern[0]:
-                            # The first mora's pitch changed, so adjust accent positions
-                            # If the first mora was originally accented and is now different pitch,
-                            # we need to recalculate
-                            if word_accent_positions[0]:  # First mora was accented
-                                # Keep accent on first mora (even though pitch changed)
-                                adjusted_accent_positions = [True] + word_accent_positions[1:]
-                            else:
-                                # No accent on first mora, keep as is
-                                adjusted_accent_positions = word_accent_positions.copy()
-                        else:
-                            # No pitch change, keep original accent positions
-                            adjusted_accent_positions = word_accent_positions.copy()
-                    
-                    accent_positions.extend(adjusted_accent_positions)
-        
-        return {
-            'pattern': unified_pattern,
-            'accent_positions': accent_positions,
-            'reading': combined_reading,
-            'mora_count': len(combined_reading),
-            'tokens': group,
-            'word_boundaries': word_boundaries
-        }
-    
-    def _combine_phrase_results(self, phrase_results: list, original_sentence: str) -> dict:
+    def _combine_phrase_results(self, phrase_results: list, original_sentence: str) -> SentenceResult:
         """
         Combine all phrase results into a single unified pattern.
+        The sentence pattern, accent positions and reading are the phrases'
+        joined in order (see SentenceResult).
         """
-        if not phrase_results:
-            return {
-                'pattern': [],
-                'accent_positions': [],
-                'reading': '',
-                'mora_count': 0,
-                'phrases': [],
-                'original_sentence': original_sentence
-            }
-        
-        # Combine all phrase results into a single unified pattern
-        combined_reading = ''
-        combined_pattern = []
-        combined_accent_positions = []
-        current_mora = 0
-        
-        for i, phrase_result in enumerate(phrase_results):
-            phrase_reading = phrase_result['reading']
-            phrase_pattern = phrase_result['pattern']
-            phrase_accent_positions = phrase_result['accent_positions']
-            
-            # Add phrase reading
-            combined_reading += phrase_reading
-            
-            # Add phrase pattern
-            combined_pattern.extend(phrase_pattern)
-            
-            # Add phrase accent positions (adjust mora positions)
-            for j, is_accent in enumerate(phrase_accent_positions):
-                if is_accent:
-                    # Mark the accent mora at the correct position in the combined pattern
-                    accent_pos = current_mora + j
-                    # Extend accent positions list if needed
-                    while len(combined_accent_positions) <= accent_pos:
-                        combined_accent_positions.append(False)
-                    combined_accent_positions[accent_pos] = True
-                else:
-                    # Extend accent positions list if needed
-                    while len(combined_accent_positions) <= current_mora + j:
-                        combined_accent_positions.append(False)
-            
-            current_mora += len(phrase_pattern)
-            
-            # Add pause between phrases (except for the last phrase)
-            if i < len(phrase_results) - 1:
-                # Add a brief pause marker (could be used for visualization)
-                pass
-        
-        return {
-            'pattern': combined_pattern,
-            'accent_positions': combined_accent_positions,
-            'reading': combined_reading,
-            'mora_count': len(combined_reading),
-            'phrases': phrase_results,
-            'original_sentence': original_sentence
-        }
+        return SentenceResult(original_sentence, phrase_results)
     
     def generate_sentence_svg(self, sentence: str) -> str:
         """
@@ -388,18 +346,48 @@ class SentencePitchProcessor:
             return ""
         
         from pitch_svg import generate_pitch_svg
-        return generate_pitch_svg(result['pattern'], result['accent_positions'])
+        return generate_pitch_svg(result['pattern'], result['accent_positions'], mode=self.svg_mode)
     
     def generate_sentence_html(self, sentence: str) -> str:
         """
         Generate HTML visualization for a sentence.
         """
         result = self.process_sentence(sentence)
+        return self.generate_result_html(result)
+    
+    def generate_result_html(self, result: dict) -> str:
+        """
+        Generate HTML visualization for an already processed sentence.
+        """
         if not result['pattern']:
             return ""
         
         from pitch_svg import generate_pitch_html
-        return generate_pitch_html(result['pattern'], result['accent_positions'], sentence)
+        return generate_pitch_html(result['pattern'], result['accent_positions'], result['original_sentence'],
+                                   mode=self.svg_mode)
+    
+    def generate_result_field(self, result: dict) -> str:
+        """
+        Pitch field value for a processed sentence, as pitch_storage says.
+        """
+        if self.pitch_storage != "notation":
+            return self.generate_result_html(result)
+        if not result['pattern']:
+            return ""
+        
+        from pitch_notation import encode_contour
+        return encode_contour(result['contour'], result['original_sentence'])
+    
+    def renderer_id(self):
+        """
+        Identity of the Pitch field format, for note fingerprints.
+        """
+        if self.pitch_storage == "notation":
+            from pitch_notation import RENDERER_ID
+            return RENDERER_ID
+        
+        from pitch_svg import renderer_id
+        return renderer_id(self.svg_mode)
 
 def test_sentence_processor():
     """
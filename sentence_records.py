@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Slotted records for the sentence pipeline.
+Tokens, per-token pitch, phrases and sentence results are small __slots__
+objects instead of dicts. Values derived from other fields (a phrase's reading,
+word boundaries and H/L pattern, a sentence's joined contour) are computed
+when asked for rather than stored a second time.
+
+Every record also reads like the dict it replaces (record['pattern'],
+record.get('reading'), 'tokens' in record), and to_dict() gives the old
+nested dict shape as plain data (each contour alongside its pattern, as
+{'high', 'accent', 'length'}).
+"""
+
+from contour import Contour, join_contours
+
+
+class Record:
+    """
+    Mapping-style read access over a record's FIELDS (slots) and VIEWS
+    (computed properties).
+    """
+
+    __slots__ = ()
+    FIELDS = ()
+    VIEWS = ()
+    _KEYS = frozenset()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._KEYS = frozenset(cls.FIELDS + cls.VIEWS)
+
+    def __getitem__(self, key: str):
+        if key not in self._KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default=None):
+        if key not in self._KEYS:
+            return default
+        return getattr(self, key)
+
+    def __contains__(self, key) -> bool:
+        return key in self._KEYS
+
+    def keys(self) -> list:
+        return list(self.FIELDS + self.VIEWS)
+
+    def to_dict(self) -> dict:
+        return {key: _plain(getattr(self, key)) for key in self.keys()}
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.FIELDS)
+        return f"{type(self).__name__}({fields})"
+
+
+def _plain(value):
+    if isinstance(value, Record):
+        return value.to_dict()
+    if isinstance(value, Contour):
+        return {'high': value.high, 'accent': value.accent, 'length': value.length}
+    if isinstance(value, list):
+        return [_plain(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    return value
+
+
+class Token(Record):
+    """One Sudachi morpheme (reading in hiragana, flags from pos_table)."""
+
+    FIELDS = ('surface', 'dict_form', 'reading', 'pos', 'pos_id', 'flags')
+    __slots__ = FIELDS
+
+    def __init__(self, surface: str, dict_form: str, reading: str, pos: tuple, pos_id: int, flags: int):
+        self.surface = surface
+        self.dict_form = dict_form
+        self.reading = reading
+        self.pos = pos
+        self.pos_id = pos_id
+        self.flags = flags
+
+
+class TokenPitch(Record):
+    """
+    A word with its accent: one token, or a conjugated chain or number +
+    counter merged into one unit. pitch_info is the lookup result (or None).
+    """
+
+    FIELDS = ('surface', 'dict_form', 'reading', 'pitch_type', 'drop_pos', 'num_mora', 'pos', 'flags',
+              'pitch_info')
+    __slots__ = FIELDS
+
+    def __init__(self, surface: str, dict_form: str, reading: str, pitch_type: int, drop_pos: int,
+                 num_mora: int, pos: tuple, flags: int, pitch_info: dict = None):
+        self.surface = surface
+        self.dict_form = dict_form
+        self.reading = reading
+        self.pitch_type = pitch_type
+        self.drop_pos = drop_pos
+        self.num_mora = num_mora
+        self.pos = pos
+        self.flags = flags
+        self.pitch_info = pitch_info
+
+
+class Phrase(Record):
+    """An accent phrase: its words and their connected pitch contour."""
+
+    FIELDS = ('tokens', 'contour')
+    VIEWS = ('pattern', 'accent_positions', 'reading', 'mora_count', 'word_boundaries')
+    __slots__ = FIELDS
+
+    def __init__(self, tokens: list, contour: Contour):
+        self.tokens = tokens
+        self.contour = contour
+
+    @property
+    def pattern(self) -> list:
+        return self.contour.pattern()
+
+    @property
+    def accent_positions(self) -> list:
+        return self.contour.accents()
+
+    @property
+    def reading(self) -> str:
+        return ''.join(token.reading for token in self.tokens)
+
+    @property
+    def mora_count(self) -> int:
+        return self.contour.length
+
+    @property
+    def word_boundaries(self) -> list:
+        """Where each word starts and ends, in morae from the phrase start."""
+        boundaries = []
+        start = 0
+        for token in self.tokens:
+            boundaries.append({
+                'token': token,
+                'mora_start': start,
+                'mora_end': start + token.num_mora,
+                'reading': token.reading,
+                'drop_pos': token.drop_pos,
+                'pitch_type': token.pitch_type
+            })
+            start += token.num_mora
+        return boundaries
+
+
+class SentenceResult(Record):
+    """
+    A processed sentence. Its contour is the phrases' contours joined
+    together, built on first use.
+    """
+
+    FIELDS = ('original_sentence', 'phrases')
+    VIEWS = ('contour', 'pattern', 'accent_positions', 'reading', 'mora_count')
+    __slots__ = FIELDS + ('_contour',)
+
+    def __init__(self, original_sentence: str, phrases: list):
+        self.original_sentence = original_sentence
+        self.phrases = phrases
+        self._contour = None
+
+    @property
+    def contour(self) -> Contour:
+        if self._contour is None:
+            self._contour = join_contours(phrase.contour for phrase in self.phrases)
+        return self._contour
+
+    @property
+    def pattern(self) -> list:
+        return self.contour.pattern()
+
+    @property
+    def accent_positions(self) -> list:
+        return self.contour.accents()
+
+    @property
+    def reading(self) -> str:
+        return ''.join(phrase.reading for phrase in self.phrases)
+
+    @property
+    def mora_count(self) -> int:
+        return self.contour.length
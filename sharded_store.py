@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Sharded on-disk pitch cache.
+Entries are spread over shard files by a hash of dict_form. A shard is read on
+first access and rewritten on its own when dirty, so startup reads no shards,
+a new entry rewrites one small file, and a corrupted shard loses only its own
+entries.
+
+Migrate an existing single-file cache with:
+
+    python sharded_store.py migrate pitch_db.json pitch_db_shards
+"""
+
+import json
+import os
+import sys
+import threading
+import zlib
+from collections.abc import MutableMapping
+
+from pitch_store import EntryStore
+
+SHARDED_DB_PATH = os.path.join(os.path.dirname(__file__), "pitch_db_shards")
+MANIFEST_NAME = "shards.json"
+DEFAULT_NUM_SHARDS = 64
+
+# Marks a key deleted locally but not yet written
+_DELETED = object()
+
+
+class ShardedStore(MutableMapping):
+    """
+    Dict-like store over a directory of JSON shards.
+    Values go in and come out as plain dicts, like EntryStore. Iterating or
+    taking len() loads every shard; lookups load only the one they need.
+    """
+
+    def __init__(self, directory: str, num_shards: int = DEFAULT_NUM_SHARDS):
+        self.directory = directory
+        self.num_shards = self._read_manifest() or num_shards
+        self._shards = {}
+        self._signatures = {}
+        # Unsaved changes per shard: {index: {dict_form: entry or _DELETED}}
+        self._dirty = {}
+        self._lock = threading.RLock()
+
+    def shard_index(self, dict_form: str) -> int:
+        # crc32 is stable across processes, unlike hash()
+        return zlib.crc32(dict_form.encode("utf-8")) % self.num_shards
+
+    def shard_path(self, index: int) -> str:
+        return os.path.join(self.directory, f"shard-{index:03d}.json")
+
+    def _shard(self, index: int) -> EntryStore:
+        shard = self._shards.get(index)
+        if shard is None:
+            with self._lock:
+                shard = self._shards.get(index)
+                if shard is None:
+                    shard = self._load_shard(index)
+        return shard
+
+    def _load_shard(self, index: int) -> EntryStore:
+        """
+        Read one shard from disk and reapply its unsaved changes. Caller holds _lock.
+        """
+        path = self.shard_path(index)
+        shard = EntryStore(self._read_shard_file(path))
+        for dict_form, entry in self._dirty.get(index, {}).items():
+            if entry is _DELETED:
+                shard.pop(dict_form, None)
+            else:
+                shard[dict_form] = entry
+        self._shards[index] = shard
+        self._signatures[index] = _file_signature(path)
+        return shard
+
+    def _read_shard_file(self, path: str) -> dict:
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            if not isinstance(data, dict):
+                raise ValueError("shard is not a JSON object")
+            return data
+        except (OSError, ValueError) as e:
+            # Keep the damaged file for inspection; the shard starts empty
+            print(f"Corrupted cache shard {path}: {e}")
+            try:
+                os.replace(path, path + ".corrupt")
+            except OSError:
+                pass
+            return {}
+
+    def __getitem__(self, dict_form: str) -> dict:
+        return self._shard(self.shard_index(dict_form))[dict_form]
+
+    def get(self, dict_form: str, default=None):
+        return self._shard(self.shard_index(dict_form)).get(dict_form, default)
+
+    def entry(self, dict_form: str):
+        return self._shard(self.shard_index(dict_form)).entry(dict_form)
+
+    def __contains__(self, dict_form) -> bool:
+        return dict_form in self._shard(self.shard_index(dict_form))
+
+    def __setitem__(self, dict_form: str, value):
+        index = self.shard_index(dict_form)
+        with self._lock:
+            shard = self._shard(index)
+            shard[dict_form] = value
+            self._dirty.setdefault(index, {})[dict_form] = shard.entry(dict_form)
+
+    def __delitem__(self, dict_form: str):
+        index = self.shard_index(dict_form)
+        with self._lock:
+            del self._shard(index)[dict_form]
+            self._dirty.setdefault(index, {})[dict_form] = _DELETED
+
+    def __iter__(self):
+        for index in range(self.num_shards):
+            yield from list(self._shard(index))
+
+    def __len__(self) -> int:
+        return sum(len(self._shard(index)) for index in range(self.num_shards))
+
+    def disk_items(self):
+        """
+        Yield every stored (dict_form, entry dict) without keeping unloaded
+        shards in memory.
+        """
+        for index in range(self.num_shards):
+            shard = self._shards.get(index)
+            if shard is not None:
+                yield from shard.to_dict().items()
+            else:
+                yield from self._read_shard_file(self.shard_path(index)).items()
+
+    def disk_keys(self):
+        for dict_form, _ in self.disk_items():
+            yield dict_form
+
+    def to_dict(self) -> dict:
+        data = {}
+        for index in range(self.num_shards):
+            data.update(self._shard(index).to_dict())
+        return data
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self._dirty)
+
+    def flush(self) -> int:
+        """
+        Write every dirty shard. Each shard is re-read first, so entries other
+        processes wrote to it are kept; callers serialize writers with a file
+        lock. Returns the number of shards written.
+        """
+        with self._lock:
+            dirty = self._dirty
+            self._dirty = {}
+        if not dirty:
+            return 0
+        os.makedirs(self.directory, exist_ok=True)
+        self._write_manifest()
+        for index, changes in dirty.items():
+            path = self.shard_path(index)
+            data = self._read_shard_file(path)
+            for dict_form, entry in changes.items():
+                if entry is _DELETED:
+                    data.pop(dict_form, None)
+                else:
+                    data[dict_form] = entry.to_dict()
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, path)
+            with self._lock:
+                # Adopt the merged shard, keeping changes made since the snapshot
+                self._load_shard(index)
+        return len(dirty)
+
+    def refresh(self) -> list:
+        """
+        Reload loaded shards that another process has rewritten.
+        Only stats the shard files. Returns the entries of reloaded shards as
+        (dict_form, entry dict) pairs (empty if nothing changed).
+        """
+        reloaded = []
+        with self._lock:
+            for index in list(self._shards):
+                if _file_signature(self.shard_path(index)) != self._signatures.get(index):
+                    reloaded.extend(self._load_shard(index).to_dict().items())
+        return reloaded
+
+    def stats(self) -> dict:
+        return {
+            'num_shards': self.num_shards,
+            'loaded_shards': len(self._shards),
+            'dirty_shards': len(self._dirty)
+        }
+
+    def _read_manifest(self):
+        try:
+            with open(os.path.join(self.directory, MANIFEST_NAME), encoding="utf-8") as f:
+                return json.load(f).get("num_shards")
+        except (OSError, ValueError):
+            return None
+
+    def _write_manifest(self):
+        path = os.path.join(self.directory, MANIFEST_NAME)
+        if not os.path.exists(path):
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"num_shards": self.num_shards}, f)
+
+
+def _file_signature(path: str):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def migrate_to_shards(json_path: str, directory: str, num_shards: int = DEFAULT_NUM_SHARDS) -> int:
+    """
+    Copy a single-file cache (and its unsaved journal) into a sharded directory.
+    Returns the number of entries migrated.
+    """
+    data = {}
+    if os.path.exists(json_path):
+        with open(json_path, encoding="utf-8") as f:
+            data = json.load(f)
+    journal_path = os.path.splitext(json_path)[0] + ".journal"
+    if os.path.exists(journal_path):
+        with open(journal_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    dict_form, entry = json.loads(line)
+                except ValueError:
+                    continue
+                data[dict_form] = entry
+
+    store = ShardedStore(directory, num_shards)
+    for dict_form, entry in data.items():
+        store[dict_form] = entry
+    store.flush()
+    return len(data)
+
+
+def prepare_sharded_cache(path: str = "", migrate_from: str = "", default_json_path: str = "") -> str:
+    """
+    Shard directory for a configured cache path, filled from the single-file
+    cache used before when the directory does not exist yet.
+    That cache is migrate_from if given, else path itself when it still names
+    a cache file (its shards then go next to it, as <name>_shards), else
+    default_json_path. Returns the directory.
+    """
+    source = migrate_from
+    if path and os.path.isfile(path):
+        source = source or path
+        directory = os.path.splitext(path)[0] + "_shards"
+    else:
+        directory = path or SHARDED_DB_PATH
+    source = source or default_json_path
+    if not os.path.isdir(directory) and source and os.path.exists(source):
+        count = migrate_to_shards(source, directory)
+        print(f"Migrated {count} cache entries from {source} to {directory}")
+    return directory
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (4, 5) or sys.argv[1] != "migrate":
+        print("Usage: python sharded_store.py migrate <pitch_db.json> <shard directory> [num_shards]")
+        sys.exit(1)
+    shards = int(sys.argv[4]) if len(sys.argv) == 5 else DEFAULT_NUM_SHARDS
+    count = migrate_to_shards(sys.argv[2], sys.argv[3], shards)
+    print(f"Migrated {count} entries into {sys.argv[3]}")
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Tests for the offline accent model.
+OJAD is replaced by a local stand-in so the tests run offline.
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from accent_model import AccentModel, accent_class, class_drop_pos, word_shape
+from pitch_db import PitchDB
+
+
+class TestAccentModel(unittest.TestCase):
+    """Test training, prediction, persistence and the PitchDB fallback order"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_accent_classes(self):
+        self.assertEqual(accent_class(0, 4), "0")
+        self.assertEqual(accent_class(1, 4), "1")
+        self.assertEqual(accent_class(4, 4), "-0")
+        self.assertEqual(accent_class(2, 4), "-2")
+        self.assertEqual(class_drop_pos("-1", 3), 2)
+        # Classes that do not fit the word are rejected
+        self.assertIsNone(class_drop_pos("-2", 3))
+        self.assertEqual(word_shape("食べる"), "mixed")
+        self.assertEqual(word_shape("学生"), "kanji")
+
+    def test_backoff_and_confidence(self):
+        # Ichidan verbs ending in べる: nucleus on the penultimate mora
+        samples = [("食べる", "たべる", 2, "動詞"), ("調べる", "しらべる", 3, "動詞"),
+                   ("比べる", "くらべる", 0, "動詞"), ("述べる", "のべる", 2, "動詞"),
+                   ("並べる", "ならべる", 3, "動詞"), ("学生", "がくせい", 0, "名詞")]
+        model = AccentModel.train(samples, min_support=3)
+        result = model.predict("浮かべる", "うかべる", "動詞")
+        self.assertEqual((result['drop_pos'], result['source']), (3, "model"))
+        # Most specific context with enough support: four-mora べる verbs, 2 of 3
+        self.assertAlmostEqual(result['confidence'], 2 / 4)
+        # Too few nouns for any context
+        self.assertIsNone(model.predict("先生", "せんせい", "名詞"))
+
+        path = os.path.join(self.tmpdir.name, "model.json")
+        model.save(path)
+        self.assertEqual(AccentModel.load(path).contexts, model.contexts)
+        self.assertIsNone(AccentModel.load(os.path.join(self.tmpdir.name, "missing.json")))
+
+    def test_lookup_uses_model(self):
+        db = PitchDB(os.path.join(self.tmpdir.name, "pitch_db.json"))
+        fetched = []
+        db.fetch_from_ojad_with_reading = lambda word, reading: fetched.append(word)
+        for word, reading in [("食べる", "たべる"), ("調べる", "しらべる"), ("述べる", "のべる"),
+                              ("並べる", "ならべる"), ("比べる", "くらべる")]:
+            db.add_entry(word, reading, len(reading) - 1, len(reading), 2)
+        # Guesses are never training data
+        db.add_entry("寝る", "ねる", 0, 2, 0, source="fallback")
+        model = db.train_accent_model(os.path.join(self.tmpdir.name, "model.json"))
+        self.assertTrue(len(model) > 0)
+
+        # Confident: no OJAD request
+        db.model_confidence = 0.7
+        result = db.lookup_with_cache("浮かべる")
+        self.assertEqual((result['drop_pos'], fetched), (3, []))
+        self.assertEqual(db.predicted_entries()["浮かべる"], "model")
+
+        # Not confident enough: OJAD is asked, and the model still beats Heiban
+        db.model_confidence = 1.0
+        result = db.lookup_with_cache("浮べる")
+        self.assertEqual(fetched, ["浮べる"])
+        self.assertEqual(result['source'], "model")
+
+
+if __name__ == '__main__':
+    unittest.main()
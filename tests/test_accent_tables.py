@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Tests for the built-in accent tables.
+OJAD is replaced by a local stand-in so the tests run offline.
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from accent_tables import closed_class_accent, numeral_counter_accent, loanword_accent, table_accent
+from pitch_db import PitchDB
+from sentence_pitch_processor import SentencePitchProcessor
+
+NOUN = ('名詞', '普通名詞', '一般', '*', '*', '*')
+NUMERAL = ('名詞', '数詞', '*', '*', '*', '*')
+COUNTER = ('名詞', '普通名詞', '助数詞可能', '*', '*', '*')
+
+
+def token(surface, reading, pos):
+    return {'surface': surface, 'dict_form': surface, 'reading': reading, 'pos': pos}
+
+
+class TestAccentTables(unittest.TestCase):
+    """Test the accent tables and that lookups use them before the cache"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_closed_class(self):
+        self.assertEqual(closed_class_accent('を', 'ヲ', ('助詞', '格助詞'))['drop_pos'], 0)
+        result = closed_class_accent('でしょう', 'デショウ', ('助動詞', '*'))
+        self.assertEqual((result['reading'], result['drop_pos'], result['source']), ('でしょう', 2, 'table'))
+        # POS must match: a noun spelled like a particle is not in the table
+        self.assertIsNone(closed_class_accent('か', 'カ', NOUN))
+
+    def test_numeral_counter(self):
+        cases = [
+            ('三', 'サン', '時', 'ジ', 'さんじ', 1),
+            ('四', 'ヨン', '時', 'ジ', 'よじ', 1),
+            ('十', 'ジュウ', '時', 'ジ', 'じゅうじ', 1),
+            ('一', 'イチ', '時', 'ジ', 'いちじ', 2),
+            ('二十', 'ニジュウ', '分', 'フン', 'にじゅっぷん', 2),
+            ('3', 'サン', '時間', 'ジカン', 'さんじかん', 3),
+        ]
+        for numeral, numeral_reading, counter, counter_reading, reading, drop_pos in cases:
+            result = numeral_counter_accent(token(numeral, numeral_reading, NUMERAL),
+                                            token(counter, counter_reading, COUNTER))
+            self.assertEqual((result['reading'], result['drop_pos']), (reading, drop_pos), numeral + counter)
+        # Unknown counters and multi-digit numbers (read digit by digit) are not covered
+        self.assertIsNone(numeral_counter_accent(token('三', 'サン', NUMERAL), token('本', 'ホン', COUNTER)))
+        self.assertIsNone(numeral_counter_accent(token('100', 'イチレイレイ', NUMERAL), token('分', 'フン', COUNTER)))
+
+    def test_loanwords(self):
+        self.assertEqual(loanword_accent('コンピューター', 'コンピューター', NOUN)['drop_pos'], 3)
+        self.assertEqual(loanword_accent('テレビ', 'テレビ', NOUN)['drop_pos'], 1)
+        self.assertEqual(loanword_accent('パン', 'パン', NOUN)['drop_pos'], 1)
+        self.assertTrue(loanword_accent('アメリカ', 'アメリカ', NOUN)['uncertain'])
+        self.assertIsNone(loanword_accent('学生', 'ガクセイ', NOUN))
+
+    def test_table_accent_covers_counter_pairs(self):
+        tokens = [token('三', 'さん', NUMERAL), token('時', 'じ', COUNTER), token('に', 'に', ('助詞', '格助詞'))]
+        result, count = table_accent(tokens, 0)
+        self.assertEqual((result['reading'], count), ('さんじ', 2))
+        self.assertEqual(table_accent(tokens, 1)[0], None)
+        self.assertEqual(table_accent(tokens, 2)[1], 1)
+
+    def test_tables_come_before_cache_and_ojad(self):
+        db = PitchDB(os.path.join(self.tmpdir.name, "pitch_db.json"))
+        fetched = []
+        db.fetch_from_ojad_with_reading = lambda word, reading: fetched.append(word)
+        db.add_entry("に", "に", 1, 1, 1)
+
+        self.assertEqual(db.lookup_with_cache("に")['drop_pos'], 0)
+        self.assertEqual(db.lookup_with_cache("テレビ")['source'], 'table')
+        self.assertEqual(fetched, [])
+
+        processor = SentencePitchProcessor(db)
+        db.lookup_with_cache = lambda word: self.fail(f"{word} looked up")
+        info = processor._get_token_pitch_info(processor._tokenize("三時にテレビ"))
+        self.assertEqual([(t['surface'], t['drop_pos']) for t in info], [('三時', 1), ('に', 0), ('テレビ', 1)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Tests for the deck-wide backfill job.
+Uses a small in-memory stand-in for the Anki collection.
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backfill import BackfillJob, apply_fields, format_progress
+from fingerprint import FingerprintIndex
+
+MODEL_NAME = "Japanese with Pitch Accent"
+FIELD_NAMES = ["Expression", "Reading", "Meaning", "Pitch"]
+
+
+class FakeNote(dict):
+    def __init__(self, note_id, values):
+        super().__init__(zip(FIELD_NAMES, values))
+        self.id = note_id
+
+
+class FakeModels:
+    def by_name(self, name):
+        return {'id': 1, 'name': name} if name == MODEL_NAME else None
+
+    def field_names(self, model):
+        return FIELD_NAMES
+
+
+class FakeDB:
+    def __init__(self, notes):
+        self.notes = notes
+
+    def all(self, sql, mid):
+        return [(nid, "\x1f".join(note[name] for name in FIELD_NAMES))
+                for nid, note in sorted(self.notes.items())]
+
+
+class FakeCollection:
+    def __init__(self, expressions):
+        self.notes = {
+            nid: FakeNote(nid, [text, "", "", ""])
+            for nid, text in enumerate(expressions, start=100)
+        }
+        self.models = FakeModels()
+        self.db = FakeDB(self.notes)
+        self.update_calls = []
+
+    def get_note(self, note_id):
+        return FakeNote(note_id, [self.notes[note_id][name] for name in FIELD_NAMES])
+
+    def update_notes(self, notes):
+        self.update_calls.append([note.id for note in notes])
+        for note in notes:
+            self.notes[note.id] = note
+
+
+class FakeProcessor:
+    def __init__(self):
+        self.processed = []
+        self.db = type("FakeDB", (), {"generation": 0})()
+
+    def process_sentences(self, sentences):
+        self.processed.extend(sentences)
+        return {s: {'reading': f"r:{s}", 'pattern': ['L', 'H'], 'original_sentence': s} for s in sentences}
+
+    def generate_result_field(self, result):
+        return f"<svg>{result['original_sentence']}</svg>"
+
+
+class TestBackfill(unittest.TestCase):
+    """Test the resumable backfill job"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.checkpoint = os.path.join(self.tmpdir.name, "checkpoint.json")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_dedupes_and_updates_in_chunks(self):
+        col = FakeCollection(["大学", "木", "大学", "男", "", "木"])
+        processor = FakeProcessor()
+        job = BackfillJob(col, processor, MODEL_NAME, chunk_size=2, checkpoint_path=self.checkpoint)
+        progress = job.run()
+
+        self.assertEqual(sorted(processor.processed), ["大学", "木", "男"])
+        self.assertEqual(progress['done'], 6)
+        self.assertEqual(progress['total'], 6)
+        self.assertGreater(len(col.update_calls), 1)
+        self.assertEqual(col.notes[102]['Reading'], "r:大学")
+        self.assertEqual(col.notes[105]['Pitch'], "<svg>木</svg>")
+        self.assertEqual(col.notes[104]['Reading'], "")
+        self.assertFalse(os.path.exists(self.checkpoint))
+
+    def test_resume_from_checkpoint(self):
+        col = FakeCollection(["大学", "木", "男", "花"])
+        calls = []
+        job = BackfillJob(col, FakeProcessor(), MODEL_NAME, chunk_size=1, checkpoint_path=self.checkpoint)
+        job.run(should_cancel=lambda: len(calls) >= 2, on_progress=calls.append)
+        self.assertTrue(os.path.exists(self.checkpoint))
+
+        processor = FakeProcessor()
+        resumed = BackfillJob(col, processor, MODEL_NAME, chunk_size=1, checkpoint_path=self.checkpoint)
+        progress = resumed.run()
+
+        self.assertEqual(processor.processed, ["男", "花"])
+        self.assertEqual(progress['done'], 4)
+        self.assertFalse(os.path.exists(self.checkpoint))
+
+    def test_progress_reports_eta(self):
+        col = FakeCollection(["大学", "木", "男"])
+        calls = []
+        job = BackfillJob(col, FakeProcessor(), MODEL_NAME, chunk_size=1, checkpoint_path=self.checkpoint)
+        job.run(on_progress=calls.append)
+
+        self.assertEqual([p['done'] for p in calls], [1, 2, 3])
+        self.assertIn("3/3 notes", format_progress(calls[-1]))
+
+    def test_fingerprints_skip_current_notes(self):
+        col = FakeCollection(["大学", "木"])
+        index = FingerprintIndex(os.path.join(self.tmpdir.name, "fingerprints.json"))
+        BackfillJob(col, FakeProcessor(), MODEL_NAME, checkpoint_path=self.checkpoint,
+                    fingerprints=index).run()
+
+        col.notes[101]['Expression'] = "男"
+        processor = FakeProcessor()
+        BackfillJob(col, processor, MODEL_NAME, checkpoint_path=self.checkpoint,
+                    fingerprints=FingerprintIndex(index.path)).run()
+        self.assertEqual(processor.processed, ["男"])
+
+        processor = FakeProcessor()
+        processor.db.generation = 1
+        BackfillJob(col, processor, MODEL_NAME, checkpoint_path=self.checkpoint,
+                    fingerprints=FingerprintIndex(index.path)).run()
+        self.assertEqual(sorted(processor.processed), ["大学", "男"])
+
+    def test_apply_fields_skips_missing_fields(self):
+        note = FakeNote(1, ["大学", "", "", ""])
+        del note['Pitch']
+        self.assertTrue(apply_fields(note, {'Reading': "だいがく", 'Pitch': "<svg/>"}))
+        self.assertNotIn('Pitch', note)
+        self.assertFalse(apply_fields(note, {'Reading': "だいがく"}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Tests for the Bloom filter in front of the disk-backed cache tiers.
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bloom import BloomFilter
+from pitch_db import PitchDB
+
+
+class TestBloomFilter(unittest.TestCase):
+    """Test the filter itself and its use in PitchDB"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_no_false_negatives_and_bounded_false_positives(self):
+        bloom = BloomFilter(2000, error_rate=0.01)
+        words = [f"語{i}" for i in range(2000)]
+        for word in words:
+            bloom.add(word)
+        self.assertTrue(all(word in bloom for word in words))
+        false_positives = sum(f"無{i}" in bloom for i in range(5000))
+        self.assertLess(false_positives / 5000, 0.03)
+
+    def test_save_load_and_union(self):
+        path = os.path.join(self.tmpdir.name, "keys.bloom")
+        first = BloomFilter(100, source="a")
+        first.add("大学")
+        first.save(path)
+        second = BloomFilter(100, source="a")
+        second.add("木")
+        loaded = BloomFilter.load(path)
+        self.assertTrue(loaded.compatible(second))
+        second.update(loaded)
+        self.assertIn("大学", second)
+        self.assertIn("木", second)
+        self.assertIsNone(BloomFilter.load(os.path.join(self.tmpdir.name, "missing.bloom")))
+
+    def test_pitch_db_skips_disk_for_definite_misses(self):
+        path = os.path.join(self.tmpdir.name, "shards")
+        db = PitchDB(path, sharded=True)
+        db.add_entry("大学", "だいがく", 0, 4, 0)
+        self.assertIsNone(db.lookup("存在しない語"))
+        self.assertEqual(db.cache_stats()['bloom']['skipped_probes'], 1)
+
+        reopened = PitchDB(path, sharded=True)
+        self.assertEqual(reopened.lookup("大学")['reading'], "だいがく")
+        self.assertIsNone(reopened.lookup("木"))
+        self.assertEqual(reopened.cache_stats()['loaded_shards'], 1)
+
+        # Keys added by another instance are picked up on refresh
+        db.add_entry("木", "き", 1, 1, 1)
+        self.assertTrue(reopened.refresh())
+        self.assertEqual(reopened.lookup("木")['reading'], "き")
+
+    def test_lookup_sees_keys_added_by_another_instance(self):
+        path = os.path.join(self.tmpdir.name, "shards")
+        db = PitchDB(path, sharded=True)
+        db.add_entry("大学", "だいがく", 0, 4, 0)
+        other = PitchDB(path, sharded=True)
+        self.assertIsNone(other.lookup("木"))
+
+        # The loaded filter rejects 木, but the persisted one has it now
+        db.add_entry("木", "き", 1, 1, 1)
+        self.assertNotIn("木", other.bloom)
+        self.assertEqual(other.lookup("木")['reading'], "き")
+        skipped = other.cache_stats()['bloom']['skipped_probes']
+        self.assertIsNone(other.lookup("花"))
+        self.assertEqual(other.cache_stats()['bloom']['skipped_probes'], skipped + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
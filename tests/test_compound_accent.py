@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Tests for compound noun accent prediction.
+OJAD is replaced by a local stand-in so the tests run offline.
+"""
+
+import unittest
+import sys
+import os
+import json
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from compound_accent import predict_compound_accent
+from pitch_db import PitchDB
+
+
+def entry(drop_pos):
+    return {'drop_pos': drop_pos}
+
+
+class TestCompoundAccent(unittest.TestCase):
+    """Test the compound accent rules and their use in PitchDB"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_rules(self):
+        # Long N2 keeps its nucleus, or starts one if heiban/odaka
+        result = predict_compound_accent([("国際", "こくさい", None), ("会議", "かいぎ", entry(1))], "こくさいかいぎ")
+        self.assertEqual((result['drop_pos'], result['rule']), (5, 'long-element'))
+        result = predict_compound_accent([("経済", "けいざい", None), ("政策", "せいさく", entry(0))], "けいざいせいさく")
+        self.assertEqual(result['drop_pos'], 5)
+        # Short N2 drops after the last mora of N1
+        result = predict_compound_accent([("電子", "でんし", None), ("辞書", "じしょ", None)], "でんしじしょ")
+        self.assertEqual((result['drop_pos'], result['num_mora']), (3, 5))
+        # Heiban-forming suffix
+        result = predict_compound_accent([("日本", "にほん", None), ("語", "ご", None)], "にほんご")
+        self.assertEqual((result['drop_pos'], result['source']), (0, "compound"))
+
+    def test_unsure_or_unknown(self):
+        self.assertTrue(predict_compound_accent([("日本", "にほん", None), ("人", "じん", None)], "にほんじん")['uncertain'])
+        self.assertIsNone(predict_compound_accent([("国際", "こくさい", None), ("会議", "かいぎ", None)], "こくさいかいぎ"))
+        self.assertIsNone(predict_compound_accent([("日本", "にほん", None), ("語", "ご", None)], "にっぽんご"))
+        self.assertIsNone(predict_compound_accent([("日本", "にほん", None)], "にほん"))
+
+    def test_lookup_predicts_before_ojad(self):
+        db_path = os.path.join(self.tmpdir.name, "pitch_db.json")
+        db = PitchDB(db_path)
+        fetched = []
+        db.fetch_from_ojad_with_reading = lambda word, reading: fetched.append(word)
+        db.add_entry("携帯", "けいたい", 0, 4, 0)
+        db.add_entry("電話", "でんわ", 0, 3, 0)
+
+        result = db.lookup_with_cache("携帯電話")
+        self.assertEqual(fetched, [])
+        self.assertEqual((result['reading'], result['drop_pos']), ("けいたいでんわ", 5))
+        self.assertEqual(db.lookup("携帯電話")['source'], "compound")
+        self.assertEqual(db.predicted_entries(), {"携帯電話": "compound"})
+
+        db.save()
+        with open(db_path, encoding="utf-8") as f:
+            on_disk = json.load(f)
+        self.assertEqual(on_disk["携帯電話"]['source'], "compound")
+        self.assertNotIn('source', on_disk["電話"])
+
+        db.lookup_with_cache("日本人")
+        self.assertEqual(fetched, ["日本人"])
+
+    def test_unknown_components_go_to_ojad(self):
+        db = PitchDB(os.path.join(self.tmpdir.name, "pitch_db.json"))
+        fetched = []
+        db.fetch_from_ojad_with_reading = lambda word, reading: fetched.append(word) or (reading, 0, 2, 0)
+        for word in ("お茶", "お金", "お酒", "携帯電話"):
+            self.assertIsNone(db.predict_compound(word, "x"), word)
+        for word in ("お金", "携帯電話"):
+            self.assertEqual(db.lookup_with_cache(word)['drop_pos'], 0, word)
+        self.assertEqual(fetched, ["お金", "携帯電話"])
+        self.assertEqual(db.predicted_entries(), {})
+
+    def test_guessed_components_go_to_ojad(self):
+        db = PitchDB(os.path.join(self.tmpdir.name, "pitch_db.json"))
+        fetched = []
+        db.fetch_from_ojad_with_reading = lambda word, reading: fetched.append(word) or (reading, 5, 7, 2)
+        db.add_entry("国際", "こくさい", 0, 4, 0)
+        db.add_entry("会議", "かいぎ", 0, 3, 0, source="fallback")
+        self.assertIsNone(db.predict_compound("国際会議", "こくさいかいぎ"))
+        db.add_entry("会議", "かいぎ", 1, 3, 1, source="compound")
+        self.assertIsNone(db.predict_compound("国際会議", "こくさいかいぎ"))
+        db.add_entry("会議", "かいぎ", 1, 3, 1)
+        self.assertEqual(db.predict_compound("国際会議", "こくさいかいぎ")['drop_pos'], 5)
+
+        db.add_entry("携帯", "けいたい", 0, 4, 0)
+        db.add_entry("電話", "でんわ", 0, 3, 0, source="model")
+        result = db.lookup_with_cache("携帯電話")
+        self.assertEqual(fetched, ["携帯電話"])
+        self.assertNotIn('source', result)
+        self.assertEqual(db.predicted_entries(), {"電話": "model"})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Tests for the rule-based conjugation accent engine.
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from conjugation import conjugation_chain, derive_accent
+from pitch_db import PitchDB
+from sentence_pitch_processor import SentencePitchProcessor
+
+# Dictionary-form nuclei (Tokyo accent)
+LEMMAS = {'行く': 0, '買う': 0, '食べる': 2, '書く': 1, '帰る': 1, '高い': 2, '赤い': 0, '来る': 1, '話す': 2}
+
+
+class TestConjugation(unittest.TestCase):
+    """Test conjugated accent derivation"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.db = PitchDB(os.path.join(cls.tmpdir.name, "pitch_db.json"))
+        cls.processor = SentencePitchProcessor(db=cls.db)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmpdir.cleanup()
+
+    def derive(self, text):
+        tokens = self.processor._tokenize(text)
+        chain = conjugation_chain(tokens, 0)
+        return derive_accent({'drop_pos': LEMMAS[tokens[0]['dict_form']]}, chain)
+
+    def test_masu_forms(self):
+        self.assertEqual(self.derive("行きます")['drop_pos'], 3)
+        self.assertEqual(self.derive("買いました")['drop_pos'], 3)
+        self.assertEqual(self.derive("行きません")['drop_pos'], 4)
+
+    def test_te_ta_forms(self):
+        self.assertEqual(self.derive("食べて")['drop_pos'], 1)
+        self.assertEqual(self.derive("書いた")['drop_pos'], 1)
+        self.assertEqual(self.derive("帰って")['drop_pos'], 1)
+        self.assertEqual(self.derive("話して")['drop_pos'], 2)
+        self.assertEqual(self.derive("来た")['drop_pos'], 1)
+        self.assertEqual(self.derive("行った")['drop_pos'], 0)
+
+    def test_nai_ba_and_adjectives(self):
+        self.assertEqual(self.derive("食べない")['drop_pos'], 2)
+        self.assertEqual(self.derive("行かない")['drop_pos'], 0)
+        self.assertEqual(self.derive("書けば")['drop_pos'], 1)
+        self.assertEqual(self.derive("高かった")['drop_pos'], 1)
+        self.assertEqual(self.derive("高かった")['num_mora'], 5)
+        self.assertFalse(self.derive("高くて")['uncertain'])
+
+    def test_uncertain_forms(self):
+        self.assertTrue(self.derive("行かなかった")['uncertain'])
+        self.assertTrue(self.derive("赤かった")['uncertain'])
+        self.assertTrue(self.derive("行けば")['uncertain'])
+
+    def test_guessed_lemma_is_uncertain(self):
+        chain = conjugation_chain(self.processor._tokenize("食べます"), 0)
+        self.assertFalse(derive_accent({'drop_pos': 2}, chain)['uncertain'])
+        for source in ("fallback", "model"):
+            self.assertTrue(derive_accent({'drop_pos': 2, 'source': source}, chain)['uncertain'], source)
+
+    def test_guessed_lemma_goes_to_ojad(self):
+        db = PitchDB(os.path.join(self.tmpdir.name, "guessed.json"))
+        db.add_entry("食べる", "たべる", 0, 3, 0, source="fallback")
+        conjugated = []
+        db.lookup_conjugated_form = lambda surface, reading, dict_form: conjugated.append(surface) or {
+            "reading": "たべます", "drop_pos": 3, "num_mora": 4, "pitch_type": 3}
+        result = SentencePitchProcessor(db=db).process_sentence("食べます")
+        self.assertEqual(conjugated, ["食べます"])
+        self.assertEqual(result['phrases'][0]['tokens'][0]['drop_pos'], 3)
+
+    def test_chain_stops_at_next_word(self):
+        tokens = self.processor._tokenize("勉強しています")
+        self.assertEqual([t['surface'] for t in conjugation_chain(tokens, 1)], ["し", "て"])
+        self.assertEqual([t['surface'] for t in conjugation_chain(tokens, 3)], ["い", "ます"])
+        self.assertEqual(len(conjugation_chain(tokens, 0)), 1)
+
+    def test_sentence_needs_only_lemma_entries(self):
+        fetched = []
+        self.db.fetch_from_ojad_with_reading = lambda word, reading: fetched.append(word)
+        self.db.add_entry("買う", "かう", 0, 2, 0)
+        self.db.add_entry("食べる", "たべる", 2, 3, 2)
+
+        self.processor.process_sentence("買いました")
+        self.processor.process_sentence("食べて")
+        self.assertEqual(fetched, [])
+        self.assertNotIn("買いまし", self.db.db)
+        self.assertNotIn("買いました", self.db.db)
+
+
+if __name__ == '__main__':
+    unittest.main()
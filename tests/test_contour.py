@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Tests for bit-packed pitch contours.
+"""
+
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import contour
+from contour import (Contour, word_masks, word_contour, word_masks_batch, phrase_contour,
+                     phrase_contours, join_contours, PhraseContourCache)
+from pitch_svg import get_pitch_pattern, get_accent_position
+from sentence_records import TokenPitch
+
+
+def word(num_mora, drop_pos, pitch_type=None):
+    pitch_type = drop_pos if pitch_type is None else pitch_type
+    return TokenPitch("x", "x", "x", pitch_type, drop_pos, num_mora, (), 0)
+
+
+class TestContour(unittest.TestCase):
+    """Test contours against the list-based pattern functions"""
+
+    def test_word_contours_match_lists(self):
+        for mora_count in range(0, 9):
+            for drop_pos in range(-1, 11):
+                c = word_contour(mora_count, drop_pos)
+                self.assertEqual(c.pattern(), get_pitch_pattern(mora_count, drop_pos), (mora_count, drop_pos))
+                self.assertEqual(c.accents(), get_accent_position(mora_count, drop_pos), (mora_count, drop_pos))
+
+    def test_round_trip_and_join(self):
+        c = Contour.from_lists(['L', 'H', 'H', 'L'], [False, False, True, False])
+        self.assertEqual((c.high, c.accent, len(c)), (0b0110, 0b0100, 4))
+        self.assertEqual(c.pattern(), ['L', 'H', 'H', 'L'])
+        self.assertEqual(Contour().pattern(), [])
+        joined = join_contours([word_contour(2, 1), word_contour(3, 0)])
+        self.assertEqual(joined.pattern(), ['H', 'L', 'L', 'H', 'H'])
+        self.assertEqual(joined, word_contour(2, 1) + word_contour(3, 0))
+
+    def test_phrase_connection(self):
+        # 大学 (Heiban) + に: the particle continues high
+        self.assertEqual(phrase_contour([word(4, 0), word(1, 0)]).pattern(), ['L', 'H', 'H', 'H', 'H'])
+        # 猫 (Atamadaka) + が: the particle stays low
+        self.assertEqual(phrase_contour([word(2, 1), word(1, 0)]).pattern(), ['H', 'L', 'L'])
+        # A following Atamadaka word starts high on an accent
+        phrase = phrase_contour([word(2, 1), word(2, 1)])
+        self.assertEqual(phrase.pattern(), ['H', 'L', 'H', 'L'])
+        self.assertEqual(phrase.accents(), [True, False, True, False])
+        # Words without morae add nothing
+        self.assertEqual(phrase_contour([word(0, 0), word(2, 0)]).pattern(), ['L', 'H'])
+
+    def test_batch_matches_single(self):
+        phrases = [[word(m, d) for m, d in pairs] for pairs in
+                   [[(3, 0), (1, 0)], [(2, 1)], [(4, 2), (2, 2), (0, 0)], []]]
+        self.assertEqual(phrase_contours(phrases), [phrase_contour(phrase) for phrase in phrases])
+        self.assertEqual(word_masks_batch([], []), ([], []))
+
+    def test_phrase_cache(self):
+        cache = PhraseContourCache(capacity=2)
+        noun_ga = [word(2, 0), word(1, 0)]
+        first, second = cache.contours([noun_ga, [word(2, 0), word(1, 0)]])
+        self.assertIs(first, second)
+        self.assertEqual(first, phrase_contour(noun_ga))
+        self.assertEqual(cache.stats()['misses'], 1)
+
+        cache.contours([noun_ga])
+        cache.contours([[word(3, 2)], [word(1, 1)]])
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (2, 3))
+        self.assertEqual((stats['resident'], stats['evictions']), (2, 1))
+        self.assertAlmostEqual(stats['hit_ratio'], 0.4)
+        # Atamadaka and another type with the same drop connect differently
+        self.assertNotEqual(cache.contours([[word(2, 1), word(2, 1, 1)]]),
+                            cache.contours([[word(2, 1), word(2, 1, 3)]]))
+
+    @unittest.skipIf(contour.numpy is None, "numpy is not installed")
+    def test_numpy_batch(self):
+        pairs = [(m, d) for m in range(0, 12) for d in range(-1, 14)]
+        expected = [word_masks(m, d) for m, d in pairs]
+        highs, accents = word_masks_batch(contour.numpy.array([m for m, _ in pairs]),
+                                          contour.numpy.array([d for _, d in pairs]))
+        self.assertEqual(list(zip(highs.tolist(), accents.tolist())), expected)
+        # Words too long for int64 masks fall back to Python ints
+        highs, _ = word_masks_batch(contour.numpy.array([70]), contour.numpy.array([0]))
+        self.assertEqual(highs, [word_masks(70, 0)[0]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Tests for note content fingerprints and the cache generation counter.
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from fingerprint import FingerprintIndex, compute_fingerprint
+from pitch_db import PitchDB
+
+
+class TestFingerprint(unittest.TestCase):
+    """Test fingerprint computation and persistence"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_fingerprint_inputs(self):
+        base = compute_fingerprint("大学に行きます", 0, 1)
+        self.assertEqual(base, compute_fingerprint(" 大学に行きます ", 0, 1))
+        self.assertNotEqual(base, compute_fingerprint("大学に行きました", 0, 1))
+        self.assertNotEqual(base, compute_fingerprint("大学に行きます", 1, 1))
+        self.assertNotEqual(base, compute_fingerprint("大学に行きます", 0, 2))
+
+    def test_index_persistence(self):
+        path = os.path.join(self.tmpdir.name, "fingerprints.json")
+        index = FingerprintIndex(path)
+        index.set(1234, "abc")
+        self.assertTrue(index.matches(1234, "abc"))
+        index.save()
+
+        reloaded = FingerprintIndex(path)
+        self.assertTrue(reloaded.matches(1234, "abc"))
+        self.assertFalse(reloaded.matches(1234, "def"))
+        self.assertFalse(reloaded.matches(5678, "abc"))
+
+    def test_generation_bumps_only_on_changed_entries(self):
+        db_path = os.path.join(self.tmpdir.name, "pitch_db.json")
+        db = PitchDB(db_path)
+        self.assertEqual(db.generation, 0)
+
+        db.add_entry("大学", "だいがく", 0, 4, 0)
+        db.add_entry("大学", "だいがく", 0, 4, 0)
+        self.assertEqual(db.generation, 0)
+
+        db.add_entry("大学", "だいがく", 1, 4, 1)
+        self.assertEqual(db.generation, 1)
+        self.assertEqual(PitchDB(db_path).generation, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Tests for kana normalization and mora segmentation.
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from kana import (to_hiragana, to_katakana, split_mora, mora_count,
+                  to_hiragana_batch, split_mora_batch, mora_counts)
+from pitch_db import PitchDB
+from sentence_pitch_processor import SentencePitchProcessor
+
+
+class TestKana(unittest.TestCase):
+    """Test the kana engine and that sentence patterns are built per mora"""
+
+    def test_conversion(self):
+        self.assertEqual(to_hiragana("コンピューター"), "こんぴゅーたー")
+        self.assertEqual(to_hiragana("東京タワー"), "東京たわー")
+        self.assertEqual(to_katakana("きょう"), "キョウ")
+        self.assertEqual(to_hiragana_batch(["カタ", "", "カナ"]), ["かた", "", "かな"])
+        self.assertEqual(to_hiragana_batch(["ア\nイ", "ウ"]), ["あ\nい", "う"])
+
+    def test_morae(self):
+        self.assertEqual(split_mora("きょう"), ["きょ", "う"])
+        self.assertEqual(split_mora("がっこう"), ["が", "っ", "こ", "う"])
+        self.assertEqual(split_mora("ファイル"), ["ファ", "イ", "ル"])
+        self.assertEqual(split_mora("こんぴゅーたー"), ["こ", "ん", "ぴゅ", "ー", "た", "ー"])
+        for reading in ["きょう", "しゅっちょう", "ゃあ", "", "ティーシャツ"]:
+            self.assertEqual(mora_count(reading), len(split_mora(reading)), reading)
+        self.assertEqual(split_mora_batch(["きゃ", "ん"]), [["きゃ"], ["ん"]])
+        self.assertEqual(mora_counts(["しゅっちょう", "ー"]), [4, 1])
+
+    def test_sentence_pattern_has_one_point_per_mora(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db = PitchDB(os.path.join(tmpdir, "pitch_db.json"))
+            db.add_entry("今日", "きょう", 1, 2, 1)
+            result = SentencePitchProcessor(db).process_sentence("今日は")
+        self.assertEqual(result['reading'], "きょうは")
+        self.assertEqual(result['mora_count'], 3)
+        self.assertEqual(result['pattern'], ['H', 'L', 'L'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Tests for the priority lookup scheduler.
+"""
+
+import unittest
+import sys
+import os
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import lookup_scheduler
+from lookup_scheduler import LookupScheduler, INTERACTIVE, BACKFILL, PREFETCH
+
+
+class TestLookupScheduler(unittest.TestCase):
+    """Test priority ordering, concurrency limits and metrics"""
+
+    def _start(self, scheduler, level, fn):
+        thread = threading.Thread(target=scheduler.run, args=(fn,), kwargs={'level': level})
+        thread.start()
+        return thread
+
+    def _wait_queued(self, scheduler, name, count):
+        deadline = time.time() + 2
+        while scheduler.metrics()[name]['queued'] < count and time.time() < deadline:
+            time.sleep(0.001)
+
+    def test_interactive_preempts_queued_background_work(self):
+        scheduler = LookupScheduler(max_concurrent=2)
+        order = []
+        release = threading.Event()
+
+        blocker = self._start(scheduler, BACKFILL, release.wait)
+        while scheduler.metrics()['backfill']['active'] < 1:
+            time.sleep(0.001)
+
+        threads = [self._start(scheduler, PREFETCH, lambda: order.append("prefetch"))]
+        threads += [self._start(scheduler, BACKFILL, lambda: order.append("backfill"))]
+        self._wait_queued(scheduler, "prefetch", 1)
+        self._wait_queued(scheduler, "backfill", 1)
+
+        # The reserved slot lets interactive run while background work is blocked
+        scheduler.run(lambda: order.append("interactive"), level=INTERACTIVE)
+        self.assertEqual(order, ["interactive"])
+
+        release.set()
+        for thread in [blocker] + threads:
+            thread.join(2)
+        self.assertEqual(order, ["interactive", "backfill", "prefetch"])
+
+    def test_class_limit(self):
+        scheduler = LookupScheduler(max_concurrent=4, class_limits={BACKFILL: 1})
+        peak = []
+        active = [0]
+        lock = threading.Lock()
+
+        def work():
+            with lock:
+                active[0] += 1
+                peak.append(active[0])
+            time.sleep(0.01)
+            with lock:
+                active[0] -= 1
+
+        threads = [self._start(scheduler, BACKFILL, work) for _ in range(4)]
+        for thread in threads:
+            thread.join(2)
+        self.assertEqual(max(peak), 1)
+        metrics = scheduler.metrics()['backfill']
+        self.assertEqual(metrics['completed'], 4)
+        self.assertGreaterEqual(metrics['max_queue_depth'], 1)
+        self.assertEqual(metrics['queued'], 0)
+
+    def test_thread_priority_context(self):
+        scheduler = LookupScheduler()
+        self.assertEqual(lookup_scheduler.current_priority(), INTERACTIVE)
+        with lookup_scheduler.priority(PREFETCH):
+            self.assertEqual(scheduler.run(lookup_scheduler.current_priority), PREFETCH)
+        self.assertEqual(lookup_scheduler.current_priority(), INTERACTIVE)
+        self.assertEqual(scheduler.metrics()['prefetch']['submitted'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
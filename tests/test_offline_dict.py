@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Tests for the SQLite offline dictionary and the bounded working set in front of it.
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from offline_dict import OfflineDictionary, build_offline_dictionary, read_source
+from working_set import WorkingSet
+from pitch_db import PitchDB
+
+
+class TestOfflineDictionary(unittest.TestCase):
+    """Test building and reading the offline dictionary"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        source = os.path.join(self.tmpdir.name, "accents.txt")
+        with open(source, "w", encoding="utf-8") as f:
+            f.write("箸\tはし\t1\n橋\tはし\t2\n端\tはし\t0\nきゃく\t\t0\n東京\tとうきょう\t0,1\n壊れた行\n")
+        self.path = os.path.join(self.tmpdir.name, "offline.sqlite")
+        self.count = build_offline_dictionary(self.path, read_source(source))
+        self.offline = OfflineDictionary(self.path)
+
+    def tearDown(self):
+        self.offline.close()
+        self.tmpdir.cleanup()
+
+    def test_import_tsv(self):
+        self.assertEqual(self.count, 5)
+        self.assertEqual(len(self.offline), 5)
+        self.assertEqual(self.offline.get("橋")['pitch_type'], 3)
+        self.assertEqual(self.offline.get("東京")['drop_pos'], 0)
+        self.assertEqual(self.offline.get("東京")['num_mora'], 4)
+        self.assertEqual(self.offline.get("きゃく")['reading'], "きゃく")
+        self.assertIsNone(self.offline.get("川"))
+
+    def test_working_set_is_bounded(self):
+        working_set = WorkingSet(self.offline.get, capacity=2)
+        for word in ["箸", "橋", "端", "箸", "川", "川"]:
+            working_set.get(word)
+
+        stats = working_set.stats()
+        self.assertEqual(stats['resident'], 2)
+        self.assertEqual(stats['evictions'], 3)
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 5)
+        self.assertAlmostEqual(stats['hit_ratio'], 1 / 6)
+
+    def test_pitch_db_falls_back_to_offline(self):
+        db = PitchDB(os.path.join(self.tmpdir.name, "pitch_db.json"),
+                     offline_path=self.path, working_set_size=10)
+        db.add_entry("橋", "はし", 1, 2, 1)
+        self.assertEqual(db.lookup("橋")['drop_pos'], 1)
+        self.assertEqual(db.lookup("端")['reading'], "はし")
+        self.assertNotIn("端", db.db)
+        self.assertEqual(db.cache_stats()['offline']['resident'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,10 @@
 import unittest
 import sys
 import os
+import json
+import subprocess
+import tempfile
+import threading
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from pitch_db import PitchDB, PITCH_TYPE_LABELS
 
@@ -47,5 +51,121 @@ class TestPitchDB(unittest.TestCase):
             else:
                 print("Analysis failed!")
 
+class TestPitchDBConcurrency(unittest.TestCase):
+    """Stress PitchDB from many threads at once"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "pitch_db.json")
+        self.db = PitchDB(self.db_path, rate_limit=0)
+        # Stand-in for OJAD so the test runs offline and fast
+        self.db.fetch_from_ojad_with_reading = lambda dict_form, reading: (reading, 1, len(reading), 1)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_concurrent_lookups_and_writes(self):
+        words = ['大学', '食べる', '見る', '日本語', '会社', '電気', '木', '男']
+        errors = []
+        start = threading.Barrier(8)
+
+        def worker(n):
+            try:
+                start.wait()
+                for i in range(40):
+                    self.db.lookup_with_cache(words[(n + i) % len(words)])
+                    self.db.add_entry(f"w{n}_{i}", "テスト", i % 4, 3, i % 4)
+                    if i % 10 == 0:
+                        self.db.save()
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.db.save()
+
+        self.assertEqual(errors, [])
+        for n in range(8):
+            for i in range(40):
+                entry = self.db.lookup(f"w{n}_{i}")
+                self.assertEqual(entry['reading'], "てすと")
+                self.assertEqual(entry['drop_pos'], i % 4)
+        for word in words:
+            self.assertIsNotNone(self.db.lookup(word))
+
+        with open(self.db_path, encoding="utf-8") as f:
+            on_disk = json.load(f)
+        self.assertEqual(on_disk, self.db.db)
+
+    def test_lookup_returns_copy(self):
+        self.db.add_entry('テスト', 'テスト', 0, 3, 0)
+        result = self.db.lookup('テスト')
+        result['reading'] = 'changed'
+        self.assertEqual(self.db.lookup('テスト')['reading'], 'てすと')
+
+
+class TestPitchDBSharing(unittest.TestCase):
+    """Several processes sharing one cache file"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "pitch_db.json")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_writers_merge_instead_of_overwriting(self):
+        first = PitchDB(self.db_path)
+        second = PitchDB(self.db_path)
+        first.add_entry('大学', 'だいがく', 0, 4, 0)
+        second.add_entry('木', 'き', 1, 1, 1)
+        first.save()
+
+        reloaded = PitchDB(self.db_path)
+        self.assertIsNotNone(reloaded.lookup('大学'))
+        self.assertIsNotNone(reloaded.lookup('木'))
+
+    def test_refresh_picks_up_other_writers(self):
+        reader = PitchDB(self.db_path)
+        self.assertFalse(reader.refresh())
+
+        writer = PitchDB(self.db_path)
+        writer.add_entry('男', 'おとこ', 3, 3, 3)
+        self.assertTrue(reader.refresh())
+        self.assertEqual(reader.lookup('男')['drop_pos'], 3)
+
+        writer.save()
+        writer.add_entry('花', 'はな', 2, 2, 3)
+        self.assertTrue(reader.refresh())
+        self.assertIsNotNone(reader.lookup('男'))
+        self.assertIsNotNone(reader.lookup('花'))
+
+    def test_separate_process_writer(self):
+        local = PitchDB(self.db_path)
+        local.add_entry('大学', 'だいがく', 0, 4, 0)
+        repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        script = (
+            "import sys; sys.path.insert(0, sys.argv[1]);"
+            "from pitch_db import PitchDB;"
+            "db = PitchDB(sys.argv[2]);"
+            "[db.add_entry(f'p{i}', 'てすと', 0, 3, 0) for i in range(20)];"
+            "db.bump_generation()"
+        )
+        subprocess.run([sys.executable, "-c", script, repo_dir, self.db_path],
+                       check=True, capture_output=True)
+
+        local.add_entry('木', 'き', 1, 1, 1)
+        self.assertEqual(local.generation, 1)
+        local.save()
+        with open(self.db_path, encoding="utf-8") as f:
+            on_disk = json.load(f)
+        self.assertEqual(len([key for key in on_disk if key.startswith('p')]), 20)
+        self.assertIn('大学', on_disk)
+        self.assertIn('木', on_disk)
+
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Tests for the compact pitch notation and its card template renderer.
+"""
+
+import json
+import shutil
+import subprocess
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from contour import Contour
+from pitch_notation import (encode_notation, encode_contour, decode_notation, is_notation,
+                            render_notation_html, add_notation_renderer,
+                            NOTATION_RENDERER_JS, PITCH_SCRIPT, PITCH_TEMPLATE)
+from pitch_svg import generate_pitch_html, get_pitch_pattern, get_accent_position
+
+CASES = [
+    (['L', 'H', 'H', 'L'], [False, False, True, False], "はしが"),
+    (['H', 'L'], [True, False], ""),
+    (['L'] + ['H'] * 69, [False] * 70, "a:b"),
+    (get_pitch_pattern(3, 1) + get_pitch_pattern(5, 0), get_accent_position(3, 1) + get_accent_position(5, 0),
+     "A&amp;B 𠮷野家で食べた"),
+]
+
+
+class TestPitchNotation(unittest.TestCase):
+    """Test encoding, decoding and the reference rendering"""
+
+    def test_encode(self):
+        self.assertEqual(encode_notation(['L', 'H', 'H', 'L'], [False, False, True, False], "はしが"),
+                         "p1:4:6:4:はしが")
+        self.assertEqual(encode_contour(Contour(0b10, 0, 2), "木"), "p1:2:2:0:木")
+
+    def test_round_trip(self):
+        for pattern, accents, text in CASES:
+            contour, decoded_text = decode_notation(encode_notation(pattern, accents, text))
+            self.assertEqual((contour.pattern(), contour.accents(), decoded_text), (pattern, accents, text))
+
+    def test_not_notation(self):
+        self.assertFalse(is_notation('<div class="pitch-accent-container"></div>'))
+        self.assertTrue(is_notation(" p1:1:0:0:木\n"))
+        with self.assertRaises(ValueError):
+            decode_notation("p1:2:xyz:0:")
+
+    def test_render_matches_compact_html(self):
+        for pattern, accents, text in CASES:
+            self.assertEqual(render_notation_html(encode_notation(pattern, accents, text)),
+                             generate_pitch_html(pattern, accents, text, mode="compact"))
+
+    def test_template(self):
+        self.assertIn('<div class="pitch">{{Pitch}}</div>', PITCH_TEMPLATE)
+        self.assertIn(NOTATION_RENDERER_JS, PITCH_TEMPLATE)
+
+    def test_add_renderer_to_template(self):
+        template = "{{FrontSide}}\n<hr id=answer>\n{{Pitch}}\n<span>{{ Pitch }}</span>\n"
+        updated = add_notation_renderer(template)
+        self.assertEqual(updated, '{{FrontSide}}\n<hr id=answer>\n<div class="pitch">{{Pitch}}</div>\n'
+                                  '<span><div class="pitch">{{ Pitch }}</div></span>\n' + PITCH_SCRIPT)
+        self.assertEqual(add_notation_renderer(updated), updated)
+        # Placements already wrapped are kept; templates without Pitch are untouched
+        self.assertEqual(add_notation_renderer('<div class="pitch">{{Pitch}}</div>'),
+                         '<div class="pitch">{{Pitch}}</div>\n' + PITCH_SCRIPT)
+        self.assertEqual(add_notation_renderer("{{Meaning}}"), "{{Meaning}}")
+        self.assertEqual(add_notation_renderer(PITCH_TEMPLATE), PITCH_TEMPLATE)
+
+    @unittest.skipIf(shutil.which("node") is None, "node is not installed")
+    def test_js_renderer_matches_reference(self):
+        notations = [encode_notation(*case) for case in CASES] + ["p1:0:0:0:", "<svg></svg>"]
+        script = NOTATION_RENDERER_JS + (
+            "\nconsole.log(JSON.stringify(JSON.parse(require('fs').readFileSync(0, 'utf8')).map(pitchNotationHtml)));")
+        output = subprocess.run(["node", "-e", script], input=json.dumps(notations),
+                                capture_output=True, text=True, check=True).stdout
+        expected = [render_notation_html(notation) for notation in notations[:-1]] + [None]
+        self.assertEqual(json.loads(output), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Tests for the compact pitch cache store.
+"""
+
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pitch_store import EntryStore, PitchEntry
+
+
+class TestPitchStore(unittest.TestCase):
+    """Test the dict-like EntryStore"""
+
+    def setUp(self):
+        self.entry = {"reading": "だいがく", "drop_pos": 0, "num_mora": 4, "pitch_type": 0, "meaning": None}
+        self.store = EntryStore({"大学": self.entry})
+
+    def test_behaves_like_dict_of_dicts(self):
+        self.assertIn("大学", self.store)
+        self.assertEqual(self.store["大学"], self.entry)
+        self.assertEqual(self.store, {"大学": self.entry})
+        self.assertIsNone(self.store.get("木"))
+        self.assertEqual(len(self.store), 1)
+
+        del self.store["大学"]
+        self.assertNotIn("大学", self.store)
+        with self.assertRaises(KeyError):
+            self.store["大学"]
+
+    def test_reads_return_fresh_dicts(self):
+        self.store["大学"]["reading"] = "x"
+        self.assertEqual(self.store.get("大学")["reading"], "だいがく")
+
+    def test_entries_are_compact(self):
+        record = self.store.entry("大学")
+        self.assertIsInstance(record, PitchEntry)
+        self.assertFalse(hasattr(record, "__dict__"))
+        other = PitchEntry("".join(["だい", "がく"]), 0, 4, 0)
+        self.assertIs(other.reading, record.reading)
+        self.assertEqual(self.store.to_dict(), {"大学": self.entry})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,9 @@
+import re
 import unittest
 import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pitch_svg
 from pitch_svg import get_pitch_pattern, get_accent_position, generate_pitch_svg, generate_pitch_html
 
 class TestPitchSVG(unittest.TestCase):
@@ -98,5 +100,63 @@ class TestPitchSVG(unittest.TestCase):
         self.assertIn('stroke="black"', svg)
         self.assertIn('fill="none"', svg)
 
+    def test_exact_svg(self):
+        self.assertEqual(generate_pitch_svg(['L', 'H'], [False, True]),
+                         '<svg width="31" height="22" viewBox="0 0 31 22" xmlns="http://www.w3.org/2000/svg">'
+                         '<path d="M 8,16 L 23,8" stroke="black" fill="none" stroke-width="0.75"/>'
+                         '<circle cx="8" cy="16" r="3" stroke="black" stroke-width="0.75" fill="black"/>'
+                         '<circle cx="23" cy="8" r="3" stroke="black" stroke-width="0.75" fill="white"/></svg>')
+
+    def test_svg_cache(self):
+        pitch_svg._render_svg.cache_clear()
+        first = generate_pitch_svg(['H', 'L', 'L'], [True, False, False])
+        self.assertEqual(generate_pitch_svg(['H', 'L', 'L'], [True, False, False]), first)
+        # A text no longer than the pattern keeps the default spacing
+        self.assertEqual(generate_pitch_svg(['H', 'L', 'L'], [True, False, False], 3), first)
+        info = pitch_svg.svg_cache_info()
+        self.assertEqual((info.hits, info.misses), (2, 1))
+        self.assertNotEqual(generate_pitch_svg(['H', 'L', 'L'], [True, False, False], 6), first)
+
+    def test_compact_svg(self):
+        self.assertEqual(generate_pitch_svg(['L', 'H', 'H', 'L'], [False, False, True, False], mode="compact"),
+                         '<svg class="pa" width="61"><path d="M8 16l15-8 15 0 15 8"/>'
+                         '<path class="d" d="M8 16h0m15-8h0m15 0h0m15 8h0"/>'
+                         '<path class="a" d="M38 8h0"/></svg>')
+        # Heiban has no accent dots, a single mora no line
+        self.assertNotIn('class="a"', generate_pitch_svg(['L', 'H'], [False, False], mode="compact"))
+        self.assertEqual(generate_pitch_html(['H'], [True], "木", mode="compact"),
+                         '<div>木</div><svg class="pa" width="16"><path class="d" d="M8 8h0"/>'
+                         '<path class="a" d="M8 8h0"/></svg>')
+        with self.assertRaises(ValueError):
+            generate_pitch_svg(['H'], [True], mode="tiny")
+
+    def test_compact_svg_points(self):
+        # Dots land on the circle centres of the full SVG
+        pattern, accents = ['H', 'L', 'L', 'H', 'H'], [True, False, False, False, True]
+        full = generate_pitch_svg(pattern, accents, 9)
+        centres = [(int(x), int(y)) for x, y in re.findall(r'cx="(\d+)" cy="(\d+)"', full)]
+        dots = re.search(r'class="d" d="M(\d+) (\d+)h0((?:m\d+ ?-?\d+h0)*)"',
+                         generate_pitch_svg(pattern, accents, 9, "compact"))
+        x, y = int(dots.group(1)), int(dots.group(2))
+        points = [(x, y)]
+        for dx, dy in re.findall(r'm(\d+) ?(-?\d+)h0', dots.group(3)):
+            x, y = x + int(dx), y + int(dy)
+            points.append((x, y))
+        self.assertEqual(points, centres)
+
+    def test_compact_field_size(self):
+        # Compact fields are at least 3x smaller than full ones, text included
+        for mora_count in range(1, 7):
+            for drop_pos in range(mora_count + 1):
+                pattern, accents = get_pitch_pattern(mora_count, drop_pos), get_accent_position(mora_count, drop_pos)
+                for text in ("", "あ" * mora_count, "あ" * (mora_count + 1)):
+                    full = generate_pitch_html(pattern, accents, text)
+                    compact = generate_pitch_html(pattern, accents, text, mode="compact")
+                    self.assertGreaterEqual(len(full.encode()), 3 * len(compact.encode()), (pattern, text))
+
+    def test_renderer_id(self):
+        self.assertEqual(pitch_svg.renderer_id("full"), pitch_svg.RENDERER_VERSION)
+        self.assertNotEqual(pitch_svg.renderer_id("compact"), pitch_svg.renderer_id("full"))
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
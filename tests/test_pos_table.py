@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Tests for the part-of-speech flag table.
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sudachipy import dictionary
+from pos_table import (PosTable, pos_flags, token_flags, VERB, ADJECTIVE, AUXILIARY, PAST_AUXILIARY,
+                       CONJUNCTIVE_PARTICLE, ATTACHING_PARTICLE, BOUNDARY_PARTICLE, PUNCTUATION,
+                       NUMERAL, COUNTER)
+from pitch_db import PitchDB
+from sentence_pitch_processor import SentencePitchProcessor
+
+
+class TestPosTable(unittest.TestCase):
+    """Test POS flags and their use in the sentence processor"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.dictionary = dictionary.Dictionary()
+        cls.table = PosTable(cls.dictionary)
+        cls.tokenizer = cls.dictionary.create()
+
+    def flags_of(self, text):
+        return [(m.surface(), self.table.flags[m.part_of_speech_id()]) for m in self.tokenizer.tokenize(text)]
+
+    def test_table_matches_pos_tuples(self):
+        self.assertTrue(len(self.table) > 0)
+        for pos_id in range(len(self.table)):
+            self.assertEqual(self.table.pos[pos_id], tuple(self.dictionary.pos_of(pos_id)))
+            self.assertEqual(self.table.flags[pos_id], pos_flags(self.table.pos[pos_id]))
+
+    def test_categories(self):
+        flags = dict(self.flags_of("三時に猫は高かったけど食べて、寝ました。"))
+        self.assertTrue(flags['三'] & NUMERAL)
+        self.assertTrue(flags['時'] & COUNTER)
+        self.assertTrue(flags['に'] & ATTACHING_PARTICLE)
+        self.assertTrue(flags['は'] & BOUNDARY_PARTICLE)
+        self.assertTrue(flags['高かっ'] & ADJECTIVE)
+        self.assertTrue(flags['た'] & AUXILIARY and flags['た'] & PAST_AUXILIARY)
+        self.assertTrue(flags['けど'] & CONJUNCTIVE_PARTICLE)
+        self.assertTrue(flags['食べ'] & VERB)
+        self.assertTrue(flags['、'] & PUNCTUATION and flags['。'] & PUNCTUATION)
+        self.assertFalse(flags['猫'])
+
+    def test_token_flags_without_table(self):
+        self.assertEqual(token_flags({'pos': ('助動詞', '*', '*', '*', '助動詞-タ', '終止形-一般')}),
+                         AUXILIARY | PAST_AUXILIARY)
+        self.assertEqual(token_flags({'pos': ('名詞', '普通名詞'), 'flags': VERB}), VERB)
+
+    def test_phrase_groups(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db = PitchDB(os.path.join(tmpdir, "pitch_db.json"))
+            db.fetch_from_ojad_with_reading = lambda word, reading: None
+            processor = SentencePitchProcessor(db)
+            info = processor._get_token_pitch_info(processor._tokenize("猫は、魚を食べました"))
+        groups = processor._detect_phrase_groups(info)
+        self.assertEqual([[t['surface'] for t in group] for group in groups],
+                         [['猫'], ['は'], ['、', '魚', 'を', '食べました']])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Tests for idle-time cache prefetching.
+OJAD is replaced by a local stand-in so the tests run offline.
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pitch_db import PitchDB, RateLimiter
+from prefetch import CachePrefetcher
+
+
+class TestPrefetch(unittest.TestCase):
+    """Test the background cache prefetcher"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = PitchDB(os.path.join(self.tmpdir.name, "pitch_db.json"), rate_limit=0)
+        self.db.add_entry("大学", "だいがく", 0, 4, 0)
+        self.fetched = []
+
+        def fake_fetch(dict_form, reading):
+            self.fetched.append((dict_form, reading))
+            if dict_form == "行く":
+                return reading, 0, len(reading), 0
+            return None
+        self.db.fetch_from_ojad_with_reading = fake_fetch
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_missing_words_uses_dictionary_forms(self):
+        prefetcher = CachePrefetcher(self.db, lambda: [])
+        missing = dict(prefetcher.missing_words(["大学に行きます。", "大学"]))
+        self.assertNotIn("大学", missing)
+        self.assertNotIn("。", missing)
+        self.assertEqual(missing["行く"], "いく")
+
+    def test_run_caches_only_successful_fetches(self):
+        prefetcher = CachePrefetcher(self.db, lambda: ["大学に行きます"])
+        stats = prefetcher.run()
+
+        self.assertEqual(stats['fetched'], 1)
+        self.assertEqual(stats['missing'], stats['fetched'] + stats['failed'])
+        self.assertEqual(self.db.lookup("行く")['reading'], "いく")
+        self.assertIsNone(self.db.lookup("に"))
+        self.assertNotIn("大学", [word for word, _ in self.fetched])
+
+    def test_pauses_while_busy_and_stops(self):
+        busy = threading.Event()
+        busy.set()
+        prefetcher = CachePrefetcher(self.db, lambda: ["大学に行きます"], is_busy=busy.is_set, idle_poll=0.01)
+        prefetcher.start()
+        prefetcher._thread.join(0.1)
+        self.assertEqual(self.fetched, [])
+
+        self.assertTrue(prefetcher.stop(timeout=1))
+        self.assertFalse(prefetcher._thread.is_alive())
+        self.assertEqual(self.fetched, [])
+
+    def test_stop_skips_remaining_texts(self):
+        prefetcher = CachePrefetcher(self.db, lambda: [])
+        self.assertTrue(prefetcher.stop())
+        self.assertEqual(prefetcher.missing_words(["大学に行きます"]), [])
+
+    def test_rate_limiter_spacing(self):
+        limiter = RateLimiter(rate=1000)
+        limiter.wait()
+        first = limiter._next_time
+        limiter.wait()
+        self.assertAlmostEqual(limiter._next_time - first, 0.001, places=4)
+
+
+if __name__ == '__main__':
+    unittest.main()
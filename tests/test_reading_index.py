@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Tests for matching a target reading against the readings of an OJAD page.
+"""
+
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from reading_index import ReadingIndex, edit_distance
+
+
+def page(*readings):
+    return [{'reading': reading, 'mora_spans': []} for reading in readings]
+
+
+class TestReadingIndex(unittest.TestCase):
+    """Test exact, suffix and fuzzy matching"""
+
+    def setUp(self):
+        self.readings = page("かう", "かいます", "かわない", "かって", "かった", "かえば")
+        self.index = ReadingIndex(self.readings)
+
+    def test_exact_and_katakana(self):
+        self.assertEqual(self.index.best_match("かった")['reading'], "かった")
+        self.assertEqual(self.index.best_match("カイマス")['reading'], "かいます")
+
+    def test_suffix_prefers_longest(self):
+        index = ReadingIndex(page("ます", "います", "かいます"))
+        self.assertEqual(index.best_match("おかいます")['reading'], "かいます")
+
+    def test_fuzzy_is_scored_not_first_loose_match(self):
+        # The old matcher returned the first reading sharing any kana (かう)
+        self.assertEqual(self.index.best_match("かいまさ")['reading'], "かいます")
+        self.assertEqual(self.index.best_match("かえれば")['reading'], "かえば")
+
+    def test_fallbacks(self):
+        self.assertEqual(self.index.best_match("大学")['reading'], "かう")
+        self.assertIsNone(ReadingIndex([]).best_match("かう"))
+
+    def test_edit_distance(self):
+        self.assertEqual(edit_distance("かった", "かって"), 1)
+        self.assertEqual(edit_distance("", "かう"), 2)
+        self.assertEqual(edit_distance("かいます", "よみました", limit=1), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
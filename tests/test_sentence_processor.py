@@ -7,9 +7,13 @@ Validates the processor against known Japanese pitch accent rules.
 import unittest
 import sys
 import os
+import tempfile
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from pitch_db import PitchDB
 from sentence_pitch_processor import SentencePitchProcessor
+from pitch_svg import generate_pitch_html
+from pitch_notation import render_notation_html, RENDERER_ID
 
 
 class TestSentencePitchProcessor(unittest.TestCase):
@@ -76,6 +80,37 @@ class TestSentencePitchProcessor(unittest.TestCase):
         self.assertIsNotNone(result)
         self.assertEqual(result['reading'], 'だいがく')
 
+    def test_batch_processing(self):
+        """Test batch processing of repeated sentences."""
+        sentences = ["大学に行きます", "大学", "大学に行きます"]
+        results = self.processor.process_sentences(sentences)
+
+        self.assertEqual(list(results), ["大学に行きます", "大学"])
+        self.assertEqual(results["大学"]['reading'], 'だいがく')
+        self.assertEqual(results["大学に行きます"]['reading'], 'だいがくにいきます')
+
+    def test_incremental_processing(self):
+        """Test that an edit only looks up the words it changed."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db = PitchDB(os.path.join(tmpdir, "pitch_db.json"))
+            for word, reading, drop_pos in [("猫", "ねこ", 1), ("犬", "いぬ", 2), ("鳥", "とり", 0),
+                                            ("好き", "すき", 2)]:
+                db.add_entry(word, reading, drop_pos, 2, drop_pos)
+            processor = SentencePitchProcessor(db)
+            previous = processor.process_sentence("猫も犬も好きです")
+
+            looked_up = []
+            lookup = db.lookup_with_cache
+            db.lookup_with_cache = lambda word: looked_up.append(word) or lookup(word)
+            edited = processor.process_sentence_incremental("猫も鳥も好きです", previous)
+            self.assertEqual(looked_up, ["鳥"])
+            self.assertIs(processor.process_sentence_incremental("猫も鳥も好きです", edited), edited)
+
+            full = processor.process_sentence("猫も鳥も好きです")
+            self.assertEqual(edited.to_dict(), full.to_dict())
+            self.assertEqual(edited['pattern'], full['pattern'])
+            self.assertEqual(processor.process_sentence_incremental("猫", None).reading, "ねこ")
+
     def test_svg_generation(self):
         """Test SVG generation."""
         sentence = "大学に行きます"
@@ -94,6 +129,17 @@ class TestSentencePitchProcessor(unittest.TestCase):
         self.assertIn('<div', html)
         self.assertIn('</div>', html)
 
+    def test_notation_field(self):
+        """Test storing pitch notation instead of HTML."""
+        result = self.processor.process_sentence("大学に行きます")
+        self.assertEqual(self.processor.generate_result_field(result), self.processor.generate_result_html(result))
+        self.processor.pitch_storage = "notation"
+        field = self.processor.generate_result_field(result)
+        self.assertTrue(field.startswith("p1:"))
+        self.assertEqual(render_notation_html(field), generate_pitch_html(
+            result['pattern'], result['accent_positions'], "大学に行きます", mode="compact"))
+        self.assertEqual(self.processor.renderer_id(), RENDERER_ID)
+
 
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
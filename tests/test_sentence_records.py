@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Tests for the slotted sentence result records.
+"""
+
+import json
+import unittest
+import sys
+import os
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sentence_records import Token, TokenPitch, Phrase, SentenceResult
+from contour import Contour
+from pitch_db import PitchDB
+from sentence_pitch_processor import SentencePitchProcessor
+
+
+def token_pitch(surface, reading, drop_pos, num_mora):
+    return TokenPitch(surface, surface, reading, drop_pos, drop_pos, num_mora, ('名詞',), 0)
+
+
+class TestSentenceRecords(unittest.TestCase):
+    """Test that records hold no dict and read like the dicts they replace"""
+
+    def test_slots(self):
+        token = Token("猫", "猫", "ねこ", ('名詞',), 5, 0)
+        self.assertFalse(hasattr(token, '__dict__'))
+        with self.assertRaises(AttributeError):
+            token.extra = 1
+
+    def test_mapping_access(self):
+        token = token_pitch("猫", "ねこ", 1, 2)
+        self.assertEqual(token['reading'], "ねこ")
+        self.assertEqual(token.get('drop_pos'), 1)
+        self.assertIsNone(token.get('missing'))
+        self.assertIn('pitch_info', token)
+        self.assertNotIn('missing', token)
+        with self.assertRaises(KeyError):
+            token['missing']
+
+    def test_views(self):
+        first = Phrase([token_pitch("猫", "ねこ", 1, 2), token_pitch("が", "が", 0, 1)],
+                       Contour.from_lists(['H', 'L', 'L'], [True, False, False]))
+        second = Phrase([token_pitch("好き", "すき", 2, 2)], Contour.from_lists(['L', 'H'], [False, True]))
+        self.assertEqual(first.reading, "ねこが")
+        self.assertEqual(first['mora_count'], 3)
+        self.assertEqual([(b['mora_start'], b['mora_end']) for b in first.word_boundaries], [(0, 2), (2, 3)])
+
+        result = SentenceResult("猫が好き", [first, second])
+        self.assertEqual(result['pattern'], ['H', 'L', 'L', 'L', 'H'])
+        self.assertIs(result.contour, result.contour)
+        self.assertEqual(result.accent_positions, [True, False, False, False, True])
+        self.assertEqual(result.reading, "ねこがすき")
+        self.assertEqual(result.mora_count, 5)
+
+    def test_to_dict(self):
+        phrase = Phrase([token_pitch("猫", "ねこ", 1, 2)], Contour(0b01, 0b01, 2))
+        data = SentenceResult("猫", [phrase]).to_dict()
+        self.assertEqual(data['pattern'], ['H', 'L'])
+        self.assertEqual(data['phrases'][0]['tokens'][0]['reading'], "ねこ")
+        self.assertEqual(data['phrases'][0]['word_boundaries'][0]['token']['surface'], "猫")
+        self.assertIsInstance(data['phrases'][0], dict)
+        self.assertIsInstance(data['phrases'][0]['word_boundaries'][0]['token'], dict)
+        self.assertEqual(data['contour'], {'high': 0b01, 'accent': 0b01, 'length': 2})
+        self.assertEqual(json.loads(json.dumps(data))['phrases'][0]['contour'], data['contour'])
+
+    def test_process_sentence_returns_records(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db = PitchDB(os.path.join(tmpdir, "pitch_db.json"))
+            db.add_entry("今日", "きょう", 1, 2, 1)
+            result = SentencePitchProcessor(db).process_sentence("今日は")
+        self.assertIsInstance(result, SentenceResult)
+        self.assertIsInstance(result.phrases[0], Phrase)
+        self.assertIsInstance(result.phrases[0].tokens[0], TokenPitch)
+        self.assertEqual(result['original_sentence'], "今日は")
+        self.assertEqual(result.to_dict()['reading'], "きょうは")
+
+
+if __name__ == '__main__':
+    unittest.main()
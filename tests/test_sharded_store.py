@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Tests for the sharded on-disk cache format.
+"""
+
+import unittest
+import sys
+import os
+import json
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sharded_store import ShardedStore, migrate_to_shards, prepare_sharded_cache
+from pitch_db import PitchDB
+
+
+def entry(reading, drop_pos=0):
+    return {"reading": reading, "drop_pos": drop_pos, "num_mora": len(reading), "pitch_type": 0, "meaning": None}
+
+
+class TestShardedStore(unittest.TestCase):
+    """Test lazy loading, per-shard writes and migration"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.directory = os.path.join(self.tmpdir.name, "shards")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_lazy_load_and_single_shard_write(self):
+        store = ShardedStore(self.directory, num_shards=8)
+        for word in ["大学", "木", "男", "花"]:
+            store[word] = entry(word)
+        self.assertEqual(store.flush(), len({store.shard_index(w) for w in ["大学", "木", "男", "花"]}))
+
+        reopened = ShardedStore(self.directory, num_shards=2)
+        self.assertEqual(reopened.num_shards, 8)  # Taken from the manifest
+        self.assertEqual(reopened.stats()['loaded_shards'], 0)
+        self.assertEqual(reopened["木"]['reading'], "木")
+        self.assertEqual(reopened.stats()['loaded_shards'], 1)
+
+        mtimes = {i: os.stat(reopened.shard_path(i)).st_mtime_ns
+                  for i in range(8) if os.path.exists(reopened.shard_path(i))}
+        reopened["山"] = entry("やま", 2)
+        self.assertEqual(reopened.flush(), 1)
+        changed = [i for i, mtime in mtimes.items() if os.stat(reopened.shard_path(i)).st_mtime_ns != mtime]
+        self.assertLessEqual(len(changed), 1)
+        self.assertEqual(len(ShardedStore(self.directory)), 5)
+
+    def test_corrupted_shard_is_isolated(self):
+        store = ShardedStore(self.directory, num_shards=8)
+        store["大学"] = entry("だいがく")
+        store["木"] = entry("き")
+        store.flush()
+        broken = store.shard_index("大学")
+        if broken == store.shard_index("木"):
+            self.skipTest("words share a shard")
+        with open(store.shard_path(broken), "w") as f:
+            f.write("{not json")
+
+        reopened = ShardedStore(self.directory)
+        self.assertIsNone(reopened.get("大学"))
+        self.assertEqual(reopened["木"]['reading'], "き")
+        self.assertTrue(os.path.exists(store.shard_path(broken) + ".corrupt"))
+
+    def test_migration_and_pitch_db(self):
+        json_path = os.path.join(self.tmpdir.name, "pitch_db.json")
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump({"大学": entry("だいがく"), "木": entry("き", 1)}, f, ensure_ascii=False)
+        with open(os.path.join(self.tmpdir.name, "pitch_db.journal"), "w", encoding="utf-8") as f:
+            f.write(json.dumps(["男", entry("おとこ", 3)], ensure_ascii=False) + "\n")
+        self.assertEqual(migrate_to_shards(json_path, self.directory), 3)
+
+        db = PitchDB(self.directory, sharded=True)
+        other = PitchDB(self.directory, sharded=True)
+        self.assertEqual(db.lookup("男")['drop_pos'], 3)
+        db.add_entry("花", "はな", 2, 2, 3)
+        self.assertEqual(other.lookup("花")['reading'], "はな")
+        self.assertEqual(db.cache_stats()['dirty_shards'], 0)
+
+    def test_prepare_migrates_configured_cache(self):
+        default_path = os.path.join(self.tmpdir.name, "default.json")
+        custom_path = os.path.join(self.tmpdir.name, "shared.json")
+        for path, word in ((default_path, "木"), (custom_path, "大学")):
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({word: entry("x")}, f, ensure_ascii=False)
+
+        # cache.path still names the single-file cache that was in use
+        directory = prepare_sharded_cache(custom_path, "", default_path)
+        self.assertEqual(directory, os.path.join(self.tmpdir.name, "shared_shards"))
+        self.assertEqual(list(ShardedStore(directory)), ["大学"])
+        self.assertEqual(prepare_sharded_cache(custom_path, "", default_path), directory)
+
+        # An explicit source wins over the default cache
+        self.assertEqual(prepare_sharded_cache(self.directory, custom_path, default_path), self.directory)
+        self.assertEqual(list(ShardedStore(self.directory)), ["大学"])
+        other = os.path.join(self.tmpdir.name, "other_shards")
+        prepare_sharded_cache(other, "", default_path)
+        self.assertEqual(list(ShardedStore(other)), ["木"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Tests for the trie index used to split unknown compounds into cached words.
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from trie import Trie
+from pitch_db import PitchDB
+
+
+class TestTrie(unittest.TestCase):
+    """Test prefix and segmentation queries"""
+
+    def setUp(self):
+        self.trie = Trie()
+        for key in ["大学", "大学院", "院生", "生", "日本", "語"]:
+            self.trie.insert(key)
+
+    def test_prefix_queries(self):
+        self.assertEqual(len(self.trie), 6)
+        self.assertIn("大学院", self.trie)
+        self.assertNotIn("大", self.trie)
+        self.assertEqual([end for end, _ in self.trie.prefixes("大学院生")], [2, 3])
+        self.assertEqual(self.trie.longest_prefix("大学院生"), (3, {"大学院"}))
+        self.assertIsNone(self.trie.longest_prefix("東京"))
+
+    def test_segment_prefers_fewest_longest_components(self):
+        self.assertEqual(self.trie.segment("大学院生"), ["大学院", "生"])
+        self.assertEqual(self.trie.segment("日本語"), ["日本", "語"])
+        self.assertIsNone(self.trie.segment("日本人"))
+
+
+class TestPitchDBDecompose(unittest.TestCase):
+    """Test compound decomposition against the cache"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_decompose_json_and_sharded(self):
+        for sharded, path in [(False, "pitch_db.json"), (True, "shards")]:
+            db = PitchDB(os.path.join(self.tmpdir.name, path), sharded=sharded)
+            db.add_entry("日本", "にほん", 2, 3, 2)
+            db.add_entry("語", "ご", 0, 1, 0)
+            db.add_entry("大学", "だいがく", 0, 4, 0)
+
+            self.assertEqual(db.decompose("日本語"), ["日本", "語"])
+            self.assertIsNone(db.decompose("大学"))
+            self.assertIsNone(db.decompose("日本人"))
+            self.assertEqual(db.decompose_reading("にほんご"), [("にほん", ["日本"]), ("ご", ["語"])])
+
+            reopened = PitchDB(os.path.join(self.tmpdir.name, path), sharded=sharded)
+            self.assertEqual(reopened.decompose("大学語"), ["大学", "語"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Character trie over cache keys.
+Used to split unknown compounds into cached components: every query walks at
+most the length of the word, independent of how many keys are indexed.
+"""
+
+# Key under which a node stores the values of the word ending there
+# (characters are never empty strings, so it cannot clash with a child)
+_VALUES = ""
+
+
+class Trie:
+    """
+    Maps strings to sets of values with prefix queries.
+    Nodes are plain dicts of child characters.
+    """
+
+    def __init__(self):
+        self._root = {}
+        self._size = 0
+
+    def insert(self, key: str, value=None):
+        """
+        Add value under key (value defaults to the key itself).
+        """
+        if not key:
+            return
+        node = self._root
+        for char in key:
+            node = node.setdefault(char, {})
+        values = node.setdefault(_VALUES, set())
+        if not values:
+            self._size += 1
+        values.add(key if value is None else value)
+
+    def get(self, key: str) -> set:
+        """
+        Values stored under exactly key (empty set if none).
+        """
+        node = self._root
+        for char in key:
+            node = node.get(char)
+            if node is None:
+                return set()
+        return set(node.get(_VALUES, ()))
+
+    def __contains__(self, key: str) -> bool:
+        return bool(self.get(key))
+
+    def __len__(self) -> int:
+        return self._size
+
+    def prefixes(self, text: str, start: int = 0):
+        """
+        Yield (end, values) for every key that matches text[start:end].
+        """
+        node = self._root
+        for end in range(start, len(text)):
+            node = node.get(text[end])
+            if node is None:
+                return
+            if node.get(_VALUES):
+                yield end + 1, node[_VALUES]
+
+    def longest_prefix(self, text: str, start: int = 0):
+        """
+        Longest key matching text at start, as (end, values), or None.
+        """
+        longest = None
+        for match in self.prefixes(text, start):
+            longest = match
+        return longest
+
+    def segment(self, text: str):
+        """
+        Split text into the fewest indexed keys, preferring longer keys first.
+        Returns a list of substrings, or None if text cannot be covered.
+        """
+        # best[i]: (segment count, previous cut) for the prefix text[:i]
+        best = [None] * (len(text) + 1)
+        best[0] = (0, None)
+        for start in range(len(text)):
+            if best[start] is None:
+                continue
+            count = best[start][0] + 1
+            for end, _ in self.prefixes(text, start):
+                # On ties, prefer the later cut: longer leading segments, as longest match would
+                if best[end] is None or count <= best[end][0]:
+                    best[end] = (count, start)
+        if best[-1] is None:
+            return None
+
+        segments = []
+        end = len(text)
+        while end > 0:
+            start = best[end][1]
+            segments.append(text[start:end])
+            end = start
+        return segments[::-1]
@@ -1,11 +1,14 @@
 #!/usr/bin/env python3
 """
 Utility functions for the Japanese Pitch Accent Addon.
+Kana handling lives in kana.py; the names here are kept for existing callers.
 """
 
-def katakana_to_hiragana(text):
-    """Convert katakana to hiragana."""
-    return text.translate(str.maketrans(
-        'ァアィイゥウェエォオカガキギクグケゲコゴサザシジスズセゼソゾタダチヂッツヅテデトドナニヌネノハバパヒビピフブプヘベペホボポマミムメモャヤュユョヨラリルレロワヲンヴヵヶ',
-        'ぁあぃいぅうぇえぉおかがきぎくぐけげこごさざしじすずせぜそぞただちぢっつづてでとどなにぬねのはばぱひびぴふぶぷへべぺほぼぽまみむめもゃやゅゆょよらりるれろわをんゔゕゖ'
-    )) 
\ No newline at end of file
+from kana import (
+    KATAKANA_TO_HIRAGANA,
+    SMALL_KANA,
+    SPECIAL_MORA,
+    split_mora,
+    to_hiragana as katakana_to_hiragana,
+    mora_count as count_mora,
+)
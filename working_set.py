@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Bounded in-memory working set over a persistent dictionary tier.
+Keeps the most recently used entries resident and faults the rest in from
+disk on demand, so memory use does not grow with the size of the dictionary.
+"""
+
+import threading
+from collections import OrderedDict
+
+from pitch_store import PitchEntry
+
+# Marks a word known to be absent from the backing tier
+_MISSING = object()
+
+
+class WorkingSet:
+    """
+    LRU cache of PitchEntry records in front of a loader.
+    loader(dict_form) returns an entry dict or None; absent words are cached
+    too, so repeated misses do not go back to disk.
+    """
+
+    def __init__(self, loader, capacity: int = 20000):
+        self.loader = loader
+        self.capacity = max(int(capacity), 1)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, dict_form: str):
+        """
+        Return the entry as a fresh dict, or None if the backing tier lacks it.
+        """
+        with self._lock:
+            entry = self._entries.get(dict_form)
+            if entry is not None:
+                self._entries.move_to_end(dict_form)
+                self.hits += 1
+                return None if entry is _MISSING else entry.to_dict()
+            self.misses += 1
+
+        # Fault in outside the lock so slow disk reads don't block other lookups
+        data = self.loader(dict_form)
+        entry = PitchEntry.from_dict(data) if data is not None else _MISSING
+        with self._lock:
+            self._entries[dict_form] = entry
+            self._entries.move_to_end(dict_form)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return data
+
+    def discard(self, dict_form: str):
+        """
+        Drop a resident entry, e.g. after the backing tier changed.
+        """
+        with self._lock:
+            self._entries.pop(dict_form, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        """
+        Resident size, hit ratio and eviction count.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'resident': len(self._entries),
+                'capacity': self.capacity,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions
+            }